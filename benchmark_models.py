@@ -0,0 +1,128 @@
+
+## Built-in modules: ##
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass
+from datetime import datetime
+from gc import collect
+from json import dumps, loads
+from time import perf_counter
+from tracemalloc import start, stop, take_snapshot, Snapshot
+from typing import Any, Callable
+
+## Local modules: ##
+from journal_homework_models import HomeworkModel, HomeworksBatch
+
+
+@dataclass
+class LegacyHomeworkModel:
+    """HomeworkModel before the slots: plain dataclass with raw creation time string."""
+    status: int
+    teacher_name: str
+    subject_name: str
+    file_url_path: str
+    comment: str
+    creation_time: datetime
+    theme: str
+
+
+def generate_listing(records_count: int) -> list[dict[str, Any]]:
+    """Generate the listing like the Journal API returns it. It's decoded from json,
+    so repeated names are different string objects, as in the real responses.
+
+    Args:
+        records_count (int): homeworks count.
+
+    Returns:
+        list[dict[str, Any]]: homeworks dicts.
+    """
+    SUBJECTS_COUNT: int = 40
+    TEACHERS_COUNT: int = 25
+
+    listing: list[dict[str, Any]] = [
+        {
+            "id": index,
+            "status": index % 4,
+            "fio_teach": f"Teacher Teacherovich Number {index % TEACHERS_COUNT}",
+            "name_spec": f"Subject of the specialization number {index % SUBJECTS_COUNT}",
+            "file_path": f"https://fs.top-academy.ru/homework/{index:08d}/archive.zip",
+            "comment": f"Comment {index}",
+            "creation_time": f"2024-{index % 12 + 1:02d}-{index % 28 + 1:02d} 12:{index % 60:02d}:00",
+            "theme": f"Homework theme {index}",
+            "stud_answer": None,
+            "cover_image": None,
+        }
+        for index in range(records_count)
+    ]
+    return loads(dumps(listing))
+
+
+def measure(build: Callable[[], Any]) -> tuple[Any, int, float]:
+    """Measure memory retained by the built object and the build time.
+    Time is measured in the separate run, because tracemalloc slows down the allocations.
+
+    Args:
+        build (Callable[[], Any]): function which builds the object.
+
+    Returns:
+        tuple[Any, int, float]: built object, allocated bytes and build time in seconds.
+    """
+    collect()
+    start_time: float = perf_counter()
+    build()
+    build_time: float = perf_counter() - start_time
+
+    collect()
+    start()
+    before_snapshot: Snapshot = take_snapshot()
+    built_object: Any = build()
+    after_snapshot: Snapshot = take_snapshot()
+    stop()
+
+    allocated_bytes: int = sum(stat.size_diff for stat in after_snapshot.compare_to(before_snapshot, "filename"))
+    return (built_object, allocated_bytes, build_time)
+
+
+def main() -> None:
+    """Compare memory usage of the legacy dataclass, slotted HomeworkModel and HomeworksBatch."""
+    BYTES_IN_MEGABYTE: int = 1024 * 1024
+
+    parser: ArgumentParser = ArgumentParser(description="Compare memory usage of the homework models.")
+    parser.add_argument("--records", type=int, default=100_000, help="homeworks count")
+    arguments: Namespace = parser.parse_args()
+
+    ## Every variant decodes its own listing and drops it, so only the retained memory is measured: ##
+    variants: dict[str, Callable[[], Any]] = {
+        "legacy dataclass": lambda: [
+            LegacyHomeworkModel(
+                status=homework.get("status"),
+                teacher_name=homework.get("fio_teach"),
+                subject_name=homework.get("name_spec"),
+                file_url_path=homework.get("file_path"),
+                comment=homework.get("comment"),
+                creation_time=homework.get("creation_time"),
+                theme=homework.get("theme")
+            )
+            for homework in generate_listing(records_count=arguments.records)
+        ],
+        "slotted HomeworkModel": lambda: [
+            HomeworkModel.from_api_dict(homework)
+            for homework in generate_listing(records_count=arguments.records)
+        ],
+        "HomeworksBatch": lambda: HomeworksBatch(
+            HomeworkModel.from_api_dict(homework)
+            for homework in generate_listing(records_count=arguments.records)
+        ),
+    }
+
+    print(f"{'variant':<24} {'memory':>10} {'per record':>12} {'build time':>12}")
+    for variant_name, build in variants.items():
+        built_object, allocated_bytes, build_time = measure(build=build)
+        print(
+            f"{variant_name:<24} {allocated_bytes / BYTES_IN_MEGABYTE:>8.1f} MB"
+            f" {allocated_bytes / arguments.records:>10.0f} B {build_time:>10.2f} s"
+        )
+        del built_object
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+
+## Built-in modules: ##
+from argparse import ArgumentParser, Namespace
+from subprocess import run, CompletedProcess
+from sys import executable, exit
+from typing import Iterable
+
+## Local modules: ##
+from config import current_dir_path
+
+
+## Modules which are imported by the entry point before any work starts: ##
+STARTUP_MODULES: tuple[str, ...] = (
+    "main",
+    "journal_requests",
+    "journal_homework_models",
+    "homeworks_folder_manager",
+    "journal_downloader",
+)
+## Modules which must be loaded on the first use only: ##
+LAZY_MODULES: tuple[str, ...] = (
+    "requests",
+    "urllib3",
+    "loguru",
+    "fake_useragent",
+)
+
+
+def measure_import(module_name: str) -> tuple[int, set[str]]:
+    """Import the module in the new interpreter with -X importtime.
+
+    Args:
+        module_name (str): module to import.
+
+    Raises:
+        RuntimeError: if the module can't be imported.
+
+    Returns:
+        tuple[int, set[str]]: cumulative import time of the module in microseconds and all imported modules.
+    """
+    IMPORT_TIME_PREFIX: str = "import time:"
+
+    process: CompletedProcess = run(
+        [executable, "-X", "importtime", "-c", f"import {module_name}"],
+        cwd=current_dir_path,
+        capture_output=True,
+        text=True
+    )
+    if process.returncode:
+        raise RuntimeError(f"Failed to import {module_name}: {process.stderr}")
+
+    cumulative_time: int = 0
+    imported_modules: set[str] = set()
+    for line in process.stderr.splitlines():
+        if not line.startswith(IMPORT_TIME_PREFIX):
+            continue
+
+        _, cumulative, imported_module = line[len(IMPORT_TIME_PREFIX):].split("|")
+        imported_module: str = imported_module.strip()
+        if not cumulative.strip().isdigit():
+            continue
+
+        imported_modules.add(imported_module)
+        if imported_module == module_name:
+            cumulative_time: int = int(cumulative)
+
+    return (cumulative_time, imported_modules)
+
+
+def run_benchmark(modules: Iterable[str], repeat: int, budget_ms: float) -> bool:
+    """Measure the import time of every module and check it against the budget.
+    The best of repeat runs is taken, so the disk cache doesn't affect the result.
+
+    Args:
+        modules (Iterable[str]): modules to measure.
+        repeat (int): imports of every module.
+        budget_ms (float): max import time of every module in milliseconds.
+
+    Returns:
+        bool: True if all modules fit the budget and don't import lazy modules.
+    """
+    MICROSECONDS_IN_MILLISECOND: int = 1000
+    is_passed: bool = True
+
+    for module_name in modules:
+        measurements: list[tuple[int, set[str]]] = [measure_import(module_name) for _ in range(repeat)]
+        best_time_ms: float = min(import_time for import_time, _ in measurements) / MICROSECONDS_IN_MILLISECOND
+        eager_modules: list[str] = sorted(set(LAZY_MODULES) & measurements[0][1])
+
+        status: str = "OK"
+        if best_time_ms > budget_ms or eager_modules:
+            status: str = "FAIL"
+            is_passed = False
+
+        print(f"{module_name:<28} {best_time_ms:>8.1f} ms  {status}  {', '.join(eager_modules)}")
+
+    return is_passed
+
+
+def main() -> None:
+    """Run the startup benchmark from the command line. Exit code is 1 on the regression."""
+    parser: ArgumentParser = ArgumentParser(description="Measure the import time of the entry point modules.")
+    parser.add_argument("modules", nargs="*", default=STARTUP_MODULES, help="modules to measure")
+    parser.add_argument("--repeat", type=int, default=5, help="imports of every module (best one is taken)")
+    parser.add_argument("--budget-ms", type=float, default=150, help="max import time of every module")
+    arguments: Namespace = parser.parse_args()
+
+    if not run_benchmark(modules=arguments.modules, repeat=arguments.repeat, budget_ms=arguments.budget_ms):
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+
+## Built-in modules: ##
+from __future__ import annotations
+from argparse import ArgumentParser, Namespace
+from os import chdir, environ, getcwd
+from os.path import join
+from resource import getrusage, RUSAGE_SELF
+from subprocess import Popen, PIPE
+from sys import executable, exit, platform
+from tempfile import TemporaryDirectory
+from threading import Lock
+from time import perf_counter
+from typing import Any, Optional, TYPE_CHECKING
+
+## Pip modules: ##
+if TYPE_CHECKING:
+    from requests import Response
+
+## Local modules: ##
+## journal_transport doesn't read config.py, other local modules are imported after JOURNAL_API_URL is set: ##
+from journal_mock_server import CONTENT_DISPOSITION_FORMATS
+from journal_transport import PooledSessionTransport
+from journal_rate_limiter import JournalRateLimiter
+from journal_metrics import get_endpoint_name
+
+
+## Mock server prints "...JOURNAL_API_URL=<url>" when it's ready: ##
+MOCK_SERVER_READY_MARKER: str = "JOURNAL_API_URL="
+
+
+class TimingTransport(PooledSessionTransport):
+    """Pooled transport which keeps the latency of every request by the endpoint.
+    Streamed downloads are measured until the response headers, like the time to the first byte."""
+    RETRY_BACKOFF_FACTOR: float = 0.05
+
+    def __init__(self, concurrency: int, max_retries: int, rate_limiter: Optional[JournalRateLimiter] = None) -> None:
+        """Initialize the transport with the short retry backoff.
+
+        Args:
+            concurrency (int): max kept alive connections per host.
+            max_retries (int): retries count for failed requests.
+            rate_limiter (Optional[JournalRateLimiter], optional): request budget. Defaults to None.
+        """
+        super().__init__(
+            pool_size=concurrency,
+            max_retries=max_retries,
+            backoff_factor=self.RETRY_BACKOFF_FACTOR,
+            rate_limiter=rate_limiter
+        )
+        self.latencies: dict[str, list[float]] = {}
+        self._latencies_lock: Lock = Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        """Send the HTTP request and keep its latency.
+
+        Args:
+            method (str): HTTP method.
+            url (str): request URL.
+
+        Returns:
+            Response: response object.
+        """
+        start_time: float = perf_counter()
+        response: Response = super().request(method, url, **kwargs)
+        latency: float = perf_counter() - start_time
+
+        with self._latencies_lock:
+            self.latencies.setdefault(get_endpoint_name(url=url), []).append(latency)
+        return response
+
+
+def start_mock_server(arguments: Namespace) -> tuple[Popen, str]:
+    """Start the mock Journal API in the separate process, so its memory is not counted in the peak RSS.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Raises:
+        RuntimeError: if the server didn't start.
+
+    Returns:
+        tuple[Popen, str]: server process and its API URL.
+    """
+    mock_server_process: Popen = Popen(
+        [
+            executable, "journal_mock_server.py",
+            "--port", "0",
+            "--homeworks-per-page", str(arguments.homeworks_per_page),
+            "--pages", str(arguments.pages),
+            "--file-size", str(arguments.file_size),
+            "--latency", str(arguments.latency),
+            "--latency-jitter", str(arguments.latency_jitter),
+            "--error-rate", str(arguments.error_rate),
+            "--content-disposition", arguments.content_disposition,
+            *(("--rate-limit", str(arguments.rate_limit)) if arguments.rate_limit is not None else ()),
+        ],
+        stdout=PIPE,
+        text=True
+    )
+    ready_line: str = mock_server_process.stdout.readline()
+    if MOCK_SERVER_READY_MARKER not in ready_line:
+        mock_server_process.kill()
+        raise RuntimeError(f"Mock server didn't start: {ready_line!r}")
+
+    return (mock_server_process, ready_line.split(MOCK_SERVER_READY_MARKER, 1)[1].strip())
+
+
+def get_percentile(values: list[float], percentile: float) -> float:
+    """Get the percentile with the nearest rank method.
+
+    Args:
+        values (list[float]): measured values.
+        percentile (float): percentile from 0 to 100.
+
+    Returns:
+        float: percentile value or 0 if there are no values.
+    """
+    if not values:
+        return 0.0
+
+    sorted_values: list[float] = sorted(values)
+    rank: int = max(0, min(len(sorted_values) - 1, round(percentile / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def get_peak_rss_megabytes() -> float:
+    """Get the peak resident memory of the benchmark process.
+
+    Returns:
+        float: peak RSS in megabytes.
+    """
+    ## ru_maxrss is in kilobytes on Linux and in bytes on macOS: ##
+    max_rss: int = getrusage(RUSAGE_SELF).ru_maxrss
+    return max_rss / (1024 * 1024 if platform == "darwin" else 1024)
+
+
+def run_sync(arguments: Namespace, dir_path: str) -> dict[str, Any]:
+    """Run the sync workflow of the command line interface: log in, query all listings
+    and download new homeworks with the manifest.
+
+    Args:
+        arguments (Namespace): command line arguments.
+        dir_path (str): folder for the homeworks folder.
+
+    Returns:
+        dict[str, Any]: run results: time, counters and request latencies by endpoint.
+    """
+    from journal_downloader import HomeworksDownloader
+    from journal_homework_models import HomeworkAPI
+    from journal_homework_query import HomeworksQuery
+    from journal_requests import JournalHomeworkScrapper, UserInputData
+    from homeworks_manifest import HomeworksManifest
+
+    rate_limiter: Optional[JournalRateLimiter] = None
+    if arguments.api_rate or arguments.files_rate:
+        rate_limiter = JournalRateLimiter(api_rate=arguments.api_rate or None, files_rate=arguments.files_rate or None)
+    transport: TimingTransport = TimingTransport(
+        concurrency=arguments.concurrency,
+        max_retries=arguments.max_retries,
+        rate_limiter=rate_limiter
+    )
+    start_time: float = perf_counter()
+    journal_scrapper: JournalHomeworkScrapper = JournalHomeworkScrapper(
+        login_data=UserInputData(
+            APPLICATION_KEY="benchmark",
+            ID_CITY="null",
+            PASSWORD="benchmark",
+            USERNAME="benchmark"
+        ),
+        transport=transport
+    )
+    query: HomeworksQuery = HomeworksQuery(
+        journal_homework_api=HomeworkAPI(journal_scrapper=journal_scrapper),
+        statuses=arguments.status,
+        group_ids=range(arguments.groups),
+        max_workers=arguments.concurrency
+    )
+    downloader: HomeworksDownloader = HomeworksDownloader(
+        journal_scrapper=journal_scrapper,
+        concurrency=arguments.concurrency,
+        per_host_limit=arguments.per_host_limit,
+        dir_path=dir_path,
+        manifest=HomeworksManifest(dir_path=dir_path)
+    )
+
+    counters: dict[str, int] = {"saved": 0, "skipped": 0, "failed": 0}
+    for result in downloader.download(query):
+        if not result.is_successful:
+            counters["failed"] += 1
+        elif result.is_skipped:
+            counters["skipped"] += 1
+        else:
+            counters["saved"] += 1
+
+    elapsed_time: float = perf_counter() - start_time
+    transport.close()
+    return {"time": elapsed_time, "counters": counters, "latencies": transport.latencies}
+
+
+def print_run(run_name: str, run: dict[str, Any], file_size: int) -> None:
+    """Print the run throughput and latency percentiles.
+
+    Args:
+        run_name (str): run name.
+        run (dict[str, Any]): run_sync results.
+        file_size (int): size of every homework file in bytes.
+    """
+    BYTES_IN_MEGABYTE: int = 1024 * 1024
+    MILLISECONDS_IN_SECOND: int = 1000
+
+    counters: dict[str, int] = run["counters"]
+    homeworks_count: int = sum(counters.values())
+    print(
+        f"{run_name}: {homeworks_count} homeworks in {run['time']:.2f} s"
+        f" ({homeworks_count / run['time']:.1f} homeworks/s,"
+        f" {counters['saved'] * file_size / BYTES_IN_MEGABYTE / run['time']:.1f} MB/s),"
+        f" saved: {counters['saved']}, skipped: {counters['skipped']}, failed: {counters['failed']}"
+    )
+    print(f"  {'endpoint':<10} {'requests':>9} {'p50':>10} {'p99':>10}")
+    for endpoint, latencies in sorted(run["latencies"].items()):
+        print(
+            f"  {endpoint:<10} {len(latencies):>9}"
+            f" {get_percentile(latencies, 50) * MILLISECONDS_IN_SECOND:>7.1f} ms"
+            f" {get_percentile(latencies, 99) * MILLISECONDS_IN_SECOND:>7.1f} ms"
+        )
+
+
+def main() -> None:
+    """Run the cold sync (all files are new) and the warm sync (nothing to download) against the mock Journal API."""
+    parser: ArgumentParser = ArgumentParser(description="Measure the sync throughput against the mock Journal API.")
+    parser.add_argument("--groups", type=int, default=2, help="groups count")
+    parser.add_argument("-s", "--status", type=int, action="append", help="homework status (repeatable, default: 1)")
+    parser.add_argument("--homeworks-per-page", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3, help="not empty pages of every listing")
+    parser.add_argument("--file-size", type=int, default=256 * 1024, help="file size in bytes")
+    parser.add_argument("--latency", type=float, default=0.005, help="mock server latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.002)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of the requests with 503 response")
+    parser.add_argument("--rate-limit", type=float, help="mock server requests per second, the rest get 429")
+    parser.add_argument("--content-disposition", choices=CONTENT_DISPOSITION_FORMATS, default="mixed")
+    parser.add_argument("-c", "--concurrency", type=int, default=8, help="requests at the same time")
+    parser.add_argument("--per-host-limit", type=int, default=8, help="downloads from one host at the same time")
+    parser.add_argument("--max-retries", type=int, default=3, help="retries of the failed requests")
+    parser.add_argument("--api-rate", type=float, default=0, help="client API requests per second (default: 0, unlimited)")
+    parser.add_argument("--files-rate", type=float, default=0, help="client file requests per second (default: 0, unlimited)")
+    parser.add_argument("--log-level", default="INFO", help="level of the logs file records, like in main.py")
+    arguments: Namespace = parser.parse_args()
+    arguments.status = arguments.status or [1]
+
+    mock_server_process, api_url = start_mock_server(arguments=arguments)
+    ## config.py reads JOURNAL_API_URL on import, so the local modules are imported after it's set: ##
+    environ["JOURNAL_API_URL"] = api_url
+    working_dir: str = getcwd()
+    try:
+        with TemporaryDirectory(prefix="journal-benchmark-") as dir_path:
+            chdir(dir_path)
+            from journal_loggers import setup_logging
+
+            setup_logging(level=arguments.log_level, log_path=join(dir_path, "LOGS.log"))
+            cold_run: dict[str, Any] = run_sync(arguments=arguments, dir_path=dir_path)
+            warm_run: dict[str, Any] = run_sync(arguments=arguments, dir_path=dir_path)
+    finally:
+        chdir(working_dir)
+        mock_server_process.terminate()
+        mock_server_process.wait()
+
+    from journal_json import get_backend_name
+
+    print(f"Mock Journal API: {api_url}, json backend: {get_backend_name()}")
+    print_run(run_name="cold sync", run=cold_run, file_size=arguments.file_size)
+    print_run(run_name="warm sync", run=warm_run, file_size=arguments.file_size)
+    print(f"peak RSS: {get_peak_rss_megabytes():.1f} MB")
+
+    if cold_run["counters"]["failed"] or warm_run["counters"]["failed"]:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,13 @@
 
 ## Built-in modules: ##
 from os.path import dirname
-from os import PathLike
+from os import PathLike, environ
 
 
 current_dir_path: PathLike = dirname(__file__)
-JOURNAL_LOGIN_URL: str = "https://msapi.top-academy.ru/api/v2/auth/login"
\ No newline at end of file
+## Folder in the output folder with the subject folders and the hidden state files of all modules: ##
+HOMEWORKS_FOLDER_NAME: str = "homeworks"
+## Can be changed with the environment variable to use the local stub server: ##
+JOURNAL_API_URL: str = environ.get("JOURNAL_API_URL", "https://msapi.top-academy.ru/api/v2")
+JOURNAL_LOGIN_URL: str = f"{JOURNAL_API_URL}/auth/login"
+JOURNAL_HOMEWORK_LIST_URL: str = f"{JOURNAL_API_URL}/homework/operations/list"
\ No newline at end of file
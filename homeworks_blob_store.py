@@ -0,0 +1,158 @@
+
+## Built-in modules: ##
+from hashlib import sha256
+from os import PathLike, makedirs, replace, remove, link, symlink
+from os.path import join, exists, dirname, relpath, samefile
+from shutil import copyfile
+from threading import Lock
+from typing import Optional
+
+## Local modules: ##
+from config import current_dir_path, HOMEWORKS_FOLDER_NAME
+
+
+HASH_CHUNK_SIZE: int = 1024 * 1024
+
+
+def hash_file(file_path: PathLike) -> tuple[str, int]:
+    """Get the sha256 and the size of the file, reading it by chunks.
+
+    Args:
+        file_path (PathLike): path to the file.
+
+    Returns:
+        tuple[str, int]: sha256 hex digest and size in bytes.
+    """
+    file_hash = sha256()
+    size: int = 0
+    with open(file=file_path, mode="rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            file_hash.update(chunk)
+            size += len(chunk)
+
+    return file_hash.hexdigest(), size
+
+
+class HomeworksBlobStore:
+    """Content-addressed store of the homework files: every file is kept once
+    under homeworks/.blobs/<first 2 hex chars>/<sha256>, however many homeworks have it.
+    Files of the subject/theme tree are hardlinks (or symlinks, or copies) of the blobs.
+    Files are downloaded to homeworks/.partial before they are stored."""
+    BLOBS_FOLDER_NAME: str = ".blobs"
+    ## Partial downloads are kept near the blobs, so they are not visible in the subject folders
+    ## and the complete files are moved into the store by the atomic rename: ##
+    PARTIAL_FOLDER_NAME: str = ".partial"
+    SHARD_LENGTH: int = 2
+    HARDLINK_MODE: str = "hardlink"
+    SYMLINK_MODE: str = "symlink"
+    COPY_MODE: str = "copy"
+    LINK_MODES: tuple[str, ...] = (HARDLINK_MODE, SYMLINK_MODE, COPY_MODE)
+
+    def __init__(self, dir_path: Optional[PathLike] = current_dir_path, link_mode: Optional[str] = None) -> None:
+        """Initialize the store. Blobs folder is created on the first stored file.
+
+        Args:
+            dir_path (Optional[PathLike], optional): path to homeworks folder. Defaults to current_dir_path.
+            link_mode (Optional[str], optional): hardlink, symlink or copy. Defaults to None
+                (hardlink, then symlink if the filesystem has no hardlinks, then copy).
+
+        Raises:
+            ValueError: if link_mode is unknown.
+        """
+        if link_mode is not None and link_mode not in self.LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode}. Use one of: {', '.join(self.LINK_MODES)}.")
+
+        self.blobs_path: PathLike = join(dir_path, HOMEWORKS_FOLDER_NAME, self.BLOBS_FOLDER_NAME)
+        self.partial_path: PathLike = join(dir_path, HOMEWORKS_FOLDER_NAME, self.PARTIAL_FOLDER_NAME)
+        self.link_modes: tuple[str, ...] = (link_mode,) if link_mode is not None else self.LINK_MODES
+        self._lock: Lock = Lock()
+
+    def get_blob_path(self, file_hash: str) -> PathLike:
+        """Get the blob path of the file content.
+
+        Args:
+            file_hash (str): sha256 hex digest of the file.
+
+        Returns:
+            PathLike: blob path.
+        """
+        return join(self.blobs_path, file_hash[:self.SHARD_LENGTH], file_hash)
+
+    def __contains__(self, file_hash: Optional[str]) -> bool:
+        """Check if the file content is already stored"""
+        return bool(file_hash) and exists(self.get_blob_path(file_hash=file_hash))
+
+    def store(self, temp_path: PathLike, file_hash: str) -> PathLike:
+        """Move the downloaded file into the store. If the same content is already stored,
+        the downloaded file is removed and the stored blob is used.
+
+        Args:
+            temp_path (PathLike): path to the downloaded file (in the same filesystem as the store).
+            file_hash (str): sha256 hex digest of the file, computed while it was downloaded.
+
+        Returns:
+            PathLike: blob path.
+        """
+        blob_path: PathLike = self.get_blob_path(file_hash=file_hash)
+        if exists(blob_path):
+            remove(temp_path)
+            return blob_path
+
+        makedirs(dirname(blob_path), exist_ok=True)
+        ## Workers with the same content replace the blob with the same bytes, so it's not locked: ##
+        replace(temp_path, blob_path)
+        return blob_path
+
+    def link(self, file_hash: str, target_path: PathLike) -> str:
+        """Create the file of the subject/theme tree from the blob.
+        The first link mode, which works on this filesystem, is kept for the next files.
+
+        Args:
+            file_hash (str): sha256 hex digest of the stored file.
+            target_path (PathLike): path of the tree file. It must not exist.
+
+        Raises:
+            OSError: if the file couldn't be created with any link mode.
+
+        Returns:
+            str: used link mode.
+        """
+        blob_path: PathLike = self.get_blob_path(file_hash=file_hash)
+        link_error: Optional[OSError] = None
+
+        for link_mode in self.link_modes:
+            try:
+                if link_mode == self.HARDLINK_MODE:
+                    link(blob_path, target_path)
+                elif link_mode == self.SYMLINK_MODE:
+                    symlink(relpath(blob_path, dirname(target_path)), target_path)
+                else:
+                    copyfile(blob_path, target_path)
+            except FileExistsError:
+                raise
+            except OSError as error:
+                link_error = error
+                with self._lock:
+                    ## Don't try the failed mode for the next files: ##
+                    if len(self.link_modes) > 1 and self.link_modes[0] == link_mode:
+                        self.link_modes = self.link_modes[1:]
+                continue
+
+            return link_mode
+
+        raise link_error
+
+    def is_linked(self, file_hash: str, target_path: PathLike) -> bool:
+        """Check if the tree file is the hardlink or symlink of the blob.
+
+        Args:
+            file_hash (str): sha256 hex digest of the stored file.
+            target_path (PathLike): path of the tree file.
+
+        Returns:
+            bool: True if the tree file is the same file as the blob.
+        """
+        try:
+            return samefile(self.get_blob_path(file_hash=file_hash), target_path)
+        except OSError:
+            return False
@@ -0,0 +1,292 @@
+
+## Built-in modules: ##
+from dataclasses import dataclass
+from os import PathLike, makedirs
+from os.path import join, dirname, exists, abspath
+from sqlite3 import Connection, Cursor, connect
+from threading import Lock
+from time import time
+from typing import Iterable, Optional
+from urllib.request import pathname2url
+
+## Local modules: ##
+from journal_homework_models import HomeworkModel
+from config import current_dir_path, HOMEWORKS_FOLDER_NAME
+
+
+@dataclass
+class HomeworkStatusTransition(object):
+    """Dataclass to hold the observed status change of the homework.
+    from_status is None when the homework was observed for the first time."""
+    group_id: int
+    file_url_path: str
+    theme: str
+    subject_name: str
+    teacher_name: str
+    creation_time: Optional[float]
+    from_status: Optional[int]
+    to_status: int
+    observed_at: float
+
+
+class HomeworksEventStore(object):
+    """Local SQLite store of the observed homeworks. The last snapshot of every homework is kept
+    in the homeworks table, every status change is appended to the status_transitions table,
+    so reports like "what changed since T" are local indexed queries without the API requests."""
+    DATABASE_FILENAME: str = ".events.sqlite3"
+    ## PRAGMA user_version of the store with the canonical creation time keys: ##
+    SCHEMA_VERSION: int = 1
+    SCHEMA: str = """
+        CREATE TABLE IF NOT EXISTS homeworks (
+            id INTEGER PRIMARY KEY,
+            group_id INTEGER NOT NULL,
+            file_url_path TEXT NOT NULL,
+            creation_time_key TEXT NOT NULL,
+            theme TEXT NOT NULL,
+            status INTEGER,
+            teacher_name TEXT,
+            subject_name TEXT,
+            comment TEXT,
+            creation_time REAL,
+            first_seen_at REAL NOT NULL,
+            last_seen_at REAL NOT NULL,
+            UNIQUE (group_id, file_url_path, creation_time_key, theme)
+        );
+        CREATE INDEX IF NOT EXISTS homeworks_group_status ON homeworks (group_id, status);
+        CREATE INDEX IF NOT EXISTS homeworks_status ON homeworks (status);
+        CREATE INDEX IF NOT EXISTS homeworks_creation_time ON homeworks (creation_time);
+        CREATE TABLE IF NOT EXISTS status_transitions (
+            id INTEGER PRIMARY KEY,
+            homework_id INTEGER NOT NULL REFERENCES homeworks (id),
+            group_id INTEGER NOT NULL,
+            from_status INTEGER,
+            to_status INTEGER,
+            observed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS status_transitions_observed_at ON status_transitions (observed_at);
+        CREATE INDEX IF NOT EXISTS status_transitions_group_observed_at ON status_transitions (group_id, observed_at);
+        CREATE INDEX IF NOT EXISTS status_transitions_to_status ON status_transitions (to_status, observed_at);
+    """
+
+    def __init__(
+        self,
+        database_path: Optional[PathLike] = None,
+        dir_path: Optional[PathLike] = current_dir_path,
+        read_only: bool = False
+    ) -> None:
+        """Open the store. Missing database is created with its tables and indexes, if it's not read only.
+
+        Args:
+            database_path (Optional[PathLike], optional): SQLite database path.
+                Defaults to None (.events.sqlite3 in the homeworks folder of dir_path).
+            dir_path (Optional[PathLike], optional): path to homeworks folder. Defaults to current_dir_path.
+            read_only (bool, optional): open the existing database only for the queries. Defaults to False.
+
+        Raises:
+            FileNotFoundError: if the read only database doesn't exist.
+        """
+        self.database_path: PathLike = database_path or join(dir_path, HOMEWORKS_FOLDER_NAME, self.DATABASE_FILENAME)
+        self._lock: Lock = Lock()
+        if read_only:
+            if not exists(self.database_path):
+                raise FileNotFoundError(f"Event store {self.database_path} doesn't exist.")
+
+            self._connection: Connection = connect(
+                f"file:{pathname2url(abspath(self.database_path))}?mode=ro",
+                uri=True,
+                check_same_thread=False
+            )
+            return
+
+        makedirs(dirname(self.database_path) or ".", exist_ok=True)
+
+        ## Connection is shared by the query and watcher threads, all calls are serialized by the lock: ##
+        self._connection: Connection = connect(self.database_path, check_same_thread=False)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.executescript(self.SCHEMA)
+            self._migrate()
+
+    def _migrate(self) -> None:
+        """Rewrite the creation time keys of the older stores with HomeworkModel.get_creation_time_key.
+        It's called under the lock once per database, the version is kept in PRAGMA user_version."""
+        schema_version: int = self._connection.execute("PRAGMA user_version").fetchone()[0]
+        if schema_version >= self.SCHEMA_VERSION:
+            return
+
+        with self._connection:
+            rows: list[tuple[int, str]] = self._connection.execute(
+                "SELECT id, creation_time_key FROM homeworks"
+            ).fetchall()
+            self._connection.executemany(
+                ## The same homework, which was stored with both keys, keeps its first row: ##
+                "UPDATE OR IGNORE homeworks SET creation_time_key = ? WHERE id = ?",
+                [
+                    (HomeworkModel.get_creation_time_key(creation_time_key), homework_id)
+                    for homework_id, creation_time_key in rows
+                    if HomeworkModel.get_creation_time_key(creation_time_key) != creation_time_key
+                ]
+            )
+            self._connection.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def _record_homework(self, cursor: Cursor, homework: HomeworkModel, group_id: int, observed_at: float) -> bool:
+        """Update the homework snapshot and append the status transition if the status was changed.
+
+        Args:
+            cursor (Cursor): cursor of the open transaction.
+            homework (HomeworkModel): observed homework.
+            group_id (int): homework group id.
+            observed_at (float): unix timestamp of the observation.
+
+        Returns:
+            bool: True if the status transition was recorded.
+        """
+        file_url_path, creation_time_key, theme = homework.identity
+        creation_time: Optional[float] = homework.creation_time.timestamp() if homework.creation_time else None
+        row: Optional[tuple[int, Optional[int]]] = cursor.execute(
+            "SELECT id, status FROM homeworks "
+            "WHERE group_id = ? AND file_url_path = ? AND creation_time_key = ? AND theme = ?",
+            (group_id, file_url_path, creation_time_key, theme)
+        ).fetchone()
+
+        if row is None:
+            cursor.execute(
+                "INSERT INTO homeworks (group_id, file_url_path, creation_time_key, theme, status, teacher_name, "
+                "subject_name, comment, creation_time, first_seen_at, last_seen_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    group_id, file_url_path, creation_time_key, theme, homework.status, homework.teacher_name,
+                    homework.subject_name, homework.comment, creation_time, observed_at, observed_at
+                )
+            )
+            homework_id: int = cursor.lastrowid
+            previous_status: Optional[int] = None
+        else:
+            homework_id, previous_status = row
+            cursor.execute(
+                "UPDATE homeworks SET status = ?, teacher_name = ?, subject_name = ?, comment = ?, last_seen_at = ? "
+                "WHERE id = ?",
+                (homework.status, homework.teacher_name, homework.subject_name, homework.comment, observed_at, homework_id)
+            )
+            if previous_status == homework.status:
+                return False
+
+        cursor.execute(
+            "INSERT INTO status_transitions (homework_id, group_id, from_status, to_status, observed_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (homework_id, group_id, previous_status, homework.status, observed_at)
+        )
+        return True
+
+    def record_many(self, observations: Iterable[tuple[int, HomeworkModel]], observed_at: Optional[float] = None) -> int:
+        """Record the observed homeworks in one transaction.
+
+        Args:
+            observations (Iterable[tuple[int, HomeworkModel]]): group id and homework pairs.
+            observed_at (Optional[float], optional): unix timestamp of the observation. Defaults to None (now).
+
+        Returns:
+            int: count of the recorded status transitions.
+        """
+        observed_at: float = observed_at or time()
+        transitions_count: int = 0
+        with self._lock, self._connection:
+            cursor: Cursor = self._connection.cursor()
+            for group_id, homework in observations:
+                transitions_count += self._record_homework(
+                    cursor=cursor,
+                    homework=homework,
+                    group_id=group_id,
+                    observed_at=observed_at
+                )
+
+        return transitions_count
+
+    def record(self, homework: HomeworkModel, group_id: int, observed_at: Optional[float] = None) -> bool:
+        """Record one observed homework. Use record_many for the whole listing, it's one transaction.
+
+        Args:
+            homework (HomeworkModel): observed homework.
+            group_id (int): homework group id.
+            observed_at (Optional[float], optional): unix timestamp of the observation. Defaults to None (now).
+
+        Returns:
+            bool: True if the status transition was recorded.
+        """
+        return bool(self.record_many(observations=[(group_id, homework)], observed_at=observed_at))
+
+    def changes_since(
+        self,
+        since: float,
+        group_id: Optional[int] = None,
+        to_status: Optional[int] = None,
+        include_first_seen: bool = False
+    ) -> list[HomeworkStatusTransition]:
+        """Get the status transitions observed after the time.
+
+        Args:
+            since (float): unix timestamp.
+            group_id (Optional[int], optional): only transitions of the group. Defaults to None.
+            to_status (Optional[int], optional): only transitions to the status. Defaults to None.
+            include_first_seen (bool, optional): include first observations of the homeworks. Defaults to False.
+
+        Returns:
+            list[HomeworkStatusTransition]: transitions in the observation order.
+        """
+        conditions: list[str] = ["status_transitions.observed_at > ?"]
+        parameters: list[float | int] = [since]
+        if group_id is not None:
+            conditions.append("status_transitions.group_id = ?")
+            parameters.append(group_id)
+        if to_status is not None:
+            conditions.append("status_transitions.to_status = ?")
+            parameters.append(to_status)
+        if not include_first_seen:
+            conditions.append("status_transitions.from_status IS NOT NULL")
+
+        with self._lock:
+            rows: list[tuple] = self._connection.execute(
+                "SELECT status_transitions.group_id, homeworks.file_url_path, homeworks.theme, homeworks.subject_name, "
+                "homeworks.teacher_name, homeworks.creation_time, status_transitions.from_status, "
+                "status_transitions.to_status, status_transitions.observed_at "
+                "FROM status_transitions JOIN homeworks ON homeworks.id = status_transitions.homework_id "
+                f"WHERE {' AND '.join(conditions)} "
+                "ORDER BY status_transitions.observed_at, status_transitions.id",
+                parameters
+            ).fetchall()
+
+        return [HomeworkStatusTransition(*row) for row in rows]
+
+    def count_by_status(self, group_id: Optional[int] = None) -> dict[int, int]:
+        """Count the homeworks by their last observed status.
+
+        Args:
+            group_id (Optional[int], optional): only homeworks of the group. Defaults to None.
+
+        Returns:
+            dict[int, int]: homeworks count by the status.
+        """
+        with self._lock:
+            if group_id is None:
+                rows: list[tuple[int, int]] = self._connection.execute(
+                    "SELECT status, COUNT(*) FROM homeworks GROUP BY status"
+                ).fetchall()
+            else:
+                rows: list[tuple[int, int]] = self._connection.execute(
+                    "SELECT status, COUNT(*) FROM homeworks WHERE group_id = ? GROUP BY status",
+                    (group_id,)
+                ).fetchall()
+
+        return dict(rows)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self) -> "HomeworksEventStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
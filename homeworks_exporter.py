@@ -0,0 +1,200 @@
+
+## Built-in modules: ##
+from csv import writer as csv_writer
+from datetime import datetime
+from importlib.util import find_spec
+from json import dumps
+from os import PathLike, makedirs, replace, remove
+from os.path import dirname, splitext, exists
+from typing import Any, Iterable, Optional, TextIO
+
+## Local modules: ##
+from journal_homework_models import HomeworkModel
+
+
+## Columns of the exported homeworks, group id first, then the HomeworkModel fields: ##
+EXPORT_COLUMNS: tuple[str, ...] = (
+    "group_id",
+    "status",
+    "teacher_name",
+    "subject_name",
+    "file_url_path",
+    "comment",
+    "creation_time",
+    "theme",
+)
+
+HomeworkRow = tuple[int, Optional[int], str, str, str, str, Optional[datetime], str]
+
+
+class _CsvBatchWriter(object):
+    """CSV writer with the header row, creation time is ISO formatted."""
+    def __init__(self, file_path: PathLike) -> None:
+        self.file: TextIO = open(file=file_path, mode="w", newline="", encoding="utf-8")
+        self.writer = csv_writer(self.file)
+        self.writer.writerow(EXPORT_COLUMNS)
+
+    def write_batch(self, rows: list[HomeworkRow]) -> None:
+        CREATION_TIME_INDEX: int = EXPORT_COLUMNS.index("creation_time")
+
+        for row in rows:
+            values: list[Any] = list(row)
+            values[CREATION_TIME_INDEX] = values[CREATION_TIME_INDEX].isoformat() if values[CREATION_TIME_INDEX] else ""
+            self.writer.writerow(values)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _JsonLinesBatchWriter(object):
+    """JSON Lines writer: one object per homework, creation time is ISO formatted or null."""
+    def __init__(self, file_path: PathLike) -> None:
+        self.file: TextIO = open(file=file_path, mode="w", encoding="utf-8")
+
+    def write_batch(self, rows: list[HomeworkRow]) -> None:
+        lines: list[str] = []
+        for row in rows:
+            record: dict[str, Any] = dict(zip(EXPORT_COLUMNS, row))
+            record["creation_time"] = record["creation_time"].isoformat() if record["creation_time"] else None
+            lines.append(dumps(record, ensure_ascii=False))
+
+        self.file.write("\n".join(lines) + "\n")
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ParquetBatchWriter(object):
+    """Parquet writer: every batch is one row group, so the reader can also go batch by batch."""
+    def __init__(self, file_path: PathLike) -> None:
+        import pyarrow
+        import pyarrow.parquet
+
+        self.pyarrow = pyarrow
+        self.schema = pyarrow.schema([
+            ("group_id", pyarrow.int64()),
+            ("status", pyarrow.int8()),
+            ("teacher_name", pyarrow.string()),
+            ("subject_name", pyarrow.string()),
+            ("file_url_path", pyarrow.string()),
+            ("comment", pyarrow.string()),
+            ("creation_time", pyarrow.timestamp("s")),
+            ("theme", pyarrow.string()),
+        ])
+        self.writer = pyarrow.parquet.ParquetWriter(file_path, self.schema, compression="zstd")
+
+    def write_batch(self, rows: list[HomeworkRow]) -> None:
+        columns: dict[str, list[Any]] = {column: list(values) for column, values in zip(EXPORT_COLUMNS, zip(*rows))}
+        self.writer.write_table(self.pyarrow.Table.from_pydict(columns, schema=self.schema))
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class HomeworksExporter(object):
+    """Exporter of the homework listings to CSV, JSON Lines or Parquet for the analytics jobs.
+    Homeworks are written by fixed-size batches while they are streamed from the query,
+    so memory doesn't depend on the listings size. The file is written near the output path
+    and renamed only after the last batch, so readers never see the partial export."""
+    CSV_FORMAT: str = "csv"
+    JSONL_FORMAT: str = "jsonl"
+    PARQUET_FORMAT: str = "parquet"
+    FORMATS: tuple[str, ...] = (CSV_FORMAT, JSONL_FORMAT, PARQUET_FORMAT)
+    PART_FILE_SUFFIX: str = ".part"
+
+    def __init__(self, output_path: PathLike, export_format: Optional[str] = None, batch_size: int = 1024) -> None:
+        """Initialize the exporter. The output file is created by export.
+
+        Args:
+            output_path (PathLike): path to the export file.
+            export_format (Optional[str], optional): csv, jsonl or parquet. Defaults to None (by the output extension).
+            batch_size (int, optional): homeworks written at once (Parquet row group size). Defaults to 1024.
+
+        Raises:
+            ValueError: if the format is unknown, pyarrow is not installed for Parquet or batch_size is less than 1.
+        """
+        export_format: str = (export_format or splitext(output_path)[1].lstrip(".")).lower()
+        if export_format not in self.FORMATS:
+            raise ValueError(f"Unknown export format: {export_format or output_path}. Use one of: {', '.join(self.FORMATS)}.")
+        if export_format == self.PARQUET_FORMAT and find_spec("pyarrow") is None:
+            raise ValueError("Parquet export requires pyarrow. Install it with: pip install pyarrow.")
+        if batch_size < 1:
+            raise ValueError("Exporter batch_size must be positive.")
+
+        self.output_path: PathLike = output_path
+        self.export_format: str = export_format
+        self.batch_size: int = batch_size
+
+    @staticmethod
+    def get_row(group_id: int, homework: HomeworkModel) -> HomeworkRow:
+        """Get the export row of the homework.
+
+        Args:
+            group_id (int): homework group id.
+            homework (HomeworkModel): homework.
+
+        Returns:
+            HomeworkRow: values in the EXPORT_COLUMNS order.
+        """
+        return (
+            group_id,
+            homework.status,
+            homework.teacher_name,
+            homework.subject_name,
+            homework.file_url_path,
+            homework.comment,
+            homework.creation_time,
+            homework.theme,
+        )
+
+    def _open_writer(self, file_path: PathLike) -> _CsvBatchWriter | _JsonLinesBatchWriter | _ParquetBatchWriter:
+        """Open the batch writer of the export format.
+
+        Args:
+            file_path (PathLike): path to the written file.
+
+        Returns:
+            _CsvBatchWriter | _JsonLinesBatchWriter | _ParquetBatchWriter: batch writer.
+        """
+        if self.export_format == self.CSV_FORMAT:
+            return _CsvBatchWriter(file_path=file_path)
+        if self.export_format == self.JSONL_FORMAT:
+            return _JsonLinesBatchWriter(file_path=file_path)
+        return _ParquetBatchWriter(file_path=file_path)
+
+    def export(self, sourced_homeworks: Iterable[tuple[int, int, HomeworkModel]]) -> int:
+        """Write the homeworks to the export file.
+
+        Args:
+            sourced_homeworks (Iterable[tuple[int, int, HomeworkModel]]): group id, status and homework,
+                like HomeworksQuery.iter_with_source().
+
+        Returns:
+            int: count of the exported homeworks.
+        """
+        part_path: PathLike = f"{self.output_path}{self.PART_FILE_SUFFIX}"
+        makedirs(dirname(part_path) or ".", exist_ok=True)
+
+        exported_count: int = 0
+        rows: list[HomeworkRow] = []
+        writer = self._open_writer(file_path=part_path)
+        try:
+            for group_id, _, homework in sourced_homeworks:
+                rows.append(self.get_row(group_id=group_id, homework=homework))
+                if len(rows) >= self.batch_size:
+                    writer.write_batch(rows=rows)
+                    exported_count += len(rows)
+                    rows = []
+
+            if rows:
+                writer.write_batch(rows=rows)
+                exported_count += len(rows)
+        except BaseException:
+            writer.close()
+            if exists(part_path):
+                remove(part_path)
+            raise
+
+        writer.close()
+        replace(part_path, self.output_path)
+        return exported_count
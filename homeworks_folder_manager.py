@@ -1,25 +1,105 @@
 
 ## Built-in modules: ##
-from os import mkdir, listdir
+from contextlib import contextmanager
+from os import listdir, makedirs, remove
 from os import PathLike
 from os.path import join, exists
-from typing import Optional
+from threading import Lock
+from typing import Generator, Optional
 
 ## Local modules: ##
 from journal_homework_models import HomeworkModel
-from journal_requests import JournalHomeworkScrapper, UserInputData
+from homeworks_blob_store import HomeworksBlobStore
+from journal_requests import JournalHomeworkScrapper, UserInputData, DownloadedHomeworkFile
 from journal_loggers import folder_manager_logger
-from config import current_dir_path
+from journal_metrics import get_metrics_registry, DISK_WRITE_DURATION_METRIC
+from config import current_dir_path, HOMEWORKS_FOLDER_NAME
+
+
+class HomeworksFolderIndex:
+    """In-memory index of the created folders and taken filenames, shared by the managers of one run.
+    Every folder is created and listed once, filename checks are set lookups.
+    Filename check and file creation are atomic per folder, so workers of different folders don't wait each other."""
+    def __init__(self) -> None:
+        """Initialize the empty index."""
+        self._created_folders: set[str] = set()
+        self._taken_filenames: dict[str, set[str]] = {}
+        self._folder_locks: dict[str, Lock] = {}
+        self._lock: Lock = Lock()
+
+    def ensure_folder(self, folder_path: PathLike) -> None:
+        """Create the folder, if it wasn't created or seen in this run.
+
+        Args:
+            folder_path (PathLike): folder path.
+        """
+        folder_key: str = str(folder_path)
+        if folder_key in self._created_folders:
+            return
+
+        makedirs(folder_path, exist_ok=True)
+        with self._lock:
+            self._created_folders.add(folder_key)
+
+    def _get_folder_lock(self, folder_key: str) -> Lock:
+        """Get the lock of the folder filenames.
+
+        Args:
+            folder_key (str): folder path.
+
+        Returns:
+            Lock: folder lock.
+        """
+        with self._lock:
+            if folder_key not in self._folder_locks:
+                self._folder_locks[folder_key] = Lock()
+
+            return self._folder_locks[folder_key]
+
+    @contextmanager
+    def lock_folder(self, folder_path: PathLike) -> Generator[set[str], None, None]:
+        """Lock the folder filenames. Folder is listed on the first lock only,
+        the caller must add the filenames it creates to the yielded set.
+
+        Args:
+            folder_path (PathLike): existing folder path.
+
+        Yields:
+            Generator[set[str], None, None]: taken filenames of the folder.
+        """
+        folder_key: str = str(folder_path)
+        with self._get_folder_lock(folder_key=folder_key):
+            taken_filenames: Optional[set[str]] = self._taken_filenames.get(folder_key)
+            if taken_filenames is None:
+                taken_filenames: set[str] = set(listdir(folder_path))
+                self._taken_filenames[folder_key] = taken_filenames
+
+            yield taken_filenames
+
+    def forget_folder(self, folder_path: PathLike) -> None:
+        """Remove the folder from the index, so it's created and listed again.
+        Use it if the folder was changed by another program.
+
+        Args:
+            folder_path (PathLike): folder path.
+        """
+        folder_key: str = str(folder_path)
+        with self._lock:
+            self._created_folders.discard(folder_key)
+            self._taken_filenames.pop(folder_key, None)
 
 
 class HomeworksFolderManager:
     """Class to save homeworks from the API to the disk."""
-    HOMEWORK_PAGE_NAME: str = "homeworks"
+    HOMEWORK_PAGE_NAME: str = HOMEWORKS_FOLDER_NAME
     
     def __init__(
         self,
         homework_to_save: HomeworkModel,
-        login_data: dict[str, str] | UserInputData
+        login_data: Optional[dict[str, str] | UserInputData] = None,
+        journal_scrapper: Optional[JournalHomeworkScrapper] = None,
+        blob_store: Optional[HomeworksBlobStore] = None,
+        folder_index: Optional[HomeworksFolderIndex] = None
     ) -> None:
         """Get HomeworkModel with login data and save it in file from the model in the disk.
 
@@ -33,44 +113,107 @@ class HomeworksFolderManager:
                 ID_CITY = YOUR_ID_CITY (sometimes it can be "null").
                 PASSWORD = YOUR_PASSWORD
                 USER_NAME = YOUR_USERNAME
+            journal_scrapper (Optional[JournalHomeworkScrapper]): shared logged in scrapper.
+                Pass the same scrapper to all managers, so the Journal API login is made once per run.
+            blob_store (Optional[HomeworksBlobStore]): store of the files content.
+                Defaults to None (store in the homeworks folder of save_to_path dir_path).
+            folder_index (Optional[HomeworksFolderIndex]): index of the created folders and taken filenames.
+                Pass the same index to all managers of the run. Defaults to None (new index).
+        
+        Raises:
+            ValueError: if neither login_data nor journal_scrapper were passed.
         """
+        if login_data is None and journal_scrapper is None:
+            raise ValueError("HomeworksFolderManager needs login_data or journal_scrapper.")
+        
         self.homework_to_save = homework_to_save
         self.homework_subject_name: str = homework_to_save.subject_name
         self.homework_theme: str = homework_to_save.theme
         self.file_url_path: str = homework_to_save.file_url_path
-        self.login_data: dict[str, str] | UserInputData = login_data
-        
-        if not exists(self.HOMEWORK_PAGE_NAME):
-            mkdir(self.HOMEWORK_PAGE_NAME)
+        self.login_data: Optional[dict[str, str] | UserInputData] = login_data
+        self.journal_scrapper: Optional[JournalHomeworkScrapper] = journal_scrapper
+        self.blob_store: Optional[HomeworksBlobStore] = blob_store
+        self.folder_index: HomeworksFolderIndex = folder_index or HomeworksFolderIndex()
+        self.file_hash: Optional[str] = None
         
+    @staticmethod
+    def get_homework_filename(theme: str, file_ext: Optional[str], number: int = 1) -> str:
+        """Get the filename of the homework. Second and next files with the same theme
+        get the number postfix: theme.zip, theme_2.zip, theme_3.zip...
+
+        Args:
+            theme (str): homework theme.
+            file_ext (Optional[str]): file extension or None if the API didn't send it.
+            number (int, optional): number of the file with this theme. Defaults to 1.
+
+        Returns:
+            str: filename.
+        """
+        filename: str = theme if number == 1 else f"{theme}_{number}"
+        return f"{filename}.{file_ext}" if file_ext else filename
+
     @folder_manager_logger
-    def save_to_path(self, dir_path: Optional[PathLike] = current_dir_path) -> None:
-        """Save the homework to the disk.
+    def save_to_path(self, dir_path: Optional[PathLike] = current_dir_path) -> PathLike:
+        """Save the homework to the disk. The file is streamed to the partial file in homeworks/.partial,
+        moved to the blob store by its sha256 and linked into the subject folder,
+        so other readers never see partial files and the same content is stored once.
+        sha256 of the saved file is kept in self.file_hash.
 
         Args:
             dir_path (PathLike, optional): path to homeworks folder. Defaults to current_dir_path.
                 (homeworks folder in the current workspace)
+        
+        Returns:
+            PathLike: path to the saved file in the subject folder.
         """
         
         subject_folder_name: str = self.homework_subject_name
         homework_folder_path: PathLike = join(dir_path, self.HOMEWORK_PAGE_NAME, subject_folder_name)
         
-        if not exists(homework_folder_path):
-            mkdir(homework_folder_path)
+        if self.journal_scrapper is None:
+            self.journal_scrapper = JournalHomeworkScrapper(login_data=self.login_data)
+        if self.blob_store is None:
+            self.blob_store = HomeworksBlobStore(dir_path=dir_path)
+        self.folder_index.ensure_folder(folder_path=self.blob_store.partial_path)
+        homework_file: DownloadedHomeworkFile = self.journal_scrapper.stream_homework_file(
+            file_url_path=self.file_url_path,
+            dir_path=self.blob_store.partial_path
+        )
         
-        homework_filename: str = self.homework_theme
-        homeworks_scrapper: JournalHomeworkScrapper = JournalHomeworkScrapper(login_data=self.login_data)
-        homework_file: bytes = homeworks_scrapper.download_homework_file(self.file_url_path)
-        homework_file_ext: str = homework_file[0]
-        COPY_POSTFIX: str = "_copy"
+        try:
+            with get_metrics_registry().timer(DISK_WRITE_DURATION_METRIC, operation="rename"):
+                self.blob_store.store(temp_path=homework_file.temp_path, file_hash=homework_file.sha256)
+        except BaseException:
+            if exists(homework_file.temp_path):
+                remove(homework_file.temp_path)
+            raise
         
-        if f"{homework_filename}.{homework_file_ext}" in listdir(homework_folder_path):
-            homework_filename: str = f"{homework_filename}{COPY_POSTFIX}"
-        homework_full_filename: str = f"{homework_filename}.{homework_file_ext}"
-
+        ## Subject folder is created after the download, so failed downloads don't leave empty folders: ##
+        self.folder_index.ensure_folder(folder_path=homework_folder_path)
+        with self.folder_index.lock_folder(folder_path=homework_folder_path) as taken_filenames:
+            number: int = 1
+            while True:
+                homework_filename: str = self.get_homework_filename(
+                    theme=self.homework_theme,
+                    file_ext=homework_file.file_ext,
+                    number=number
+                )
+                homework_file_path: PathLike = join(homework_folder_path, homework_filename)
+                if homework_filename not in taken_filenames:
+                    try:
+                        with get_metrics_registry().timer(DISK_WRITE_DURATION_METRIC, operation="link"):
+                            self.blob_store.link(file_hash=homework_file.sha256, target_path=homework_file_path)
+                    except FileExistsError:
+                        ## File was created by another program after the folder was listed: ##
+                        pass
+                    else:
+                        taken_filenames.add(homework_filename)
+                        break
+                    taken_filenames.add(homework_filename)
+                ## Same content with the same theme is already saved, don't add the numbered file: ##
+                if self.blob_store.is_linked(file_hash=homework_file.sha256, target_path=homework_file_path):
+                    break
+                number += 1
         
-        with open(
-            file=join(homework_folder_path, homework_full_filename),
-            mode="wb"
-        ) as file:
-            file.write(homework_file[1])
\ No newline at end of file
+        self.file_hash = homework_file.sha256
+        return homework_file_path
@@ -0,0 +1,155 @@
+
+## Built-in modules: ##
+from json import dumps, loads, JSONDecodeError
+from os import PathLike, makedirs, replace
+from os.path import join, exists, getsize, dirname
+from threading import Lock
+from time import time
+from typing import Any, Optional
+
+## Local modules: ##
+from journal_homework_models import HomeworkModel
+from homeworks_blob_store import hash_file
+from config import current_dir_path, HOMEWORKS_FOLDER_NAME
+
+
+class HomeworksManifest:
+    """Append-only JSONL index of the saved homeworks. It's used by the sync mode
+    to download only new or changed homeworks instead of the whole listing."""
+    MANIFEST_FILENAME: str = ".manifest.jsonl"
+
+    def __init__(self, dir_path: Optional[PathLike] = current_dir_path) -> None:
+        """Load the manifest from the homeworks folder. Missing manifest is created on the first record.
+
+        Args:
+            dir_path (Optional[PathLike], optional): path to homeworks folder. Defaults to current_dir_path.
+        """
+        self.manifest_path: PathLike = join(dir_path, HOMEWORKS_FOLDER_NAME, self.MANIFEST_FILENAME)
+        self._entries: dict[tuple[str, str, str], dict[str, Any]] = {}
+        self._lock: Lock = Lock()
+        self._load()
+
+    @staticmethod
+    def _get_entry_identity(entry: dict[str, Any]) -> tuple[str, str, str]:
+        """Get the homework identity of the manifest entry.
+        Creation time is canonicalized, so entries with the raw API time match the models too.
+
+        Args:
+            entry (dict[str, Any]): manifest entry.
+
+        Returns:
+            tuple[str, str, str]: file url path, canonical creation time and theme.
+        """
+        return (
+            entry.get("file_url_path"),
+            HomeworkModel.get_creation_time_key(entry.get("creation_time")),
+            entry.get("theme")
+        )
+
+    def _load(self) -> None:
+        """Read all entries, the last entry of the homework wins. Broken lines are skipped."""
+        if not exists(self.manifest_path):
+            return
+
+        with open(file=self.manifest_path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry: dict[str, Any] = loads(line)
+                except JSONDecodeError:
+                    continue
+
+                self._entries[self._get_entry_identity(entry)] = entry
+
+    def get_entry(self, homework: HomeworkModel) -> Optional[dict[str, Any]]:
+        """Get the last manifest entry of the homework.
+
+        Args:
+            homework (HomeworkModel): homework from the API.
+
+        Returns:
+            Optional[dict[str, Any]]: manifest entry or None if the homework was never saved.
+        """
+        with self._lock:
+            return self._entries.get(homework.identity)
+
+    def get_identities(self) -> set[tuple[str, str, str]]:
+        """Get identities of all saved homeworks.
+
+        Returns:
+            set[tuple[str, str, str]]: file url path, creation time and theme of every homework.
+        """
+        with self._lock:
+            return set(self._entries)
+
+    def needs_download(self, homework: HomeworkModel) -> bool:
+        """Check if the homework is new or its saved file was changed or removed.
+
+        Args:
+            homework (HomeworkModel): homework from the API.
+
+        Returns:
+            bool: True if the homework must be downloaded.
+        """
+        entry: Optional[dict[str, Any]] = self.get_entry(homework=homework)
+        if entry is None:
+            return True
+
+        local_path: Optional[str] = entry.get("local_path")
+        if not local_path or not exists(local_path):
+            return True
+
+        return getsize(local_path) != entry.get("size")
+
+    def record(
+        self,
+        homework: HomeworkModel,
+        local_path: PathLike,
+        file_hash: Optional[str] = None
+    ) -> dict[str, Any]:
+        """Append the saved homework to the manifest.
+
+        Args:
+            homework (HomeworkModel): saved homework.
+            local_path (PathLike): path to the saved file.
+            file_hash (Optional[str], optional): sha256 of the file if it's already known. Defaults to None.
+
+        Returns:
+            dict[str, Any]: new manifest entry.
+        """
+        file_url_path, creation_time, theme = homework.identity
+        entry: dict[str, Any] = {
+            "file_url_path": file_url_path,
+            "creation_time": creation_time,
+            "theme": theme,
+            "status": homework.status,
+            "size": getsize(local_path),
+            "sha256": file_hash or hash_file(file_path=local_path)[0],
+            "local_path": str(local_path),
+            "saved_at": time()
+        }
+
+        with self._lock:
+            makedirs(dirname(self.manifest_path), exist_ok=True)
+            with open(file=self.manifest_path, mode="a", encoding="utf-8") as file:
+                file.write(f"{dumps(entry, ensure_ascii=False)}\n")
+            self._entries[homework.identity] = entry
+
+        return entry
+
+    def compact(self) -> None:
+        """Rewrite the manifest with the last entry of every homework only."""
+        with self._lock:
+            makedirs(dirname(self.manifest_path), exist_ok=True)
+            temp_manifest_path: str = f"{self.manifest_path}.tmp"
+            with open(file=temp_manifest_path, mode="w", encoding="utf-8") as file:
+                for entry in self._entries.values():
+                    file.write(f"{dumps(entry, ensure_ascii=False)}\n")
+            replace(temp_manifest_path, self.manifest_path)
+
+    def __len__(self) -> int:
+        """Return the count of saved homeworks"""
+        return len(self._entries)
+
+    def __contains__(self, homework: HomeworkModel) -> bool:
+        """Check if the homework was saved at least once"""
+        return self.get_entry(homework=homework) is not None
@@ -0,0 +1,779 @@
+
+## Built-in modules: ##
+from codecs import getincrementaldecoder
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, asdict
+from hashlib import sha256
+from importlib.util import find_spec
+from json import dumps, loads, JSONDecodeError
+from multiprocessing import get_context
+from os import PathLike, makedirs, replace, cpu_count, getpid
+from os.path import join, dirname, basename, realpath, relpath, commonpath, exists, getsize, splitext
+from queue import Queue
+from shutil import rmtree
+from stat import S_ISLNK
+from tarfile import open as open_tar, is_tarfile
+from threading import BoundedSemaphore, Lock, Thread
+from time import perf_counter
+from typing import Any, BinaryIO, Callable, Generator, Optional, TYPE_CHECKING
+from xml.etree.ElementTree import Element, fromstring, ParseError
+from zipfile import ZipFile, ZipInfo, is_zipfile
+
+## Local modules: ##
+from config import current_dir_path, HOMEWORKS_FOLDER_NAME
+from homeworks_blob_store import hash_file, HASH_CHUNK_SIZE
+from journal_loggers import get_logger, POSTPROCESSING_SUBSYSTEM
+from journal_metrics import (
+    get_metrics_registry,
+    POSTPROCESSED_FILES_METRIC,
+    POSTPROCESSING_DURATION_METRIC,
+    POSTPROCESSING_QUEUE_WAIT_METRIC
+)
+
+if TYPE_CHECKING:
+    from loguru import Logger
+    from journal_homework_models import HomeworkModel
+
+
+## Kinds of the processed files: ##
+ARCHIVE_KIND: str = "archive"
+DOCUMENT_KIND: str = "document"
+TEXT_KIND: str = "text"
+OTHER_KIND: str = "other"
+
+## Archive formats and their extensions, compound extensions are checked before the last suffix: ##
+ZIP_FORMAT: str = "zip"
+TAR_FORMAT: str = "tar"
+RAR_FORMAT: str = "rar"
+ARCHIVE_EXTENSIONS: dict[str, str] = {
+    ".zip": ZIP_FORMAT,
+    ".tar": TAR_FORMAT,
+    ".tar.gz": TAR_FORMAT,
+    ".tgz": TAR_FORMAT,
+    ".tar.bz2": TAR_FORMAT,
+    ".tbz2": TAR_FORMAT,
+    ".tar.xz": TAR_FORMAT,
+    ".txz": TAR_FORMAT,
+    ".rar": RAR_FORMAT,
+}
+RAR_SIGNATURE: bytes = b"Rar!\x1a\x07"
+
+## Office documents are zip files too, their text is in the xml members with these name prefixes: ##
+OFFICE_TEXT_MEMBERS: dict[str, str] = {
+    ".docx": "word/document.xml",
+    ".pptx": "ppt/slides/slide",
+    ".xlsx": "xl/sharedStrings.xml",
+    ".odt": "content.xml",
+    ".odp": "content.xml",
+    ".ods": "content.xml",
+}
+OFFICE_METADATA_MEMBERS: tuple[str, ...] = ("docProps/core.xml", "meta.xml")
+PDF_EXTENSION: str = ".pdf"
+TEXT_EXTENSIONS: tuple[str, ...] = (
+    ".txt", ".md", ".rst", ".csv", ".json", ".xml", ".html", ".htm", ".css", ".js", ".ts", ".py", ".ipynb",
+    ".java", ".kt", ".c", ".h", ".cpp", ".hpp", ".cs", ".go", ".php", ".rb", ".sql", ".sh",
+)
+
+## Office xml members bigger than this are not parsed: ##
+MAX_XML_SIZE: int = 32 * 1024 * 1024
+
+
+@dataclass
+class HomeworkPostprocessingResult:
+    """Class for representing a processed homework file, one line of the postprocessing index."""
+    local_path: str
+    sha256: Optional[str] = None
+    size: Optional[int] = None
+    extension: str = ""
+    kind: str = OTHER_KIND
+    text: Optional[str] = None
+    metadata: dict[str, Any] = field(default_factory=dict)
+    members: list[dict[str, Any]] = field(default_factory=list)
+    extracted_path: Optional[str] = None
+    theme: Optional[str] = None
+    subject_name: Optional[str] = None
+    file_url_path: Optional[str] = None
+    error: Optional[str] = None
+    duration: float = 0.0
+
+    @property
+    def is_successful(self) -> bool:
+        """Check if the file was processed without errors.
+
+        Returns:
+            bool: True if the file was processed.
+        """
+        return self.error is None
+
+
+def get_file_extension(file_path: PathLike) -> str:
+    """Get the lowercase file extension, like .tar.gz for the compressed tar archives.
+
+    Args:
+        file_path (PathLike): file path or archive member name.
+
+    Returns:
+        str: extension with the dot or empty string.
+    """
+    filename: str = basename(file_path).lower()
+    for extension in ARCHIVE_EXTENSIONS:
+        if extension.count(".") > 1 and filename.endswith(extension):
+            return extension
+
+    return splitext(filename)[1]
+
+
+def get_archive_format(file_path: PathLike, extension: str) -> Optional[str]:
+    """Get the archive format by the extension. Files with unknown extensions are checked by their content.
+
+    Args:
+        file_path (PathLike): path to the file.
+        extension (str): file extension.
+
+    Returns:
+        Optional[str]: zip, tar, rar or None if the file is not an archive.
+    """
+    if extension in ARCHIVE_EXTENSIONS:
+        return ARCHIVE_EXTENSIONS[extension]
+    if extension in OFFICE_TEXT_MEMBERS or extension in TEXT_EXTENSIONS or extension == PDF_EXTENSION:
+        return None
+
+    with open(file=file_path, mode="rb") as file:
+        if file.read(len(RAR_SIGNATURE)) == RAR_SIGNATURE:
+            return RAR_FORMAT
+    if is_zipfile(file_path):
+        return ZIP_FORMAT
+    if is_tarfile(file_path):
+        return TAR_FORMAT
+    return None
+
+
+def get_safe_member_path(extract_path: PathLike, member_name: str) -> Optional[PathLike]:
+    """Get the extraction path of the archive member. Absolute names and names with .. which lead
+    out of the extraction folder (zip slip) are rejected.
+
+    Args:
+        extract_path (PathLike): extraction folder.
+        member_name (str): archive member name.
+
+    Returns:
+        Optional[PathLike]: member path inside the extraction folder or None if the name is not safe.
+    """
+    root_path: str = realpath(extract_path)
+    member_path: str = realpath(join(root_path, member_name))
+    if member_path == root_path or commonpath((root_path, member_path)) != root_path:
+        return None
+
+    return member_path
+
+
+def _iter_archive_members(
+    archive_path: PathLike,
+    archive_format: str
+) -> Generator[tuple[str, Callable[[], BinaryIO]], None, None]:
+    """Get the regular file members of the archive. Folders, symlinks and devices are skipped.
+
+    Args:
+        archive_path (PathLike): path to the archive.
+        archive_format (str): zip, tar or rar.
+
+    Raises:
+        ValueError: if it's the rar archive and rarfile is not installed.
+
+    Yields:
+        Generator[tuple[str, Callable[[], BinaryIO]], None, None]: member name and its opener.
+    """
+    if archive_format == ZIP_FORMAT:
+        with ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or S_ISLNK(info.external_attr >> 16):
+                    continue
+                yield info.filename, lambda info=info: archive.open(info)
+
+    elif archive_format == TAR_FORMAT:
+        ## Members are read while the archive is iterated, so compressed tars are not seeked back: ##
+        with open_tar(archive_path, mode="r:*") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                yield member.name, lambda member=member: archive.extractfile(member)
+
+    else:
+        if find_spec("rarfile") is None:
+            raise ValueError("Rar archives require rarfile. Install it with: pip install rarfile.")
+
+        import rarfile
+
+        with rarfile.RarFile(archive_path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or info.is_symlink():
+                    continue
+                yield info.filename, lambda info=info: archive.open(info)
+
+
+def _copy_member(source: BinaryIO, target_path: PathLike, max_size: int) -> tuple[str, int]:
+    """Write the archive member to the file, computing its sha256.
+
+    Args:
+        source (BinaryIO): opened archive member.
+        target_path (PathLike): extraction path of the member.
+        max_size (int): max bytes to write.
+
+    Raises:
+        ValueError: if the member is bigger than max_size.
+
+    Returns:
+        tuple[str, int]: sha256 hex digest and size in bytes.
+    """
+    file_hash = sha256()
+    size: int = 0
+    makedirs(dirname(target_path), exist_ok=True)
+    with source, open(file=target_path, mode="wb") as target:
+        while chunk := source.read(HASH_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise ValueError("Archive is bigger than the extraction size limit.")
+            file_hash.update(chunk)
+            target.write(chunk)
+
+    return file_hash.hexdigest(), size
+
+
+def extract_archive(
+    archive_path: PathLike,
+    archive_format: str,
+    extract_path: PathLike,
+    max_extracted_size: int,
+    max_members: int
+) -> list[dict[str, Any]]:
+    """Extract regular files of the archive. Files are written to the temp folder, which is renamed
+    to extract_path after the last member, so the partial extraction is never left in place.
+
+    Args:
+        archive_path (PathLike): path to the archive.
+        archive_format (str): zip, tar or rar.
+        extract_path (PathLike): extraction folder.
+        max_extracted_size (int): max bytes of all extracted files (zip bomb protection).
+        max_members (int): max count of the extracted files.
+
+    Raises:
+        ValueError: if the archive is over the limits.
+
+    Returns:
+        list[dict[str, Any]]: name, size and sha256 of every extracted file, unsafe names are only listed with the error.
+    """
+    temp_path: str = f"{extract_path}.{getpid()}.part"
+    rmtree(temp_path, ignore_errors=True)
+    makedirs(temp_path)
+
+    members: list[dict[str, Any]] = []
+    extracted_size: int = 0
+    try:
+        for member_name, open_member in _iter_archive_members(archive_path=archive_path, archive_format=archive_format):
+            if len(members) >= max_members:
+                raise ValueError(f"Archive has more than {max_members} files.")
+
+            member_path: Optional[PathLike] = get_safe_member_path(extract_path=temp_path, member_name=member_name)
+            if member_path is None:
+                members.append({"name": member_name, "error": "unsafe path"})
+                continue
+
+            member_hash, member_size = _copy_member(
+                source=open_member(),
+                target_path=member_path,
+                max_size=max_extracted_size - extracted_size
+            )
+            extracted_size += member_size
+            members.append({"name": relpath(member_path, realpath(temp_path)), "size": member_size, "sha256": member_hash})
+
+        ## The same content can be extracted by another worker, the first extraction is kept: ##
+        if exists(extract_path):
+            rmtree(temp_path)
+        else:
+            makedirs(dirname(extract_path), exist_ok=True)
+            replace(temp_path, extract_path)
+    except BaseException:
+        rmtree(temp_path, ignore_errors=True)
+        raise
+
+    return members
+
+
+def _decode_text(data: bytes) -> str:
+    """Decode the text file start. Text is utf-8 or cp1251, the cut multibyte char at the end is dropped.
+
+    Args:
+        data (bytes): file start.
+
+    Returns:
+        str: decoded text.
+    """
+    try:
+        return getincrementaldecoder("utf-8")().decode(data, final=False)
+    except UnicodeDecodeError:
+        return data.decode("cp1251", errors="replace")
+
+
+def _get_xml_text(data: bytes) -> str:
+    """Get the text of the office xml member, one line per paragraph (or per shared string of the spreadsheet).
+
+    Args:
+        data (bytes): xml member content.
+
+    Returns:
+        str: text or empty string if the xml is not valid.
+    """
+    PARAGRAPH_TAGS: tuple[str, ...] = ("p", "si")
+
+    try:
+        root: Element = fromstring(data)
+    except ParseError:
+        return ""
+
+    paragraphs: list[str] = []
+    for element in root.iter():
+        if element.tag.rsplit("}", 1)[-1] in PARAGRAPH_TAGS:
+            paragraph: str = "".join(element.itertext()).strip()
+            if paragraph:
+                paragraphs.append(paragraph)
+
+    return "\n".join(paragraphs)
+
+
+def _get_xml_metadata(data: bytes) -> dict[str, str]:
+    """Get the document properties (title, creator, dates...) of the office metadata member.
+
+    Args:
+        data (bytes): xml member content.
+
+    Returns:
+        dict[str, str]: property name without the namespace -> value.
+    """
+    try:
+        root: Element = fromstring(data)
+    except ParseError:
+        return {}
+
+    return {
+        element.tag.rsplit("}", 1)[-1]: element.text.strip()
+        for element in root.iter()
+        if not len(element) and element.text and element.text.strip()
+    }
+
+
+def _extract_office_text(file_path: PathLike, extension: str, max_length: int) -> tuple[Optional[str], dict[str, Any]]:
+    """Get the text and the properties of the docx, pptx, xlsx or OpenDocument file.
+
+    Args:
+        file_path (PathLike): path to the document.
+        extension (str): document extension.
+        max_length (int): max text length.
+
+    Returns:
+        tuple[Optional[str], dict[str, Any]]: text and document properties.
+    """
+    texts: list[str] = []
+    metadata: dict[str, Any] = {}
+    with ZipFile(file_path) as document:
+        infos: list[ZipInfo] = [info for info in document.infolist() if info.file_size <= MAX_XML_SIZE]
+        for info in infos:
+            if info.filename in OFFICE_METADATA_MEMBERS:
+                metadata.update(_get_xml_metadata(data=document.read(info)))
+
+        text_infos: list[ZipInfo] = sorted(
+            (
+                info for info in infos
+                if info.filename.startswith(OFFICE_TEXT_MEMBERS[extension]) and info.filename.endswith(".xml")
+            ),
+            ## Slides are sorted by their numbers, slide10 goes after slide9: ##
+            key=lambda info: (len(info.filename), info.filename)
+        )
+        for info in text_infos:
+            if sum(map(len, texts)) >= max_length:
+                break
+            texts.append(_get_xml_text(data=document.read(info)))
+
+    return "\n".join(text for text in texts if text)[:max_length] or None, metadata
+
+
+def _extract_pdf_text(file_path: PathLike, max_length: int) -> tuple[Optional[str], dict[str, Any]]:
+    """Get the text and the properties of the pdf file, if pypdf is installed.
+
+    Args:
+        file_path (PathLike): path to the pdf file.
+        max_length (int): max text length.
+
+    Returns:
+        tuple[Optional[str], dict[str, Any]]: text and document properties (nothing without pypdf).
+    """
+    if find_spec("pypdf") is None:
+        return None, {}
+
+    from pypdf import PdfReader
+
+    reader = PdfReader(file_path)
+    metadata: dict[str, Any] = {name.lstrip("/"): str(value) for name, value in (reader.metadata or {}).items()}
+    metadata["pages"] = len(reader.pages)
+
+    texts: list[str] = []
+    for page in reader.pages:
+        if sum(map(len, texts)) >= max_length:
+            break
+        texts.append(page.extract_text() or "")
+
+    return "\n".join(text for text in texts if text)[:max_length] or None, metadata
+
+
+def extract_text(file_path: PathLike, extension: str, max_length: int) -> tuple[Optional[str], dict[str, Any]]:
+    """Get the text for the search and the document properties of the file.
+
+    Args:
+        file_path (PathLike): path to the file.
+        extension (str): file extension.
+        max_length (int): max text length.
+
+    Returns:
+        tuple[Optional[str], dict[str, Any]]: text (None for binary files) and document properties.
+    """
+    ## utf-8 chars take up to 4 bytes: ##
+    MAX_CHAR_BYTES: int = 4
+
+    if extension in TEXT_EXTENSIONS:
+        with open(file=file_path, mode="rb") as file:
+            return _decode_text(data=file.read(max_length * MAX_CHAR_BYTES))[:max_length] or None, {}
+    if extension in OFFICE_TEXT_MEMBERS:
+        return _extract_office_text(file_path=file_path, extension=extension, max_length=max_length)
+    if extension == PDF_EXTENSION:
+        return _extract_pdf_text(file_path=file_path, max_length=max_length)
+    return None, {}
+
+
+def process_homework_file(
+    local_path: PathLike,
+    file_hash: Optional[str],
+    extracted_path: PathLike,
+    max_text_length: int,
+    max_extracted_size: int,
+    max_members: int
+) -> HomeworkPostprocessingResult:
+    """Process one saved homework file in the worker process: unpack the archive, hash it and its files,
+    extract the text and the document properties. Errors are returned in the result instead of raising.
+
+    Args:
+        local_path (PathLike): path to the saved file.
+        file_hash (Optional[str]): sha256 of the file if it's already known.
+        extracted_path (PathLike): folder of the extracted archives, every archive goes to <sha[:2]>/<sha>.
+        max_text_length (int): max text length of the file (of all archive files together).
+        max_extracted_size (int): max bytes of all extracted files of the archive.
+        max_members (int): max count of the extracted files of the archive.
+
+    Returns:
+        HomeworkPostprocessingResult: processing result.
+    """
+    SHARD_LENGTH: int = 2
+
+    start_time: float = perf_counter()
+    extension: str = get_file_extension(file_path=local_path)
+    result: HomeworkPostprocessingResult = HomeworkPostprocessingResult(
+        local_path=str(local_path),
+        sha256=file_hash,
+        extension=extension
+    )
+    try:
+        if result.sha256 is None:
+            result.sha256, result.size = hash_file(file_path=local_path)
+        else:
+            result.size = getsize(local_path)
+
+        archive_format: Optional[str] = get_archive_format(file_path=local_path, extension=extension)
+        if archive_format is not None:
+            result.kind = ARCHIVE_KIND
+            result.extracted_path = join(extracted_path, result.sha256[:SHARD_LENGTH], result.sha256)
+            result.members = extract_archive(
+                archive_path=local_path,
+                archive_format=archive_format,
+                extract_path=result.extracted_path,
+                max_extracted_size=max_extracted_size,
+                max_members=max_members
+            )
+
+            texts: list[str] = []
+            remaining_length: int = max_text_length
+            for member in result.members:
+                if remaining_length <= 0:
+                    break
+                if "error" in member:
+                    continue
+
+                member_text, _ = extract_text(
+                    file_path=join(result.extracted_path, member["name"]),
+                    extension=get_file_extension(file_path=member["name"]),
+                    max_length=remaining_length
+                )
+                if member_text:
+                    texts.append(f"{member['name']}:\n{member_text}")
+                    remaining_length -= len(member_text)
+            result.text = "\n".join(texts) or None
+
+        else:
+            result.kind = TEXT_KIND if extension in TEXT_EXTENSIONS else (
+                DOCUMENT_KIND if extension in OFFICE_TEXT_MEMBERS or extension == PDF_EXTENSION else OTHER_KIND
+            )
+            result.text, result.metadata = extract_text(file_path=local_path, extension=extension, max_length=max_text_length)
+
+    except Exception as error:
+        result.error = f"{type(error).__name__}: {error}"
+
+    result.duration = perf_counter() - start_time
+    return result
+
+
+class HomeworksPostprocessor(object):
+    """Post-processing stage of the saved homework files on the process pool.
+    Saved files are put to the bounded queue, the dispatcher thread passes them to the worker processes,
+    so CPU work of unpacking and text extraction runs on all cores beside the download threads.
+    Every processed file is appended to the index (homeworks/.postprocessing.jsonl),
+    archives are extracted to homeworks/.extracted/<sha[:2]>/<sha> once per content."""
+    INDEX_FILENAME: str = ".postprocessing.jsonl"
+    EXTRACTED_FOLDER_NAME: str = ".extracted"
+    _STOP_DISPATCHER: object = object()
+
+    def __init__(
+        self,
+        dir_path: Optional[PathLike] = current_dir_path,
+        max_workers: Optional[int] = None,
+        queue_size: int = 256,
+        max_text_length: int = 100_000,
+        max_extracted_size: int = 512 * 1024 * 1024,
+        max_members: int = 10_000,
+        on_result: Optional[Callable[[HomeworkPostprocessingResult], None]] = None
+    ) -> None:
+        """Initialize the postprocessor. Worker processes are started by start or by the with statement.
+
+        Args:
+            dir_path (Optional[PathLike], optional): path to homeworks folder. Defaults to current_dir_path.
+            max_workers (Optional[int], optional): worker processes. Defaults to None (CPU count).
+            queue_size (int, optional): max files waiting for the workers, submit blocks while the queue is full.
+                Defaults to 256.
+            max_text_length (int, optional): max indexed text length of one file. Defaults to 100_000.
+            max_extracted_size (int, optional): max bytes of all extracted files of one archive. Defaults to 512 MB.
+            max_members (int, optional): max count of the extracted files of one archive. Defaults to 10_000.
+            on_result (Optional[Callable[[HomeworkPostprocessingResult], None]], optional): called with every
+                result from the pool thread. Defaults to None.
+
+        Raises:
+            ValueError: if some limit is less than 1.
+        """
+        max_workers: int = max_workers or cpu_count() or 1
+        if min(max_workers, queue_size, max_text_length, max_extracted_size, max_members) < 1:
+            raise ValueError("Postprocessor workers, queue size and limits must be positive.")
+
+        self.max_workers: int = max_workers
+        self.max_text_length: int = max_text_length
+        self.max_extracted_size: int = max_extracted_size
+        self.max_members: int = max_members
+        self.on_result: Optional[Callable[[HomeworkPostprocessingResult], None]] = on_result
+        self.index_path: PathLike = join(dir_path, HOMEWORKS_FOLDER_NAME, self.INDEX_FILENAME)
+        self.extracted_path: PathLike = join(dir_path, HOMEWORKS_FOLDER_NAME, self.EXTRACTED_FOLDER_NAME)
+        self.processed_count: int = 0
+        self.failed_count: int = 0
+
+        self._processed_hashes: set[str] = self._load_processed_hashes()
+        self._queue: Queue = Queue(maxsize=queue_size)
+        ## Files in the pool at the same time, the rest wait in the bounded queue: ##
+        self._pool_slots: BoundedSemaphore = BoundedSemaphore(max_workers * 2)
+        self._lock: Lock = Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._dispatcher: Optional[Thread] = None
+
+    def _load_processed_hashes(self) -> set[str]:
+        """Get the hashes of the files which were processed without errors by the previous runs.
+
+        Returns:
+            set[str]: sha256 hex digests.
+        """
+        processed_hashes: set[str] = set()
+        if not exists(self.index_path):
+            return processed_hashes
+
+        with open(file=self.index_path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry: dict[str, Any] = loads(line)
+                except JSONDecodeError:
+                    continue
+
+                if entry.get("sha256") and entry.get("error") is None:
+                    processed_hashes.add(entry["sha256"])
+
+        return processed_hashes
+
+    def start(self) -> None:
+        """Start the worker processes and the dispatcher thread."""
+        if self._dispatcher is not None:
+            return
+
+        self._executor = self._create_executor()
+        self._dispatcher = Thread(target=self._dispatch, name="homeworks-postprocessing-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """Create the pool of the worker processes.
+
+        Returns:
+            ProcessPoolExecutor: worker processes pool.
+        """
+        ## Workers are spawned, forking the process with the running download threads isn't safe: ##
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=get_context("spawn"))
+
+    def submit(self, local_path: PathLike, file_hash: Optional[str] = None, homework: Optional["HomeworkModel"] = None) -> bool:
+        """Queue the saved file for the processing. It blocks only while queue_size files are waiting.
+
+        Args:
+            local_path (PathLike): path to the saved file.
+            file_hash (Optional[str], optional): sha256 of the file if it's already known. Defaults to None.
+            homework (Optional[HomeworkModel], optional): homework of the file for the index. Defaults to None.
+
+        Returns:
+            bool: False if the same content was already processed.
+        """
+        if file_hash is not None:
+            with self._lock:
+                if file_hash in self._processed_hashes:
+                    return False
+                self._processed_hashes.add(file_hash)
+
+        self.start()
+        self._queue.put((local_path, file_hash, homework, perf_counter()))
+        return True
+
+    def _submit_to_pool(self, local_path: PathLike, file_hash: Optional[str]) -> Future:
+        """Submit the file to the pool. The pool, which was broken by the killed worker, is replaced once.
+
+        Args:
+            local_path (PathLike): path to the saved file.
+            file_hash (Optional[str]): sha256 of the file if it's already known.
+
+        Raises:
+            RuntimeError: if the file couldn't be submitted to the new pool too.
+
+        Returns:
+            Future: processing of the file.
+        """
+        arguments: tuple = (
+            local_path,
+            file_hash,
+            self.extracted_path,
+            self.max_text_length,
+            self.max_extracted_size,
+            self.max_members
+        )
+        try:
+            return self._executor.submit(process_homework_file, *arguments)
+        except BrokenProcessPool as error:
+            logger: "Logger" = get_logger(subsystem=POSTPROCESSING_SUBSYSTEM)
+            logger.warning("Postprocessing pool is broken, it's restarted: {}", error)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._create_executor()
+            return self._executor.submit(process_homework_file, *arguments)
+
+    def _dispatch(self) -> None:
+        """Pass the queued files to the pool, while it has free slots.
+        Files, which couldn't be submitted, are recorded as failed, so the queue is always drained."""
+        while (item := self._queue.get()) is not self._STOP_DISPATCHER:
+            local_path, file_hash, homework, queued_at = item
+            self._pool_slots.acquire()
+            get_metrics_registry().observe(POSTPROCESSING_QUEUE_WAIT_METRIC, perf_counter() - queued_at)
+
+            try:
+                future: Future = self._submit_to_pool(local_path=local_path, file_hash=file_hash)
+            except RuntimeError as error:
+                self._pool_slots.release()
+                self._record_result(
+                    result=HomeworkPostprocessingResult(
+                        local_path=str(local_path),
+                        sha256=file_hash,
+                        error=f"{type(error).__name__}: {error}"
+                    ),
+                    homework=homework
+                )
+                continue
+
+            future.add_done_callback(
+                lambda future, local_path=local_path, homework=homework: self._on_processed(
+                    future=future,
+                    local_path=local_path,
+                    homework=homework
+                )
+            )
+
+    def _on_processed(self, future: Future, local_path: PathLike, homework: Optional["HomeworkModel"]) -> None:
+        """Record the result of the finished processing.
+
+        Args:
+            future (Future): finished processing of the file.
+            local_path (PathLike): path to the file.
+            homework (Optional[HomeworkModel]): homework of the file.
+        """
+        self._pool_slots.release()
+        try:
+            result: HomeworkPostprocessingResult = future.result()
+        except Exception as error:
+            ## Worker process was killed or the pool is broken: ##
+            result: HomeworkPostprocessingResult = HomeworkPostprocessingResult(
+                local_path=str(local_path),
+                error=f"{type(error).__name__}: {error}"
+            )
+
+        self._record_result(result=result, homework=homework)
+
+    def _record_result(self, result: HomeworkPostprocessingResult, homework: Optional["HomeworkModel"]) -> None:
+        """Append the result to the index and record its metrics.
+
+        Args:
+            result (HomeworkPostprocessingResult): processing result.
+            homework (Optional[HomeworkModel]): homework of the file.
+        """
+        if homework is not None:
+            result.theme = homework.theme
+            result.subject_name = homework.subject_name
+            result.file_url_path = homework.file_url_path
+
+        metrics_result: str = "processed" if result.is_successful else "failed"
+        get_metrics_registry().increment(POSTPROCESSED_FILES_METRIC, kind=result.kind, result=metrics_result)
+        get_metrics_registry().observe(POSTPROCESSING_DURATION_METRIC, result.duration, kind=result.kind)
+        if not result.is_successful:
+            logger: "Logger" = get_logger(subsystem=POSTPROCESSING_SUBSYSTEM)
+            logger.warning("Failed to process {}: {}", result.local_path, result.error)
+
+        with self._lock:
+            if result.is_successful:
+                self.processed_count += 1
+            else:
+                self.failed_count += 1
+
+            makedirs(dirname(self.index_path), exist_ok=True)
+            with open(file=self.index_path, mode="a", encoding="utf-8") as file:
+                file.write(f"{dumps(asdict(result), ensure_ascii=False)}\n")
+
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def close(self) -> None:
+        """Process all queued files and stop the workers."""
+        if self._dispatcher is None:
+            return
+
+        self._queue.put(self._STOP_DISPATCHER)
+        self._dispatcher.join()
+        self._executor.shutdown(wait=True)
+        self._dispatcher = None
+        self._executor = None
+
+    def __enter__(self) -> "HomeworksPostprocessor":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
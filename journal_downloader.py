@@ -0,0 +1,195 @@
+
+## Built-in modules: ##
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass
+from os import PathLike, makedirs
+from os.path import dirname, lexists
+from threading import BoundedSemaphore, Lock
+from typing import Any, Generator, Iterable, Optional
+from urllib.parse import urlsplit
+
+## Local modules: ##
+from journal_homework_models import HomeworkModel
+from journal_requests import JournalHomeworkScrapper
+from homeworks_folder_manager import HomeworksFolderManager, HomeworksFolderIndex
+from homeworks_manifest import HomeworksManifest
+from homeworks_blob_store import HomeworksBlobStore
+from config import current_dir_path
+
+
+@dataclass
+class HomeworkDownloadResult:
+    """Class for representing a result of the homework download."""
+    index: int
+    homework: HomeworkModel
+    error: Optional[BaseException] = None
+    local_path: Optional[PathLike] = None
+    file_hash: Optional[str] = None
+    is_skipped: bool = False
+
+    @property
+    def is_successful(self) -> bool:
+        """Check if the homework was saved without errors.
+
+        Returns:
+            bool: True if the homework was saved.
+        """
+        return self.error is None
+
+
+class HomeworksDownloader:
+    """Download homeworks files with the bounded pool of worker threads.
+    Files are saved with HomeworksFolderManager, so the disk layout is the same as with the plain loop."""
+    def __init__(
+        self,
+        journal_scrapper: JournalHomeworkScrapper,
+        concurrency: int = 8,
+        per_host_limit: int = 4,
+        dir_path: Optional[PathLike] = current_dir_path,
+        manifest: Optional[HomeworksManifest] = None,
+        blob_store: Optional[HomeworksBlobStore] = None
+    ) -> None:
+        """Initialize the downloader.
+        Transport of the scrapper should have the connections pool not smaller than concurrency.
+
+        Args:
+            journal_scrapper (JournalHomeworkScrapper): shared logged in scrapper.
+            concurrency (int, optional): max downloads at the same time. Defaults to 8.
+            per_host_limit (int, optional): max downloads from one files host at the same time. Defaults to 4.
+            dir_path (Optional[PathLike], optional): path to homeworks folder. Defaults to current_dir_path.
+            manifest (Optional[HomeworksManifest], optional): manifest for the sync mode. If it's passed,
+                already saved homeworks are skipped and new files are recorded in it. Defaults to None.
+            blob_store (Optional[HomeworksBlobStore], optional): store of the files content shared by all downloads.
+                Defaults to None (store in dir_path).
+
+        Raises:
+            ValueError: if concurrency or per_host_limit is less than 1.
+        """
+        if concurrency < 1 or per_host_limit < 1:
+            raise ValueError("Downloader concurrency and per host limit must be positive.")
+
+        self.journal_scrapper: JournalHomeworkScrapper = journal_scrapper
+        self.concurrency: int = concurrency
+        self.per_host_limit: int = per_host_limit
+        self.dir_path: PathLike = dir_path
+        self.manifest: Optional[HomeworksManifest] = manifest
+        self.blob_store: HomeworksBlobStore = blob_store or HomeworksBlobStore(dir_path=dir_path)
+        ## Subject folders are created and listed once for all downloads of the downloader: ##
+        self.folder_index: HomeworksFolderIndex = HomeworksFolderIndex()
+        self._host_semaphores: dict[str, BoundedSemaphore] = {}
+        self._host_semaphores_lock: Lock = Lock()
+
+    def _get_host_semaphore(self, file_url_path: str) -> BoundedSemaphore:
+        """Get the semaphore which limits downloads from the host of the file.
+
+        Args:
+            file_url_path (str): path to the homework file.
+
+        Returns:
+            BoundedSemaphore: semaphore of the host.
+        """
+        host: str = urlsplit(file_url_path).netloc
+        with self._host_semaphores_lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = BoundedSemaphore(self.per_host_limit)
+
+            return self._host_semaphores[host]
+
+    def _restore_from_blob(self, homework: HomeworkModel) -> Optional[PathLike]:
+        """Link the removed file of the saved homework again, if its content is still in the blob store.
+
+        Args:
+            homework (HomeworkModel): homework from the manifest.
+
+        Returns:
+            Optional[PathLike]: restored file path or None if the homework must be downloaded.
+        """
+        entry: Optional[dict[str, Any]] = self.manifest.get_entry(homework=homework)
+        if entry is None or entry.get("sha256") not in self.blob_store:
+            return None
+
+        local_path: Optional[str] = entry.get("local_path")
+        if not local_path or lexists(local_path):
+            return None
+
+        makedirs(dirname(local_path), exist_ok=True)
+        self.blob_store.link(file_hash=entry["sha256"], target_path=local_path)
+        return local_path
+
+    def _save_homework(self, index: int, homework: HomeworkModel) -> HomeworkDownloadResult:
+        """Download and save one homework. Errors are returned in the result instead of raising.
+        In the sync mode homeworks from the manifest are skipped without requests,
+        removed files of them are restored from the blob store. Skipped results have the manifest path and hash.
+
+        Args:
+            index (int): homework position in the input.
+            homework (HomeworkModel): homework to save.
+
+        Returns:
+            HomeworkDownloadResult: download result.
+        """
+        if self.manifest is not None and not self.manifest.needs_download(homework=homework):
+            entry: dict[str, Any] = self.manifest.get_entry(homework=homework)
+            return HomeworkDownloadResult(
+                index=index,
+                homework=homework,
+                local_path=entry.get("local_path"),
+                file_hash=entry.get("sha256"),
+                is_skipped=True
+            )
+
+        manager: HomeworksFolderManager = HomeworksFolderManager(
+            homework_to_save=homework,
+            journal_scrapper=self.journal_scrapper,
+            blob_store=self.blob_store,
+            folder_index=self.folder_index
+        )
+        try:
+            if self.manifest is not None:
+                local_path: Optional[PathLike] = self._restore_from_blob(homework=homework)
+                if local_path is not None:
+                    return HomeworkDownloadResult(
+                        index=index,
+                        homework=homework,
+                        local_path=local_path,
+                        file_hash=self.manifest.get_entry(homework=homework)["sha256"]
+                    )
+
+            with self._get_host_semaphore(file_url_path=homework.file_url_path):
+                local_path: PathLike = manager.save_to_path(dir_path=self.dir_path)
+
+            if self.manifest is not None:
+                self.manifest.record(
+                    homework=homework,
+                    local_path=local_path,
+                    file_hash=manager.file_hash
+                )
+        except Exception as error:
+            return HomeworkDownloadResult(index=index, homework=homework, error=error)
+
+        return HomeworkDownloadResult(index=index, homework=homework, local_path=local_path, file_hash=manager.file_hash)
+
+    def download(self, homeworks: Iterable[HomeworkModel]) -> Generator[HomeworkDownloadResult, None, None]:
+        """Download all homeworks concurrently.
+        Homeworks are read from the iterable lazily and results are yielded in the input order.
+
+        Args:
+            homeworks (Iterable[HomeworkModel]): homeworks to save.
+
+        Yields:
+            Generator[HomeworkDownloadResult, None, None]: result of every homework.
+        """
+        ## Enough queued work to keep all workers busy while the first result is awaited: ##
+        MAX_PENDING_MULTIPLIER: int = 2
+        max_pending: int = self.concurrency * MAX_PENDING_MULTIPLIER
+        pending: deque[Future] = deque()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for index, homework in enumerate(homeworks):
+                pending.append(executor.submit(self._save_homework, index, homework))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
@@ -1,29 +1,74 @@
 
-## Pip modules: ##
-from fake_useragent import UserAgent
+## Built-in modules: ##
+from random import choice
+from threading import Lock
+from types import MappingProxyType
+from typing import Mapping, Optional
+from urllib.parse import urlsplit
+
+## Local modules: ##
+from config import JOURNAL_API_URL
+
+
+JOURNAL_API_HOST: str = urlsplit(JOURNAL_API_URL).netloc
+JOURNAL_LOGIN_PATH: str = f"{urlsplit(JOURNAL_API_URL).path}/auth/login"
+## Used when fake_useragent can't load its browsers database (no network, broken package...): ##
+FALLBACK_USER_AGENTS: tuple[str, ...] = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:125.0) Gecko/20100101 Firefox/125.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0",
+)
+USER_AGENTS_POOL_SIZE: int = 50
+
+_user_agents_pool: Optional[tuple[str, ...]] = None
+_user_agents_pool_lock: Lock = Lock()
+
+
+def get_user_agents_pool() -> tuple[str, ...]:
+    """Get the pool of user-agents. fake_useragent database is loaded once, on the first call.
+
+    Returns:
+        tuple[str, ...]: user-agents.
+    """
+    global _user_agents_pool
+    
+    with _user_agents_pool_lock:
+        if _user_agents_pool is None:
+            try:
+                from fake_useragent import UserAgent
+                
+                user_agent: UserAgent = UserAgent()
+                _user_agents_pool = tuple({user_agent.random for _ in range(USER_AGENTS_POOL_SIZE)})
+            except Exception:
+                _user_agents_pool = FALLBACK_USER_AGENTS
+    
+    return _user_agents_pool
 
 
 def get_random_useragent() -> str:
-    """Get the random useragent from fake_useragent library.
+    """Get the random useragent from the user-agents pool.
 
     Returns:
         str: String with the useragent.
     """
-    return UserAgent().random
+    return choice(get_user_agents_pool())
 
 
-def get_headers_for_login() -> dict:
-    """Get the headers for POST request to Journal API with the random user-agent.
+def _build_login_headers(user_agent: str) -> dict[str, str]:
+    """Build the headers for POST request to Journal API.
+
+    Args:
+        user_agent (str): user-agent header value.
 
     Returns:
-        dict: Headers dictionary.
+        dict[str, str]: Headers dictionary.
     """
-    user_agent: str = get_random_useragent()
-    
-    login_headers: dict[str, str] = {
-        "authority": "msapi.top-academy.ru",
+    return {
+        "authority": JOURNAL_API_HOST,
         "method": "POST",
-        "path": "/api/v2/auth/login",
+        "path": JOURNAL_LOGIN_PATH,
         "scheme": "https",
         "accept": "application/json, text/plain, */*",
         "accept-encoding": "gzip, deflate, br, zstd",
@@ -35,45 +80,37 @@ def get_headers_for_login() -> dict:
         "referer": "https://journal.top-academy.ru/",
         "user-agent": user_agent
     }
-    
-    return login_headers
 
 
-def get_headers_for_downloads() -> dict:
-    """Get the headers for GET request to Journal API with the random user-agent for downloading files.
+def _build_download_headers(user_agent: str) -> dict[str, str]:
+    """Build the headers for GET request for downloading files.
+
+    Args:
+        user_agent (str): user-agent header value.
 
     Returns:
-        dict: Headers dictionary.
+        dict[str, str]: Headers dictionary.
     """
-    user_agent: str = get_random_useragent()
-    
-    headers: dict[str, str] = {
+    return {
         "User-Agent": user_agent
     }
-    return headers
 
 
-def get_headers_for_requests(
-    token: str,
-) -> dict:
-    """Get the headers for any GET request to Journal API.
-    Token needs to pass it in auth field.
+def _build_requests_headers(user_agent: str) -> dict[str, str]:
+    """Build the headers for any GET request to Journal API without the token.
 
     Args:
-        token (str): Auth token. You can get it after logging in the Journal.
+        user_agent (str): user-agent header value.
 
     Returns:
-        dict: Headers dictionary.
+        dict[str, str]: Headers dictionary.
     """
-    user_agent: str = get_random_useragent()
-    
-    headers: dict[str, str] = {
-        "Host": "msapi.top-academy.ru",
+    return {
+        "Host": JOURNAL_API_HOST,
         "User-Agent": user_agent,
         "Accept": "application/json, text/plain, */*",
         "Accept-Language": "ru_RU, ru",
         "Accept-Encoding": "gzip, deflate, br, zstd",
-        "Authorization": f"Bearer {token}",
         "Origin": "https://journal.top-academy.ru",
         "Connection": "keep-alive",
         "Referer": "https://journal.top-academy.ru/",
@@ -82,4 +119,81 @@ def get_headers_for_requests(
         "Sec-Fetch-Site": "same-site",
         "TE": "trailers"
     }
-    return headers
+
+
+class JournalHeadersFactory(object):
+    """Headers factory for one session. It uses one user-agent for all requests, so the fingerprint
+    stays the same, and keeps prebuilt immutable headers templates."""
+    def __init__(self, user_agent: Optional[str] = None) -> None:
+        """Initialize the headers templates.
+
+        Args:
+            user_agent (Optional[str], optional): user-agent for the session. Defaults to None (random one from the pool).
+        """
+        self.user_agent: str = user_agent or get_random_useragent()
+        self.login_headers: Mapping[str, str] = MappingProxyType(_build_login_headers(user_agent=self.user_agent))
+        self.download_headers: Mapping[str, str] = MappingProxyType(_build_download_headers(user_agent=self.user_agent))
+        self.requests_headers: Mapping[str, str] = MappingProxyType(_build_requests_headers(user_agent=self.user_agent))
+
+    def get_headers_for_login(self) -> dict[str, str]:
+        """Get the copy of the login headers.
+
+        Returns:
+            dict[str, str]: Headers dictionary.
+        """
+        return dict(self.login_headers)
+
+    def get_headers_for_downloads(self) -> dict[str, str]:
+        """Get the copy of the downloads headers.
+
+        Returns:
+            dict[str, str]: Headers dictionary.
+        """
+        return dict(self.download_headers)
+
+    def get_headers_for_requests(self, token: str) -> dict[str, str]:
+        """Get the Journal API requests headers with the token.
+
+        Args:
+            token (str): Auth token. You can get it after logging in the Journal.
+
+        Returns:
+            dict[str, str]: Headers dictionary.
+        """
+        return {**self.requests_headers, "Authorization": f"Bearer {token}"}
+
+
+def get_headers_for_login() -> dict:
+    """Get the headers for POST request to Journal API with the random user-agent.
+
+    Returns:
+        dict: Headers dictionary.
+    """
+    return _build_login_headers(user_agent=get_random_useragent())
+
+
+def get_headers_for_downloads() -> dict:
+    """Get the headers for GET request to Journal API with the random user-agent for downloading files.
+
+    Returns:
+        dict: Headers dictionary.
+    """
+    return _build_download_headers(user_agent=get_random_useragent())
+
+
+def get_headers_for_requests(
+    token: str,
+) -> dict:
+    """Get the headers for any GET request to Journal API.
+    Token needs to pass it in auth field.
+
+    Args:
+        token (str): Auth token. You can get it after logging in the Journal.
+
+    Returns:
+        dict: Headers dictionary.
+    """
+    return {
+        **_build_requests_headers(user_agent=get_random_useragent()),
+        "Authorization": f"Bearer {token}"
+    }
@@ -1,32 +1,246 @@
 
 ## Built-in modules: ##
-from dataclasses import dataclass
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from dataclasses import dataclass, fields
 from datetime import datetime
-from typing import Generator, Any
+from math import isnan
+from sys import intern
+from typing import Generator, Any, Iterable, Optional
 
 ## Local modules: ##
 from journal_requests import JournalHomeworkScrapper, UserInputData
+from journal_json import decode_homework_records, HomeworkRecord
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class HomeworkModel:
-    """Class for representing a model of homework."""
+    """Class for representing a model of homework.
+    Model is slotted and immutable, so large listings take less memory and models can be used as dict keys."""
     status: int
     teacher_name: str
     subject_name: str
     file_url_path: str
     comment: str
-    creation_time: datetime
+    ## API string is parsed to datetime (None if it can't be parsed) by __post_init__: ##
+    creation_time: Optional[datetime]
     theme: str
+    ## Canonical creation time of the identity, API string is kept if it can't be parsed: ##
+    creation_time_key: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        """Compute the creation time key for the models, which were created without it,
+        and parse the creation time string, so every model has the datetime or None."""
+        if self.creation_time_key is None:
+            object.__setattr__(self, "creation_time_key", self.get_creation_time_key(self.creation_time))
+        if not isinstance(self.creation_time, datetime):
+            object.__setattr__(self, "creation_time", self.parse_creation_time(self.creation_time))
+
+    @classmethod
+    def get_creation_time_key(cls, creation_time: Optional[str | datetime]) -> str:
+        """Get the canonical creation time for the homework identity.
+        The raw API string, str(datetime) and isoformat of the same time have the same key,
+        so manifests and event stores written with any of them keep matching.
+
+        Args:
+            creation_time (Optional[str | datetime]): creation time from the API, the model or the stored key.
+
+        Returns:
+            str: ISO formatted time or the original value as string (None, like in the old manifests),
+                if it can't be parsed.
+        """
+        parsed_creation_time: Optional[datetime] = cls.parse_creation_time(creation_time)
+        if parsed_creation_time is not None:
+            return parsed_creation_time.isoformat()
+        return str(creation_time)
+
+    @staticmethod
+    def parse_creation_time(creation_time: Optional[str | datetime]) -> Optional[datetime]:
+        """Parse the creation time from the API once, when the model is created.
+
+        Args:
+            creation_time (Optional[str | datetime]): ISO formatted creation time.
+
+        Returns:
+            Optional[datetime]: creation time or None if it's missing or has unknown format.
+        """
+        if creation_time is None or isinstance(creation_time, datetime):
+            return creation_time
+        
+        try:
+            return datetime.fromisoformat(creation_time)
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def intern_name(name: Optional[str]) -> Optional[str]:
+        """Intern the subject or teacher name, they repeat in every homework of the subject.
+
+        Args:
+            name (Optional[str]): subject or teacher name.
+
+        Returns:
+            Optional[str]: interned name.
+        """
+        return intern(name) if isinstance(name, str) else name
+
+    @property
+    def identity(self) -> tuple[str, str, str]:
+        """Get the key of the homework, which doesn't change with the homework status.
+
+        Returns:
+            tuple[str, str, str]: file url path, canonical creation time and theme.
+        """
+        return (self.file_url_path, self.creation_time_key, self.theme)
+
+    @classmethod
+    def from_api_dict(cls, homework: dict[str, Any]) -> "HomeworkModel":
+        """Create the model from the homework dict of the Journal API listing.
+
+        Args:
+            homework (dict[str, Any]): homework from the API response.
+
+        Returns:
+            HomeworkModel: homework model.
+        """
+        STATUS_KEY: str = "status"
+        TEACHER_NAME_KEY: str = "fio_teach"
+        SUBJECT_NAME_KEY: str = "name_spec"
+        FILE_URL_PATH_KEY: str = "file_path"
+        COMMENT_KEY: str = "comment"
+        CREATION_TIME_KEY: str = "creation_time"
+        THEME_KEY: str = "theme"
+        
+        return cls.from_record((
+            homework.get(STATUS_KEY),
+            homework.get(TEACHER_NAME_KEY),
+            homework.get(SUBJECT_NAME_KEY),
+            homework.get(FILE_URL_PATH_KEY),
+            homework.get(COMMENT_KEY),
+            homework.get(CREATION_TIME_KEY),
+            homework.get(THEME_KEY)
+        ))
+
+    @classmethod
+    def from_record(cls, record: HomeworkRecord) -> "HomeworkModel":
+        """Create the model from the record decoded by journal_json.decode_homework_records.
+
+        Args:
+            record (HomeworkRecord): status, teacher, subject, file url path, comment, creation time and theme.
+
+        Returns:
+            HomeworkModel: homework model.
+        """
+        status, teacher_name, subject_name, file_url_path, comment, creation_time, theme = record
+        return cls(
+            status=status,
+            teacher_name=cls.intern_name(teacher_name),
+            subject_name=cls.intern_name(subject_name),
+            file_url_path=file_url_path,
+            comment=comment,
+            creation_time=cls.parse_creation_time(creation_time),
+            theme=theme,
+            creation_time_key=cls.get_creation_time_key(creation_time)
+        )
+
+
+class HomeworksBatch:
+    """Columnar form of many homeworks: one array per field instead of one object per homework.
+    Status and creation time are kept in typed arrays, names are interned. Use it for bulk analytics."""
+    ## Creation time is kept as unix timestamp, NaN means the missing time: ##
+    MISSING_TIMESTAMP: float = float("nan")
+    
+    def __init__(self, homeworks: Iterable[HomeworkModel] = ()) -> None:
+        """Initialize the batch with the homeworks.
+
+        Args:
+            homeworks (Iterable[HomeworkModel], optional): homeworks to add. Defaults to ().
+        """
+        self.status: array = array("b")
+        self.teacher_name: list[str] = []
+        self.subject_name: list[str] = []
+        self.file_url_path: list[str] = []
+        self.comment: list[str] = []
+        self.creation_time: array = array("d")
+        self.theme: list[str] = []
+        self.creation_time_key: list[str] = []
+        self.extend(homeworks)
+    
+    def append(self, homework: HomeworkModel) -> None:
+        """Add the homework to the end of the batch.
+
+        Args:
+            homework (HomeworkModel): homework to add.
+        """
+        MISSING_STATUS: int = -1
+        
+        self.status.append(MISSING_STATUS if homework.status is None else homework.status)
+        self.teacher_name.append(HomeworkModel.intern_name(homework.teacher_name))
+        self.subject_name.append(HomeworkModel.intern_name(homework.subject_name))
+        self.file_url_path.append(homework.file_url_path)
+        self.comment.append(homework.comment)
+        self.creation_time.append(
+            self.MISSING_TIMESTAMP if homework.creation_time is None else homework.creation_time.timestamp()
+        )
+        self.theme.append(homework.theme)
+        self.creation_time_key.append(homework.creation_time_key)
+    
+    def extend(self, homeworks: Iterable[HomeworkModel]) -> None:
+        """Add all homeworks to the end of the batch.
+
+        Args:
+            homeworks (Iterable[HomeworkModel]): homeworks to add.
+        """
+        for homework in homeworks:
+            self.append(homework)
+    
+    def columns(self) -> dict[str, array | list[str]]:
+        """Get all columns of the batch by the HomeworkModel field names.
+
+        Returns:
+            dict[str, array | list[str]]: field name -> column.
+        """
+        return {field.name: getattr(self, field.name) for field in fields(HomeworkModel)}
+    
+    def __len__(self) -> int:
+        """Return the count of homeworks in the batch"""
+        return len(self.theme)
+    
+    def __getitem__(self, index: int) -> HomeworkModel:
+        """Build the homework model from the row of the batch"""
+        MISSING_STATUS: int = -1
+        
+        status: int = self.status[index]
+        timestamp: float = self.creation_time[index]
+        return HomeworkModel(
+            status=None if status == MISSING_STATUS else status,
+            teacher_name=self.teacher_name[index],
+            subject_name=self.subject_name[index],
+            file_url_path=self.file_url_path[index],
+            comment=self.comment[index],
+            creation_time=None if isnan(timestamp) else datetime.fromtimestamp(timestamp),
+            theme=self.theme[index],
+            creation_time_key=self.creation_time_key[index]
+        )
+    
+    def __iter__(self) -> Generator[HomeworkModel, None, None]:
+        """Return a generator of homework models from the batch"""
+        for index in range(len(self)):
+            yield self[index]
 
 
 class HomeworkAPI:
     """Class to interact with Journal API."""
-    def __init__(self, login_data: dict[str, str] | UserInputData):
+    def __init__(
+        self,
+        login_data: Optional[dict[str, str] | UserInputData] = None,
+        journal_scrapper: Optional[JournalHomeworkScrapper] = None
+    ):
         """Initialize the Journal homeworks scrapper.
 
         Args:
-            login_data (dict[str, str] | UserInputData): dict object with 4 fields:
+            login_data (Optional[dict[str, str] | UserInputData]): dict object with 4 fields:
             You can get all of it in the JournalAPI. 
             https://journal.top-academy.ru/ru/auth/login/index
             
@@ -34,8 +248,18 @@ class HomeworkAPI:
             ID_CITY = YOUR_ID_CITY (sometimes it can be "null").
             PASSWORD = YOUR_PASSWORD
             USER_NAME = YOUR_USERNAME
+            journal_scrapper (Optional[JournalHomeworkScrapper]): already logged in scrapper to share.
+                If it's passed, login_data is not used and no new login is made.
+        
+        Raises:
+            ValueError: if neither login_data nor journal_scrapper were passed.
         """
-        self.journal_scrapper: JournalHomeworkScrapper = JournalHomeworkScrapper(login_data=login_data)
+        if journal_scrapper is None:
+            if login_data is None:
+                raise ValueError("HomeworkAPI needs login_data or journal_scrapper.")
+            journal_scrapper: JournalHomeworkScrapper = JournalHomeworkScrapper(login_data=login_data)
+        
+        self.journal_scrapper: JournalHomeworkScrapper = journal_scrapper
 
     def get_homeworks_page(
         self,
@@ -65,6 +289,30 @@ class HomeworkAPI:
             group_id=group_id
         )
 
+    def get_homework_models_page(
+        self,
+        page: int,
+        status: int,
+        group_id: int
+    ) -> list[HomeworkModel]:
+        """Method to get all homeworks from the page as models.
+        Listing is decoded in one pass with the fastest installed json backend, unused fields are skipped.
+
+        Args:
+            page (int): Homework page.
+            status (int): Homework status.
+            group_id (int): homework group id.
+
+        Returns:
+            list[HomeworkModel]: All homeworks from the page.
+        """
+        listing_body: bytes = self.journal_scrapper.get_homeworks_page_body(
+            page=page,
+            status=status,
+            group_id=group_id
+        )
+        return [HomeworkModel.from_record(record) for record in decode_homework_records(listing_body)]
+
 
 class HomeworksPageModel:
     """Model for representing a page of homeworks."""
@@ -100,28 +348,12 @@ class HomeworksPageModel:
         Yields:
             Generator[HomeworkModel, None, None]: HomeworkModel with necessary attributes.
         """
-        STATUS_KEY: str = "status"
-        TEACHER_NAME_KEY: str = "fio_teach"
-        SUBJECT_NAME_KEY: str = "name_spec"
-        FILE_URL_PATH_KEY: str = "file_path"
-        COMMENT_KEY: str = "comment"
-        CREATION_TIME_KEY: str = "creation_time"
-        THEME_KEY: str = "theme"
-        
-        for homework in journal_homework_api.get_homeworks_page(
+        for homework in journal_homework_api.get_homework_models_page(
             page=self.page,
             status=self.status,
             group_id=self.group_id
         ):
-            yield HomeworkModel(
-                status=homework.get(STATUS_KEY),
-                teacher_name=homework.get(TEACHER_NAME_KEY),
-                subject_name=homework.get(SUBJECT_NAME_KEY),
-                file_url_path=homework.get(FILE_URL_PATH_KEY),
-                comment=homework.get(COMMENT_KEY),
-                creation_time=homework.get(CREATION_TIME_KEY),
-                theme=homework.get(THEME_KEY)
-            )
+            yield homework
     
     def __iter__(self) -> Generator[HomeworkModel, None, None]:
         """Return a generator of homeworks from the page"""
@@ -129,16 +361,155 @@ class HomeworksPageModel:
             yield homework
 
 
+class HomeworksPagesIterator:
+    """Lazy iterator over all pages of the homeworks listing. Pages are requested one by one
+    until the API returns an empty page, all homeworks are yielded as one stream."""
+    def __init__(
+        self,
+        journal_homework_api: HomeworkAPI,
+        status: int,
+        group_id: int,
+        start_page: int = 0,
+        end_page: Optional[int] = None,
+        prefetch: int = 0
+    ) -> None:
+        """Initialize the pages iterator. No requests are sent before the iteration.
+
+        Args:
+            journal_homework_api (HomeworkAPI): Journal homeworks API.
+            status (int): Homework status (
+                0-(unknown, probably practical works)
+                1-completed,
+                2-on the checking,
+                3-uncompleted
+                5-expired
+            )
+            group_id (int): homework group id.
+            start_page (int, optional): first page to request. Defaults to 0.
+            end_page (Optional[int], optional): last page to request (inclusive). Defaults to None (until the empty page).
+            prefetch (int, optional): how many next pages are requested concurrently 
+                while the current page is consumed. Defaults to 0 (one request at a time).
+        
+        Raises:
+            ValueError: if prefetch is negative.
+        """
+        if prefetch < 0:
+            raise ValueError("Pages prefetch can't be negative.")
+        
+        self.journal_homework_api: HomeworkAPI = journal_homework_api
+        self.status: int = status
+        self.group_id: int = group_id
+        self.start_page: int = start_page
+        self.end_page: Optional[int] = end_page
+        self.prefetch: int = prefetch
+    
+    def _is_page_in_range(self, page: int) -> bool:
+        """Check if the page must be requested.
+
+        Args:
+            page (int): Homework page.
+
+        Returns:
+            bool: True if the page is not after the end page.
+        """
+        return self.end_page is None or page <= self.end_page
+    
+    def _get_page(self, page: int) -> list[HomeworkModel]:
+        """Get the homeworks of one page.
+
+        Args:
+            page (int): Homework page.
+
+        Returns:
+            list[HomeworkModel]: All homeworks from the page.
+        """
+        return self.journal_homework_api.get_homework_models_page(
+            page=page,
+            status=self.status,
+            group_id=self.group_id
+        )
+    
+    def _iter_pages_serially(self) -> Generator[list[HomeworkModel], None, None]:
+        """Request pages one by one until the empty page.
+
+        Yields:
+            Generator[list[HomeworkModel], None, None]: homeworks of every page.
+        """
+        page: int = self.start_page
+        while self._is_page_in_range(page=page):
+            homeworks: list[HomeworkModel] = self._get_page(page=page)
+            if not homeworks:
+                return
+            
+            yield homeworks
+            page += 1
+    
+    def _iter_pages_with_prefetch(self) -> Generator[list[HomeworkModel], None, None]:
+        """Request the next pages in the background while the current page is consumed.
+        Pages after the first empty page are discarded.
+
+        Yields:
+            Generator[list[HomeworkModel], None, None]: homeworks of every page in the pages order.
+        """
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.prefetch)
+        pending_pages: deque[Future] = deque()
+        next_page: int = self.start_page
+        
+        try:
+            while self._is_page_in_range(page=next_page) and len(pending_pages) <= self.prefetch:
+                pending_pages.append(executor.submit(self._get_page, next_page))
+                next_page += 1
+            
+            while pending_pages:
+                homeworks: list[HomeworkModel] = pending_pages.popleft().result()
+                if not homeworks:
+                    return
+                
+                if self._is_page_in_range(page=next_page):
+                    pending_pages.append(executor.submit(self._get_page, next_page))
+                    next_page += 1
+                
+                yield homeworks
+        
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def __iter__(self) -> Generator[HomeworkModel, None, None]:
+        """Return a generator of homeworks from all pages"""
+        pages: Generator[list[HomeworkModel], None, None] = (
+            self._iter_pages_with_prefetch() if self.prefetch else self._iter_pages_serially()
+        )
+        for homeworks in pages:
+            for homework in homeworks:
+                yield homework
+
+
 class HomeworksPageModelFactory:
     """Factory for creating a page model with the page of homeworks"""
     def __init__(
         self,
-        login_data: dict[str, str] | UserInputData,
+        login_data: Optional[dict[str, str] | UserInputData],
         page: int,
         status: int,
         group_id: int,
+        journal_scrapper: Optional[JournalHomeworkScrapper] = None
     ) -> None:
-        journal_homework_api: HomeworkAPI = HomeworkAPI(login_data=login_data)
+        """Initialize the factory with the page model.
+
+        Args:
+            login_data (Optional[dict[str, str] | UserInputData]): Journal login data.
+                Can be None if journal_scrapper is passed.
+            page (int): Homework page.
+            status (int): Homework status.
+            group_id (int): homework group id.
+            journal_scrapper (Optional[JournalHomeworkScrapper], optional): shared logged in scrapper. 
+                Defaults to None (a new scrapper is created from login_data).
+        """
+        journal_homework_api: HomeworkAPI = HomeworkAPI(
+            login_data=login_data,
+            journal_scrapper=journal_scrapper
+        )
+        self.journal_scrapper: JournalHomeworkScrapper = journal_homework_api.journal_scrapper
         self.homeworks_page_model: HomeworksPageModel = HomeworksPageModel(
             page=page,
             status=status,
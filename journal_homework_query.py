@@ -0,0 +1,140 @@
+
+## Built-in modules: ##
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from typing import Generator, Iterable, Optional
+
+## Local modules: ##
+from journal_homework_models import HomeworkAPI, HomeworkModel
+
+
+class HomeworksQuery:
+    """Query homeworks of several statuses and groups at once.
+    Every (status, group, page) listing request runs concurrently over one HomeworkAPI,
+    results are merged into one stream without duplicates."""
+    def __init__(
+        self,
+        journal_homework_api: HomeworkAPI,
+        statuses: Iterable[int],
+        group_ids: Iterable[int],
+        max_workers: int = 8,
+        pages_ahead: int = 2,
+        start_page: int = 0,
+        end_page: Optional[int] = None
+    ) -> None:
+        """Initialize the query. No requests are sent before the iteration.
+
+        Args:
+            journal_homework_api (HomeworkAPI): Journal homeworks API with the shared scrapper.
+            statuses (Iterable[int]): Homework statuses (
+                0-(unknown, probably practical works)
+                1-completed,
+                2-on the checking,
+                3-uncompleted
+                5-expired
+            )
+            group_ids (Iterable[int]): homework group ids.
+            max_workers (int, optional): max listing requests at the same time. Defaults to 8.
+            pages_ahead (int, optional): how many pages of one (status, group) pair are requested
+                before the previous page is known to be not empty. Defaults to 2.
+            start_page (int, optional): first page to request. Defaults to 0.
+            end_page (Optional[int], optional): last page to request (inclusive). Defaults to None (until the empty page).
+
+        Raises:
+            ValueError: if max_workers or pages_ahead is less than 1.
+        """
+        if max_workers < 1 or pages_ahead < 1:
+            raise ValueError("Query max_workers and pages_ahead must be positive.")
+
+        self.journal_homework_api: HomeworkAPI = journal_homework_api
+        self.statuses: tuple[int, ...] = tuple(dict.fromkeys(statuses))
+        self.group_ids: tuple[int, ...] = tuple(dict.fromkeys(group_ids))
+        self.max_workers: int = max_workers
+        self.pages_ahead: int = pages_ahead
+        self.start_page: int = start_page
+        self.end_page: Optional[int] = end_page
+
+    def _is_page_in_range(self, page: int) -> bool:
+        """Check if the page must be requested.
+
+        Args:
+            page (int): Homework page.
+
+        Returns:
+            bool: True if the page is not after the end page.
+        """
+        return self.end_page is None or page <= self.end_page
+
+    def iter_with_source(self) -> Generator[tuple[int, int, HomeworkModel], None, None]:
+        """Run all listing requests and yield homeworks in the completion order.
+        Duplicates are not removed here.
+
+        Yields:
+            Generator[tuple[int, int, HomeworkModel], None, None]: group id, status and homework.
+        """
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=self.max_workers)
+        ## Future -> (status, group_id, page) of the request: ##
+        pending_requests: dict[Future, tuple[int, int, int]] = {}
+        ## (status, group_id) -> next page to request or None if the empty page was found: ##
+        next_pages: dict[tuple[int, int], Optional[int]] = {}
+
+        def submit_next_page(status: int, group_id: int) -> None:
+            next_page: Optional[int] = next_pages[(status, group_id)]
+            if next_page is None or not self._is_page_in_range(page=next_page):
+                return
+
+            future: Future = executor.submit(
+                self.journal_homework_api.get_homework_models_page,
+                page=next_page,
+                status=status,
+                group_id=group_id
+            )
+            pending_requests[future] = (status, group_id, next_page)
+            next_pages[(status, group_id)] = next_page + 1
+
+        try:
+            for status in self.statuses:
+                for group_id in self.group_ids:
+                    next_pages[(status, group_id)] = self.start_page
+                    for _ in range(self.pages_ahead):
+                        submit_next_page(status=status, group_id=group_id)
+
+            while pending_requests:
+                done_requests, _ = wait(pending_requests, return_when=FIRST_COMPLETED)
+                for future in done_requests:
+                    status, group_id, page = pending_requests.pop(future)
+                    homeworks: list[HomeworkModel] = future.result()
+
+                    if not homeworks:
+                        next_pages[(status, group_id)] = None
+                        continue
+
+                    submit_next_page(status=status, group_id=group_id)
+                    for homework in homeworks:
+                        yield (group_id, status, homework)
+
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def iter_unique(
+        sourced_homeworks: Iterable[tuple[int, int, HomeworkModel]]
+    ) -> Generator[HomeworkModel, None, None]:
+        """Remove the source and duplicates from the iter_with_source results.
+
+        Args:
+            sourced_homeworks (Iterable[tuple[int, int, HomeworkModel]]): group id, status and homework.
+
+        Yields:
+            Generator[HomeworkModel, None, None]: unique homeworks.
+        """
+        seen_identities: set[tuple[str, str, str]] = set()
+        for _, _, homework in sourced_homeworks:
+            if homework.identity in seen_identities:
+                continue
+
+            seen_identities.add(homework.identity)
+            yield homework
+
+    def __iter__(self) -> Generator[HomeworkModel, None, None]:
+        """Return a generator of unique homeworks of all statuses and groups"""
+        return self.iter_unique(self.iter_with_source())
@@ -0,0 +1,155 @@
+
+## Built-in modules: ##
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import time
+from typing import Optional, TYPE_CHECKING
+
+## Pip modules: ##
+if TYPE_CHECKING:
+    from requests import Response
+
+
+@dataclass
+class CachedListing(object):
+    """Dataclass to hold the cached listing response body with its validators"""
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+    @property
+    def has_validators(self) -> bool:
+        """Check if the response can be revalidated with the conditional request.
+
+        Returns:
+            bool: True if the response has ETag or Last-Modified.
+        """
+        return bool(self.etag or self.last_modified)
+
+
+class ListingHttpCache(object):
+    """LRU cache of the homework listing responses keyed by URL.
+    Responses with ETag/Last-Modified are revalidated with the conditional requests (304 is served from the cache),
+    responses without validators are served from the cache without requests while they are younger than ttl."""
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bytes: int = 32 * 1024 * 1024,
+        ttl: float = 60
+    ) -> None:
+        """Initialize the empty cache.
+
+        Args:
+            max_entries (int, optional): max cached URLs. Defaults to 256.
+            max_bytes (int, optional): max total size of cached bodies. Defaults to 32 MB.
+            ttl (float, optional): seconds to serve responses without validators from the cache. Defaults to 60.
+        """
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.ttl: float = ttl
+        self._entries: OrderedDict[str, CachedListing] = OrderedDict()
+        self._size: int = 0
+        self._lock: Lock = Lock()
+
+    def get(self, url: str) -> Optional[CachedListing]:
+        """Get the cached response and mark it as recently used.
+
+        Args:
+            url (str): listing URL.
+
+        Returns:
+            Optional[CachedListing]: cached response or None.
+        """
+        with self._lock:
+            entry: Optional[CachedListing] = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+
+            return entry
+
+    def is_fresh(self, entry: CachedListing) -> bool:
+        """Check if the response without validators can be used without the request.
+
+        Args:
+            entry (CachedListing): cached response.
+
+        Returns:
+            bool: True if the response can be used as is.
+        """
+        return not entry.has_validators and time() - entry.stored_at < self.ttl
+
+    @staticmethod
+    def get_conditional_headers(entry: CachedListing) -> dict[str, str]:
+        """Get headers for the conditional request.
+
+        Args:
+            entry (CachedListing): cached response.
+
+        Returns:
+            dict[str, str]: If-None-Match and If-Modified-Since headers.
+        """
+        headers: dict[str, str] = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+
+        return headers
+
+    def _evict(self) -> None:
+        """Remove least recently used responses until the cache fits its limits. Called with the lock."""
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            _, evicted_entry = self._entries.popitem(last=False)
+            self._size -= len(evicted_entry.body)
+
+    def store(self, url: str, response: Response) -> bytes:
+        """Cache the successful response.
+
+        Args:
+            url (str): listing URL.
+            response (Response): listing response.
+
+        Returns:
+            bytes: response body.
+        """
+        entry: CachedListing = CachedListing(
+            body=response.content,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            stored_at=time()
+        )
+        with self._lock:
+            previous_entry: Optional[CachedListing] = self._entries.pop(url, None)
+            if previous_entry is not None:
+                self._size -= len(previous_entry.body)
+
+            self._entries[url] = entry
+            self._size += len(entry.body)
+            self._evict()
+
+        return entry.body
+
+    def touch(self, url: str) -> None:
+        """Mark the cached response as revalidated (after 304 response).
+
+        Args:
+            url (str): listing URL.
+        """
+        with self._lock:
+            entry: Optional[CachedListing] = self._entries.get(url)
+            if entry is not None:
+                entry.stored_at = time()
+                self._entries.move_to_end(url)
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        """Return the count of cached responses"""
+        return len(self._entries)
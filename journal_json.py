@@ -0,0 +1,152 @@
+
+## Built-in modules: ##
+from threading import Lock
+from typing import Any, Callable, Optional
+
+
+## Listing fields used by HomeworkModel, in the HomeworkModel.from_record order: ##
+HOMEWORK_RECORD_FIELDS: tuple[str, ...] = (
+    "status",
+    "fio_teach",
+    "name_spec",
+    "file_path",
+    "comment",
+    "creation_time",
+    "theme",
+)
+
+HomeworkRecord = tuple[Optional[int], Optional[str], Optional[str], Optional[str], Optional[str], Optional[str], Optional[str]]
+
+_backend_name: Optional[str] = None
+_loads: Optional[Callable[[bytes], Any]] = None
+_decode_homework_records: Optional[Callable[[bytes], list[HomeworkRecord]]] = None
+_backend_lock: Lock = Lock()
+
+
+def _decode_homework_records_from_objects(body: bytes) -> list[HomeworkRecord]:
+    """Decode the listing with the generic json backend and take the used fields only.
+
+    Args:
+        body (bytes): listing response body.
+
+    Returns:
+        list[HomeworkRecord]: homework records.
+    """
+    return [
+        tuple(homework.get(field) for field in HOMEWORK_RECORD_FIELDS)
+        for homework in _loads(body)
+    ]
+
+
+def _create_msgspec_decoder() -> Callable[[bytes], list[HomeworkRecord]]:
+    """Create msgspec decoder, which decodes the listing straight to the structs with the used fields only.
+    Other fields of the listing are skipped without creating python objects for them.
+
+    Returns:
+        Callable[[bytes], list[HomeworkRecord]]: listing decoder.
+    """
+    import msgspec
+
+    class MsgspecHomeworkRecord(msgspec.Struct):
+        status: Optional[int] = None
+        fio_teach: Optional[str] = None
+        name_spec: Optional[str] = None
+        file_path: Optional[str] = None
+        comment: Optional[str] = None
+        creation_time: Optional[str] = None
+        theme: Optional[str] = None
+
+    decoder = msgspec.json.Decoder(list[MsgspecHomeworkRecord])
+
+    def decode_homework_records(body: bytes) -> list[HomeworkRecord]:
+        try:
+            homeworks: list[MsgspecHomeworkRecord] = decoder.decode(body)
+        except msgspec.ValidationError:
+            ## Listing with unexpected field types is decoded by the generic backend: ##
+            return _decode_homework_records_from_objects(body)
+
+        return [
+            (
+                homework.status,
+                homework.fio_teach,
+                homework.name_spec,
+                homework.file_path,
+                homework.comment,
+                homework.creation_time,
+                homework.theme
+            )
+            for homework in homeworks
+        ]
+
+    return decode_homework_records
+
+
+def _load_backend() -> None:
+    """Choose the fastest installed json backend: msgspec, orjson or the built-in json module."""
+    global _backend_name, _loads, _decode_homework_records
+
+    if _backend_name is not None:
+        return
+
+    with _backend_lock:
+        if _backend_name is not None:
+            return
+
+        try:
+            import msgspec
+
+            _loads = msgspec.json.decode
+            _decode_homework_records = _create_msgspec_decoder()
+            _backend_name = "msgspec"
+            return
+        except ImportError:
+            pass
+
+        try:
+            import orjson
+
+            _loads = orjson.loads
+            _backend_name = "orjson"
+        except ImportError:
+            import json
+
+            _loads = json.loads
+            _backend_name = "json"
+
+        _decode_homework_records = _decode_homework_records_from_objects
+
+
+def get_backend_name() -> str:
+    """Get the name of the used json backend.
+
+    Returns:
+        str: msgspec, orjson or json.
+    """
+    _load_backend()
+    return _backend_name
+
+
+def loads(body: bytes) -> Any:
+    """Decode json with the fastest installed backend.
+
+    Args:
+        body (bytes): json document.
+
+    Returns:
+        Any: decoded object.
+    """
+    _load_backend()
+    return _loads(body)
+
+
+def decode_homework_records(body: bytes) -> list[HomeworkRecord]:
+    """Decode the homeworks listing in one pass into the tuples of the used fields.
+
+    Args:
+        body (bytes): listing response body.
+
+    Returns:
+        list[HomeworkRecord]: homework records in the HOMEWORK_RECORD_FIELDS order.
+    """
+    _load_backend()
+    return _decode_homework_records(body)
@@ -1,27 +1,128 @@
 
 ## Built-in modules: ##
-from typing import Callable
+from typing import Any, Callable, Optional, TYPE_CHECKING
 from functools import wraps
-from time import time
+from threading import Lock
+from time import perf_counter
 from os import PathLike
-
-## Pip modules: ##
-from loguru import logger
+from sys import stderr
 
 ## Local modules: ##
 from config import current_dir_path
+from journal_metrics import get_metrics_registry, FUNCTION_DURATION_METRIC
+
+if TYPE_CHECKING:
+    from loguru import Logger, Record
 
 
 LOGGER_PATH: PathLike = f"{current_dir_path}/LOGS.log"
 
-logger.add(
-    sink=LOGGER_PATH,
-    colorize=True,
-    level="DEBUG",
-    compression="zip",
-    rotation="1 MB"
-)
-logger.info(f"Logger was initialized. Logs path: {LOGGER_PATH}")
+## Subsystems of the logged methods, their verbosity can be set separately: ##
+REQUESTS_SUBSYSTEM: str = "requests"
+FOLDER_MANAGER_SUBSYSTEM: str = "folder_manager"
+WATCHER_SUBSYSTEM: str = "watcher"
+POSTPROCESSING_SUBSYSTEM: str = "postprocessing"
+SUBSYSTEMS: tuple[str, ...] = (REQUESTS_SUBSYSTEM, FOLDER_MANAGER_SUBSYSTEM, WATCHER_SUBSYSTEM, POSTPROCESSING_SUBSYSTEM)
+
+_logger: Optional["Logger"] = None
+_subsystem_loggers: dict[str, "Logger"] = {}
+_logger_lock: Lock = Lock()
+
+
+def setup_logging(
+    level: str = "INFO",
+    subsystem_levels: Optional[dict[str, str]] = None,
+    log_path: Optional[PathLike] = LOGGER_PATH,
+    stderr_level: Optional[str] = "WARNING",
+    enqueue: bool = True
+) -> "Logger":
+    """Configure the loguru sinks. Call it once at the startup, before the first logged request.
+    Records are filtered by the level of their subsystem before the message is formatted.
+    With enqueue the records are written and the logs file is rotated by the loguru thread,
+    so the download workers only put records to the queue.
+
+    Args:
+        level (str, optional): level of the records without subsystem and of the subsystems
+            not in subsystem_levels. Defaults to "INFO".
+        subsystem_levels (Optional[dict[str, str]], optional): levels by the subsystem name
+            (requests, folder_manager, watcher, postprocessing). Defaults to None.
+        log_path (Optional[PathLike], optional): logs file path or None to not write the logs file.
+            Defaults to LOGGER_PATH.
+        stderr_level (Optional[str], optional): level of the records printed to stderr or None to not print them.
+            Defaults to "WARNING".
+        enqueue (bool, optional): write the logs file in the background thread. Defaults to True.
+
+    Raises:
+        ValueError: if some level or subsystem is unknown.
+
+    Returns:
+        Logger: configured loguru logger.
+    """
+    global _logger
+
+    from loguru import logger
+
+    subsystem_levels: dict[str, str] = subsystem_levels or {}
+    unknown_subsystems: set[str] = set(subsystem_levels) - set(SUBSYSTEMS)
+    if unknown_subsystems:
+        raise ValueError(f"Unknown logging subsystems: {', '.join(sorted(unknown_subsystems))}.")
+
+    try:
+        default_level_no: int = logger.level(level.upper()).no
+        subsystem_level_numbers: dict[str, int] = {
+            subsystem: logger.level(subsystem_level.upper()).no
+            for subsystem, subsystem_level in subsystem_levels.items()
+        }
+    except ValueError as error:
+        raise ValueError(f"Unknown logging level: {error}") from None
+
+    def filter_by_subsystem(record: "Record") -> bool:
+        subsystem: Optional[str] = record["extra"].get("subsystem")
+        return record["level"].no >= subsystem_level_numbers.get(subsystem, default_level_no)
+
+    with _logger_lock:
+        logger.remove()
+        if log_path is not None:
+            logger.add(
+                sink=log_path,
+                level=min((default_level_no, *subsystem_level_numbers.values())),
+                filter=filter_by_subsystem,
+                enqueue=enqueue,
+                compression="zip",
+                rotation="1 MB"
+            )
+        if stderr_level is not None:
+            logger.add(sink=stderr, level=stderr_level.upper(), filter=filter_by_subsystem)
+
+        _subsystem_loggers.clear()
+        _logger = logger
+
+    logger.info("Logger was initialized. Logs path: {}", log_path)
+    return logger
+
+
+def get_logger(subsystem: Optional[str] = None) -> "Logger":
+    """Get the loguru logger. If setup_logging wasn't called, the DEBUG logs file sink
+    is added on the first call, so importing the modules with logged methods doesn't touch the logs file.
+
+    Args:
+        subsystem (Optional[str], optional): subsystem of the records. Defaults to None.
+
+    Returns:
+        Logger: loguru logger bound to the subsystem.
+    """
+    if _logger is None:
+        setup_logging(level="DEBUG")
+
+    if subsystem is None:
+        return _logger
+
+    subsystem_logger: Optional["Logger"] = _subsystem_loggers.get(subsystem)
+    if subsystem_logger is None:
+        subsystem_logger: "Logger" = _logger.bind(subsystem=subsystem)
+        _subsystem_loggers[subsystem] = subsystem_logger
+
+    return subsystem_logger
 
 
 def folder_manager_logger(function: Callable) -> Callable:
@@ -34,20 +135,23 @@ def folder_manager_logger(function: Callable) -> Callable:
         Callable: Wrapper function.
     """
     @wraps(function)
-    def wrapper(*args, **kwargs) -> None:
-        """Folder manager method wrapper."""
-        start_time: float = time()
-        logger.debug(f"\n>>> Running FolderManager method {function.__name__}... <<<")
+    def wrapper(*args, **kwargs) -> Any:
+        """Folder manager method wrapper, returns the method result."""
+        logger: "Logger" = get_logger(subsystem=FOLDER_MANAGER_SUBSYSTEM)
+        start_time: float = perf_counter()
+        ## Messages are formatted by loguru only if the record passes the level filter: ##
+        logger.debug(">>> Running FolderManager method {}... <<<", function.__name__)
         
         try:
-            function(*args, **kwargs)
-            end_time: float = time() - start_time
-            logger.debug(f"""\n>>> Succesful file creation from {function.__name__}. 
-                Took time: {round(end_time, 2)} sec. <<<
-            """)
+            result: Any = function(*args, **kwargs)
+            end_time: float = perf_counter() - start_time
+            get_metrics_registry().observe(FUNCTION_DURATION_METRIC, end_time, function=function.__name__)
+            logger.debug(">>> Succesful file creation from {}. Took time: {:.3f} sec. <<<", function.__name__, end_time)
+            
+            return result
         
         except Exception as error:
-            logger.error(f">>>\n An error was occured in FolderManager method {function.__name__}. \n Error: {error}. <<<")
+            logger.error(">>> An error was occured in FolderManager method {}. Error: {}. <<<", function.__name__, error)
             raise Exception(error)
     
     return wrapper
@@ -69,19 +173,19 @@ def request_logger(function: Callable) -> Callable:
         Returns:
             dict: response.json object.
         """
-        start_time: float = time()
-        logger.debug(f"\n>>> Running request {function.__name__}... <<<")
+        logger: "Logger" = get_logger(subsystem=REQUESTS_SUBSYSTEM)
+        start_time: float = perf_counter()
+        logger.debug(">>> Running request {}... <<<", function.__name__)
         try:
             json_response: dict = function(*args, **kwargs)
-            end_time: float = time() - start_time
-            logger.debug(f"""\n>>> Succesful response from {function.__name__}. 
-                Took time: {round(end_time, 2)} sec. <<<
-            """)
+            end_time: float = perf_counter() - start_time
+            get_metrics_registry().observe(FUNCTION_DURATION_METRIC, end_time, function=function.__name__)
+            logger.debug(">>> Succesful response from {}. Took time: {:.3f} sec. <<<", function.__name__, end_time)
             
             return json_response
         
         except Exception as error:
-            logger.critical(f">>>\n An error was occured in {function.__name__} request. \n Error: {error}. <<<")
+            logger.critical(">>> An error was occured in {} request. Error: {}. <<<", function.__name__, error)
             raise Exception(error)
     
-    return wrapper
\ No newline at end of file
+    return wrapper
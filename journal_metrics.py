@@ -0,0 +1,277 @@
+
+## Built-in modules: ##
+from bisect import bisect_left
+from contextlib import contextmanager
+from json import dump
+from math import inf
+from os import PathLike
+from threading import Lock
+from time import perf_counter
+from typing import Any, Generator
+from urllib.parse import urlsplit
+
+
+## Histogram buckets in seconds, from the fast listing requests to the big file downloads: ##
+DEFAULT_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, inf)
+
+## Metric names used by the scrapper modules: ##
+REQUEST_DURATION_METRIC: str = "journal_request_duration_seconds"
+REQUEST_RETRIES_METRIC: str = "journal_request_retries_total"
+LOGINS_METRIC: str = "journal_logins_total"
+DOWNLOADED_BYTES_METRIC: str = "journal_downloaded_bytes_total"
+DISK_WRITE_DURATION_METRIC: str = "journal_disk_write_duration_seconds"
+FUNCTION_DURATION_METRIC: str = "journal_function_duration_seconds"
+WATCHER_POLLS_METRIC: str = "journal_watcher_polls_total"
+POSTPROCESSED_FILES_METRIC: str = "journal_postprocessed_files_total"
+POSTPROCESSING_DURATION_METRIC: str = "journal_postprocessing_duration_seconds"
+POSTPROCESSING_QUEUE_WAIT_METRIC: str = "journal_postprocessing_queue_wait_seconds"
+RATE_LIMIT_WAIT_METRIC: str = "journal_rate_limit_wait_seconds"
+RATE_LIMITED_METRIC: str = "journal_rate_limited_total"
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def get_endpoint_name(url: str) -> str:
+    """Get the short endpoint name of the Journal API URL for the metric labels.
+
+    Args:
+        url (str): request URL.
+
+    Returns:
+        str: login, list or file (any other URL is the homework file).
+    """
+    path: str = urlsplit(url).path
+    if path.endswith("/auth/login"):
+        return "login"
+    if path.endswith("/homework/operations/list"):
+        return "list"
+    return "file"
+
+
+class Histogram(object):
+    """Cumulative histogram with the fixed buckets, like the Prometheus histogram."""
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """Initialize the empty histogram.
+
+        Args:
+            buckets (tuple[float, ...], optional): sorted upper bounds of the buckets, the last one must be inf.
+                Defaults to DEFAULT_BUCKETS.
+        """
+        self.buckets: tuple[float, ...] = buckets
+        self.bucket_counts: list[int] = [0] * len(buckets)
+        self.count: int = 0
+        self.sum: float = 0.0
+        self.max: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add the value to the histogram.
+
+        Args:
+            value (float): observed value.
+        """
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def get_quantile(self, quantile: float) -> float:
+        """Estimate the quantile with the linear interpolation inside the bucket, like histogram_quantile does.
+
+        Args:
+            quantile (float): quantile from 0 to 1.
+
+        Returns:
+            float: estimated value or 0 if the histogram is empty.
+        """
+        if not self.count:
+            return 0.0
+
+        rank: float = quantile * self.count
+        cumulative_count: int = 0
+        for index, bucket_count in enumerate(self.bucket_counts):
+            if cumulative_count + bucket_count >= rank and bucket_count:
+                lower_bound: float = self.buckets[index - 1] if index else 0.0
+                upper_bound: float = min(self.buckets[index], self.max)
+                return lower_bound + (upper_bound - lower_bound) * (rank - cumulative_count) / bucket_count
+            cumulative_count += bucket_count
+
+        return self.max
+
+    def to_dict(self) -> dict[str, float]:
+        """Get the histogram summary.
+
+        Returns:
+            dict[str, float]: count, sum, mean, max and p50/p90/p99.
+        """
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+            "max": self.max,
+            "p50": self.get_quantile(0.5),
+            "p90": self.get_quantile(0.9),
+            "p99": self.get_quantile(0.99),
+        }
+
+
+class MetricsRegistry(object):
+    """Thread-safe registry of counters and histograms with labels.
+    Durations are measured with perf_counter, so they are monotonic and not rounded."""
+    def __init__(self) -> None:
+        """Initialize the empty registry."""
+        self.counters: dict[str, dict[Labels, float]] = {}
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def _get_labels(labels: dict[str, Any]) -> Labels:
+        """Get the hashable sorted labels.
+
+        Args:
+            labels (dict[str, Any]): metric labels.
+
+        Returns:
+            Labels: sorted (name, value) pairs.
+        """
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """Increase the counter.
+
+        Args:
+            name (str): counter name.
+            value (float, optional): increment. Defaults to 1.
+            **labels: counter labels.
+        """
+        metric_labels: Labels = self._get_labels(labels=labels)
+        with self._lock:
+            counter: dict[Labels, float] = self.counters.setdefault(name, {})
+            counter[metric_labels] = counter.get(metric_labels, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Add the value to the histogram.
+
+        Args:
+            name (str): histogram name.
+            value (float): observed value (seconds for the durations).
+            **labels: histogram labels.
+        """
+        metric_labels: Labels = self._get_labels(labels=labels)
+        with self._lock:
+            histograms: dict[Labels, Histogram] = self.histograms.setdefault(name, {})
+            if metric_labels not in histograms:
+                histograms[metric_labels] = Histogram()
+            histograms[metric_labels].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Generator[None, None, None]:
+        """Measure the duration of the block into the histogram. It's recorded even if the block raises.
+
+        Args:
+            name (str): histogram name.
+            **labels: histogram labels.
+        """
+        start_time: float = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start_time, **labels)
+
+    def clear(self) -> None:
+        """Remove all metrics."""
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def to_dict(self) -> dict[str, Any]:
+        """Get the summary of all metrics.
+
+        Returns:
+            dict[str, Any]: counters and histograms by the name, every metric is a list of labels with values.
+        """
+        with self._lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(labels), "value": value} for labels, value in counter.items()]
+                    for name, counter in self.counters.items()
+                },
+                "histograms": {
+                    name: [{"labels": dict(labels), **histogram.to_dict()} for labels, histogram in histograms.items()]
+                    for name, histograms in self.histograms.items()
+                },
+            }
+
+    @staticmethod
+    def _format_prometheus_labels(labels: Labels) -> str:
+        """Format labels for the Prometheus text format.
+
+        Args:
+            labels (Labels): metric labels.
+
+        Returns:
+            str: labels like {name="value"} or empty string.
+        """
+        if not labels:
+            return ""
+
+        formatted_labels: list[str] = []
+        for name, value in labels:
+            escaped_value: str = value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+            formatted_labels.append(f"{name}=\"{escaped_value}\"")
+        return f"{{{','.join(formatted_labels)}}}"
+
+    def to_prometheus(self) -> str:
+        """Get all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: metrics text.
+        """
+        lines: list[str] = []
+        with self._lock:
+            for name, counter in sorted(self.counters.items()):
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in counter.items():
+                    lines.append(f"{name}{self._format_prometheus_labels(labels)} {value:g}")
+
+            for name, histograms in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for labels, histogram in histograms.items():
+                    cumulative_count: int = 0
+                    for bucket, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+                        cumulative_count += bucket_count
+                        bucket_labels: Labels = labels + (("le", "+Inf" if bucket == inf else f"{bucket:g}"),)
+                        lines.append(f"{name}_bucket{self._format_prometheus_labels(bucket_labels)} {cumulative_count}")
+                    lines.append(f"{name}_sum{self._format_prometheus_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{name}_count{self._format_prometheus_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path: PathLike) -> None:
+        """Write the metrics summary to the json file.
+
+        Args:
+            path (PathLike): json file path.
+        """
+        with open(file=path, mode="w", encoding="utf-8") as file:
+            dump(self.to_dict(), file, indent=2)
+
+    def write_prometheus(self, path: PathLike) -> None:
+        """Write the metrics to the file in the Prometheus text format (for node_exporter textfile collector).
+
+        Args:
+            path (PathLike): metrics file path.
+        """
+        with open(file=path, mode="w", encoding="utf-8") as file:
+            file.write(self.to_prometheus())
+
+
+_metrics_registry: MetricsRegistry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the metrics registry shared by all scrapper modules.
+
+    Returns:
+        MetricsRegistry: process-wide metrics registry.
+    """
+    return _metrics_registry
@@ -0,0 +1,371 @@
+
+## Built-in modules: ##
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass
+from hashlib import sha256
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from json import dumps
+from random import Random
+from secrets import token_hex
+from threading import Thread, Lock
+from time import monotonic, sleep
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs, quote, SplitResult
+from zlib import crc32
+
+
+CONTENT_DISPOSITION_FORMATS: tuple[str, ...] = ("quoted", "unquoted", "rfc5987", "mixed")
+
+
+@dataclass
+class MockServerConfig(object):
+    """Dataclass to hold the mock Journal API behaviour"""
+    homeworks_per_page: int = 20
+    pages: int = 3
+    file_size: int = 256 * 1024
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    ## Share of the listing and file requests with 503 response: ##
+    error_rate: float = 0.0
+    ## Max listing and file requests per second, the rest get 429 with Retry-After (None is unlimited): ##
+    rate_limit: Optional[float] = None
+    content_disposition_format: str = "quoted"
+    token_lifetime: int = 3600
+    seed: int = 0
+
+
+class JournalMockServer(object):
+    """Local stand-in for the Journal API: login, paginated homework listing and file downloads.
+    Listing supports ETag revalidation, files support Range requests.
+    It's used by the benchmarks, so the scrapper can be measured without the real API."""
+    API_PREFIX: str = "/api/v2"
+    FILES_PREFIX: str = "/files/"
+
+    def __init__(
+        self,
+        config: Optional[MockServerConfig] = None,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ) -> None:
+        """Initialize the server. It's not started until start is called.
+
+        Args:
+            config (Optional[MockServerConfig], optional): server behaviour. Defaults to None (MockServerConfig()).
+            host (str, optional): host to bind. Defaults to "127.0.0.1".
+            port (int, optional): port to bind. Defaults to 0 (any free port).
+        """
+        self.config: MockServerConfig = config or MockServerConfig()
+        self.tokens: set[str] = set()
+        self.requests_count: dict[str, int] = {}
+        self._random: Random = Random(self.config.seed)
+        self._window_started_at: float = 0.0
+        self._window_requests_count: int = 0
+        self._lock: Lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._server: ThreadingHTTPServer = ThreadingHTTPServer((host, port), self._create_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        """Get the server URL.
+
+        Returns:
+            str: URL like http://127.0.0.1:port.
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        """Get the API URL for config.JOURNAL_API_URL (JOURNAL_API_URL environment variable).
+
+        Returns:
+            str: API URL.
+        """
+        return f"{self.base_url}{self.API_PREFIX}"
+
+    def start(self) -> "JournalMockServer":
+        """Start serving in the background thread.
+
+        Returns:
+            JournalMockServer: the server itself.
+        """
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serve in the calling thread until stop is called from another thread or Ctrl+C."""
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        """Stop the server and close its socket."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "JournalMockServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def _count_request(self, endpoint: str) -> None:
+        """Count the request to the endpoint.
+
+        Args:
+            endpoint (str): endpoint name.
+        """
+        with self._lock:
+            self.requests_count[endpoint] = self.requests_count.get(endpoint, 0) + 1
+
+    def _should_fail(self) -> bool:
+        """Check if the request must get the random 503 error.
+
+        Returns:
+            bool: True if the request must fail.
+        """
+        with self._lock:
+            return self._random.random() < self.config.error_rate
+
+    def _is_rate_limited(self) -> bool:
+        """Check if the request is over config.rate_limit in the current second.
+
+        Returns:
+            bool: True if the request must get 429.
+        """
+        if self.config.rate_limit is None:
+            return False
+
+        with self._lock:
+            now: float = monotonic()
+            if now - self._window_started_at >= 1:
+                self._window_started_at = now
+                self._window_requests_count = 0
+            self._window_requests_count += 1
+            return self._window_requests_count > self.config.rate_limit
+
+    def _wait_latency(self) -> None:
+        """Sleep for the configured latency with jitter."""
+        with self._lock:
+            jitter: float = self._random.uniform(-self.config.latency_jitter, self.config.latency_jitter)
+        latency: float = max(0.0, self.config.latency + jitter)
+        if latency:
+            sleep(latency)
+
+    def get_listing(self, page: int, status: int, group_id: int) -> list[dict]:
+        """Get the homeworks of the listing page. Pages after config.pages are empty.
+
+        Args:
+            page (int): Homework page.
+            status (int): Homework status.
+            group_id (int): homework group id.
+
+        Returns:
+            list[dict]: homeworks like the Journal API returns them.
+        """
+        SUBJECTS_COUNT: int = 7
+
+        if page < 0 or page >= self.config.pages:
+            return []
+
+        homeworks: list[dict] = []
+        for index in range(self.config.homeworks_per_page):
+            file_id: str = f"{group_id}-{status}-{page}-{index}"
+            homeworks.append({
+                "id": index,
+                "status": status,
+                "fio_teach": f"Teacher {index % SUBJECTS_COUNT}",
+                "name_spec": f"Subject {index % SUBJECTS_COUNT}",
+                "file_path": f"{self.base_url}{self.FILES_PREFIX}{file_id}",
+                "comment": f"Comment {file_id}",
+                "creation_time": f"2024-01-{page % 28 + 1:02d} 10:{index % 60:02d}:00",
+                "theme": f"Homework {file_id}",
+                "stud_answer": None,
+                "cover_image": None,
+            })
+
+        return homeworks
+
+    def get_file(self, file_id: str) -> bytes:
+        """Get the file content. It's the same for the same file id.
+
+        Args:
+            file_id (str): file id from the file URL.
+
+        Returns:
+            bytes: file content.
+        """
+        return Random(file_id).randbytes(self.config.file_size)
+
+    def get_content_disposition(self, file_id: str) -> str:
+        """Get Content-Disposition header in the configured format.
+
+        Args:
+            file_id (str): file id from the file URL.
+
+        Returns:
+            str: header value.
+        """
+        filename: str = f"homework {file_id}.zip"
+        content_disposition_format: str = self.config.content_disposition_format
+        if content_disposition_format == "mixed":
+            ## crc32 doesn't depend on PYTHONHASHSEED, so the file gets the same format in every run: ##
+            content_disposition_format: str = CONTENT_DISPOSITION_FORMATS[crc32(file_id.encode()) % 3]
+
+        if content_disposition_format == "unquoted":
+            return f"attachment; filename={filename.replace(' ', '_')}"
+        if content_disposition_format == "rfc5987":
+            return f"attachment; filename*=UTF-8''{quote(filename)}"
+        return f"attachment; filename=\"{filename}\""
+
+    def _create_handler(self) -> type:
+        """Create the request handler class bound to the server.
+
+        Returns:
+            type: BaseHTTPRequestHandler subclass.
+        """
+        mock_server: JournalMockServer = self
+
+        class JournalMockRequestHandler(BaseHTTPRequestHandler):
+            protocol_version: str = "HTTP/1.1"
+            ## Headers and body are separate writes, Nagle's algorithm would delay the body for the ACK: ##
+            disable_nagle_algorithm: bool = True
+
+            def log_message(self, format: str, *args) -> None:
+                """Don't print every request to stderr."""
+
+            def _send(self, status_code: int, body: bytes = b"", headers: Optional[dict[str, str]] = None) -> None:
+                self.send_response(status_code)
+                for header, value in (headers or {}).items():
+                    self.send_header(header, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body and self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _send_json(self, data: object, headers: Optional[dict[str, str]] = None) -> None:
+                self._send(200, dumps(data).encode(), {"Content-Type": "application/json", **(headers or {})})
+
+            def _before_request(self, endpoint: str, can_fail: bool = True) -> bool:
+                mock_server._count_request(endpoint=endpoint)
+                if can_fail and mock_server._is_rate_limited():
+                    self._send(429, b"Too Many Requests", {"Retry-After": "1"})
+                    return False
+                mock_server._wait_latency()
+                if can_fail and mock_server._should_fail():
+                    self._send(503, b"Service Unavailable", {"Retry-After": "0"})
+                    return False
+                return True
+
+            def do_POST(self) -> None:
+                content_length: int = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(content_length)
+
+                if self.path != f"{mock_server.API_PREFIX}/auth/login":
+                    self._send(404)
+                    return
+                ## Login is never failed: POST requests are not retried by the transport. ##
+                if not self._before_request(endpoint="login", can_fail=False):
+                    return
+
+                access_token: str = token_hex(16)
+                with mock_server._lock:
+                    mock_server.tokens.add(access_token)
+                self._send_json({
+                    "access_token": access_token,
+                    "expires_in_access": mock_server.config.token_lifetime
+                })
+
+            def do_GET(self) -> None:
+                url: SplitResult = urlsplit(self.path)
+                if url.path == f"{mock_server.API_PREFIX}/homework/operations/list":
+                    self._get_listing(url=url)
+                elif url.path.startswith(mock_server.FILES_PREFIX):
+                    self._get_file(file_id=url.path[len(mock_server.FILES_PREFIX):])
+                else:
+                    self._send(404)
+
+            def _get_listing(self, url: SplitResult) -> None:
+                if not self._before_request(endpoint="list"):
+                    return
+
+                authorization: str = self.headers.get("Authorization", "")
+                if authorization.removeprefix("Bearer ") not in mock_server.tokens:
+                    self._send(401)
+                    return
+
+                query: dict[str, list[str]] = parse_qs(url.query)
+                body: bytes = dumps(mock_server.get_listing(
+                    page=int(query.get("page", ["0"])[0]),
+                    status=int(query.get("status", ["0"])[0]),
+                    group_id=int(query.get("group_id", ["0"])[0])
+                )).encode()
+                etag: str = f"\"{sha256(body).hexdigest()[:16]}\""
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, headers={"ETag": etag})
+                    return
+
+                self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+            def _get_file(self, file_id: str) -> None:
+                if not self._before_request(endpoint="file"):
+                    return
+
+                content: bytes = mock_server.get_file(file_id=file_id)
+                headers: dict[str, str] = {
+                    "Content-Type": "application/zip",
+                    "Content-Disposition": mock_server.get_content_disposition(file_id=file_id),
+                    "ETag": f"\"{file_id}\"",
+                    "Accept-Ranges": "bytes",
+                }
+                range_header: Optional[str] = self.headers.get("Range")
+                if range_header and range_header.startswith("bytes=") and range_header.endswith("-"):
+                    offset: int = int(range_header[len("bytes="):-1])
+                    if offset >= len(content):
+                        self._send(416, headers={"Content-Range": f"bytes */{len(content)}"})
+                        return
+
+                    headers["Content-Range"] = f"bytes {offset}-{len(content) - 1}/{len(content)}"
+                    self._send(206, content[offset:], headers)
+                    return
+
+                self._send(200, content, headers)
+
+        return JournalMockRequestHandler
+
+
+def main() -> None:
+    """Run the mock server from the command line until Ctrl+C."""
+    parser: ArgumentParser = ArgumentParser(description="Local stand-in for the Journal API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--homeworks-per-page", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=3, help="not empty pages of every listing")
+    parser.add_argument("--file-size", type=int, default=256 * 1024, help="file size in bytes")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before every response")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of the requests with 503 response")
+    parser.add_argument("--rate-limit", type=float, help="max listing and file requests per second (default: unlimited)")
+    parser.add_argument("--content-disposition", choices=CONTENT_DISPOSITION_FORMATS, default="quoted")
+    arguments: Namespace = parser.parse_args()
+
+    config: MockServerConfig = MockServerConfig(
+        homeworks_per_page=arguments.homeworks_per_page,
+        pages=arguments.pages,
+        file_size=arguments.file_size,
+        latency=arguments.latency,
+        latency_jitter=arguments.latency_jitter,
+        error_rate=arguments.error_rate,
+        rate_limit=arguments.rate_limit,
+        content_disposition_format=arguments.content_disposition
+    )
+    mock_server: JournalMockServer = JournalMockServer(config=config, host=arguments.host, port=arguments.port)
+    print(f"Mock Journal API: JOURNAL_API_URL={mock_server.api_url}", flush=True)
+    try:
+        mock_server.serve_forever()
+    except KeyboardInterrupt:
+        mock_server.stop()
+
+
+if __name__ == "__main__":
+    main()
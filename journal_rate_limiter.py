@@ -0,0 +1,301 @@
+
+## Built-in modules: ##
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep
+from typing import Optional
+
+## Local modules: ##
+from journal_metrics import (
+    MetricsRegistry,
+    get_metrics_registry,
+    get_endpoint_name,
+    RATE_LIMIT_WAIT_METRIC,
+    RATE_LIMITED_METRIC
+)
+
+
+class TokenBucket(object):
+    """Thread-safe token bucket. Every request takes one token, tokens are refilled with the rate
+    up to the burst. Callers reserve their token under the lock and sleep outside of it,
+    so waiting threads are served in the reservation order without the busy loop.
+    The rate is lowered after 429 responses and slowly restored after the successful ones (AIMD)."""
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        min_rate: Optional[float] = None,
+        decrease_factor: float = 0.5,
+        increase_share: float = 0.05
+    ) -> None:
+        """Initialize the full bucket.
+
+        Args:
+            rate (float): max tokens per second.
+            burst (int): max tokens in the bucket.
+            min_rate (Optional[float], optional): min rate after the 429 responses. Defaults to None (rate / 10).
+            decrease_factor (float, optional): rate multiplier after the 429 response. Defaults to 0.5.
+            increase_share (float, optional): share of the max rate added after the successful response. Defaults to 0.05.
+
+        Raises:
+            ValueError: if the rate, the burst or the factors are not valid.
+        """
+        MIN_RATE_DIVIDER: int = 10
+
+        if rate <= 0 or burst < 1:
+            raise ValueError("Token bucket rate and burst must be positive.")
+        if not 0 < decrease_factor < 1 or not 0 <= increase_share <= 1:
+            raise ValueError("Token bucket decrease_factor must be in (0, 1) and increase_share in [0, 1].")
+
+        self.max_rate: float = rate
+        self.min_rate: float = min(rate, min_rate or rate / MIN_RATE_DIVIDER)
+        self.rate: float = rate
+        self.burst: int = burst
+        self.decrease_factor: float = decrease_factor
+        self.increase_share: float = increase_share
+        self._tokens: float = burst
+        self._updated_at: float = monotonic()
+        self._paused_until: float = 0.0
+        self._lock: Lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens for the time since the last update. It's called under the lock.
+        Nothing is added before the end of the pause, the last update time is moved there by pause.
+
+        Args:
+            now (float): monotonic time.
+        """
+        if now <= self._updated_at:
+            return
+
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def reserve(self, tokens: int = 1) -> float:
+        """Take the tokens, even if the bucket doesn't have them yet.
+
+        Args:
+            tokens (int, optional): tokens to take. Defaults to 1.
+
+        Returns:
+            float: seconds to wait before the request.
+        """
+        with self._lock:
+            now: float = monotonic()
+            self._refill(now=now)
+            self._tokens -= tokens
+            ## Missing tokens are refilled after the last update, which is the end of the pause if it's not over: ##
+            return max(0.0, self._updated_at + max(0.0, -self._tokens) / self.rate - now, self._paused_until - now)
+
+    def get_pause_delay(self) -> float:
+        """Get the rest of the Retry-After pause.
+
+        Returns:
+            float: seconds until the end of the pause.
+        """
+        with self._lock:
+            return max(0.0, self._paused_until - monotonic())
+
+    def acquire(self, tokens: int = 1) -> float:
+        """Wait for the tokens. Pause, which was set while the caller was waiting, is waited too.
+
+        Args:
+            tokens (int, optional): tokens to take. Defaults to 1.
+
+        Returns:
+            float: waited seconds.
+        """
+        start_time: float = monotonic()
+        delay: float = self.reserve(tokens=tokens)
+        while delay > 0:
+            sleep(delay)
+            delay = self.get_pause_delay()
+
+        return monotonic() - start_time
+
+    def pause(self, delay: float) -> None:
+        """Don't give tokens for the delay and lower the rate, after the 429 response.
+
+        Args:
+            delay (float): pause in seconds, like the Retry-After header.
+        """
+        with self._lock:
+            now: float = monotonic()
+            self._refill(now=now)
+            self._paused_until = max(self._paused_until, now + delay)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            ## Requests after the pause start from the empty bucket, not from the burst refilled during the pause: ##
+            self._tokens = min(self._tokens, 0.0)
+            self._updated_at = max(self._updated_at, self._paused_until)
+
+    def on_success(self) -> None:
+        """Restore the rate after the successful response."""
+        if self.rate >= self.max_rate:
+            return
+
+        with self._lock:
+            self._refill(now=monotonic())
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.increase_share)
+
+
+class JournalRateLimiter(object):
+    """Request budget of all Journal requests, shared by all threads (and asyncio tasks) of the process.
+    The API (login and listings) and the files have separate token buckets,
+    429 responses pause the bucket of their budget for the Retry-After time.
+    Waiting time of every request is recorded to the metrics registry by the budget."""
+    API_BUDGET: str = "api"
+    FILES_BUDGET: str = "files"
+    ## Endpoints of the get_endpoint_name by the budget: ##
+    API_ENDPOINTS: tuple[str, ...] = ("login", "list")
+
+    def __init__(
+        self,
+        api_rate: Optional[float] = 5.0,
+        api_burst: int = 10,
+        files_rate: Optional[float] = 10.0,
+        files_burst: int = 20,
+        default_retry_after: float = 1.0,
+        max_retry_after: float = 300.0,
+        metrics_registry: Optional[MetricsRegistry] = None
+    ) -> None:
+        """Initialize the budgets.
+
+        Args:
+            api_rate (Optional[float], optional): max API requests per second or None to not limit them. Defaults to 5.0.
+            api_burst (int, optional): max API requests at once after the idle time. Defaults to 10.
+            files_rate (Optional[float], optional): max file requests per second or None to not limit them.
+                Defaults to 10.0.
+            files_burst (int, optional): max file requests at once after the idle time. Defaults to 20.
+            default_retry_after (float, optional): pause after the 429 response without Retry-After. Defaults to 1.0.
+            max_retry_after (float, optional): max pause, longer Retry-After values are cut. Defaults to 300.0.
+            metrics_registry (Optional[MetricsRegistry], optional): registry for the rate limit metrics.
+                Defaults to None (shared registry).
+
+        Raises:
+            ValueError: if some rate or burst is not positive.
+        """
+        self.buckets: dict[str, Optional[TokenBucket]] = {
+            self.API_BUDGET: TokenBucket(rate=api_rate, burst=api_burst) if api_rate is not None else None,
+            self.FILES_BUDGET: TokenBucket(rate=files_rate, burst=files_burst) if files_rate is not None else None,
+        }
+        self.default_retry_after: float = default_retry_after
+        self.max_retry_after: float = max_retry_after
+        self.metrics_registry: MetricsRegistry = metrics_registry or get_metrics_registry()
+
+    def get_budget_name(self, url: str) -> str:
+        """Get the budget of the request.
+
+        Args:
+            url (str): request URL.
+
+        Returns:
+            str: api or files.
+        """
+        return self.API_BUDGET if get_endpoint_name(url=url) in self.API_ENDPOINTS else self.FILES_BUDGET
+
+    def is_limited(self, url: str) -> bool:
+        """Check if the budget of the request has the token bucket.
+
+        Args:
+            url (str): request URL.
+
+        Returns:
+            bool: False if the budget is not limited (its rate is None).
+        """
+        return self.buckets[self.get_budget_name(url=url)] is not None
+
+    def acquire(self, url: str) -> float:
+        """Wait until the request can be sent.
+
+        Args:
+            url (str): request URL.
+
+        Returns:
+            float: waited seconds.
+        """
+        budget_name: str = self.get_budget_name(url=url)
+        bucket: Optional[TokenBucket] = self.buckets[budget_name]
+        if bucket is None:
+            return 0.0
+
+        waited_time: float = bucket.acquire()
+        self.metrics_registry.observe(RATE_LIMIT_WAIT_METRIC, waited_time, budget=budget_name)
+        return waited_time
+
+    async def acquire_async(self, url: str) -> float:
+        """Wait until the request can be sent, without blocking the event loop.
+
+        Args:
+            url (str): request URL.
+
+        Returns:
+            float: waited seconds.
+        """
+        from asyncio import sleep as async_sleep
+
+        budget_name: str = self.get_budget_name(url=url)
+        bucket: Optional[TokenBucket] = self.buckets[budget_name]
+        if bucket is None:
+            return 0.0
+
+        start_time: float = monotonic()
+        delay: float = bucket.reserve()
+        while delay > 0:
+            await async_sleep(delay)
+            delay = bucket.get_pause_delay()
+
+        waited_time: float = monotonic() - start_time
+        self.metrics_registry.observe(RATE_LIMIT_WAIT_METRIC, waited_time, budget=budget_name)
+        return waited_time
+
+    def parse_retry_after(self, retry_after: Optional[str]) -> float:
+        """Get the pause from the Retry-After header: seconds or HTTP date.
+
+        Args:
+            retry_after (Optional[str]): Retry-After header value.
+
+        Returns:
+            float: pause in seconds, default_retry_after if the header is missing or not valid.
+        """
+        if not retry_after:
+            return self.default_retry_after
+
+        try:
+            delay: float = float(retry_after)
+        except ValueError:
+            try:
+                delay: float = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return self.default_retry_after
+
+        return min(self.max_retry_after, max(0.0, delay))
+
+    def on_rate_limited(self, url: str, retry_after: Optional[str] = None) -> float:
+        """Pause the budget of the request after the 429 response.
+
+        Args:
+            url (str): request URL.
+            retry_after (Optional[str], optional): Retry-After header value. Defaults to None.
+
+        Returns:
+            float: pause in seconds.
+        """
+        budget_name: str = self.get_budget_name(url=url)
+        delay: float = self.parse_retry_after(retry_after=retry_after)
+        self.metrics_registry.increment(RATE_LIMITED_METRIC, budget=budget_name)
+
+        bucket: Optional[TokenBucket] = self.buckets[budget_name]
+        if bucket is not None:
+            bucket.pause(delay=delay)
+        return delay
+
+    def on_success(self, url: str) -> None:
+        """Restore the budget rate after the response without 429.
+
+        Args:
+            url (str): request URL.
+        """
+        bucket: Optional[TokenBucket] = self.buckets[self.get_budget_name(url=url)]
+        if bucket is not None:
+            bucket.on_success()
@@ -1,17 +1,31 @@
 
 ## Built-in modules: ##
+from __future__ import annotations
 from dataclasses import dataclass
-from typing import Any
+from email.message import Message
+from hashlib import sha256
+from json import dump, load, JSONDecodeError
+from os import PathLike, remove, replace, truncate
+from os.path import join, exists, getsize
+from secrets import token_hex
+from threading import Lock
+from time import time, perf_counter
+from typing import Any, Optional, TYPE_CHECKING
 
 ## Pip modules: ##
-from requests import Response, RequestException
-from requests import get, post
+## requests is imported only when it's needed, so the startup doesn't wait for the HTTP stack: ##
+if TYPE_CHECKING:
+    from requests import Response
 
 ## Local modules: ##
-from journal_headers import get_headers_for_login, get_headers_for_requests
+from journal_headers import JournalHeadersFactory
 from journal_loggers import request_logger
-from journal_headers import get_headers_for_downloads
-from config import JOURNAL_LOGIN_URL
+from journal_token_store import JournalTokenStore
+from journal_transport import JournalTransport, get_default_transport
+from journal_http_cache import ListingHttpCache, CachedListing
+from journal_json import loads
+from journal_metrics import get_metrics_registry, LOGINS_METRIC, DOWNLOADED_BYTES_METRIC, DISK_WRITE_DURATION_METRIC
+from config import JOURNAL_LOGIN_URL, JOURNAL_HOMEWORK_LIST_URL
 
 
 @dataclass
@@ -31,15 +45,28 @@ class UserInputData(object):
         }
 
 
+@dataclass
+class DownloadedHomeworkFile(object):
+    """Dataclass to hold the complete homework file, which was streamed to the partial file"""
+    file_ext: str
+    temp_path: PathLike
+    size: int
+    sha256: str
+
+
 class JournalLoginTokenParser(object):
     """Parses access token from the public ItTopJournal API. Uses journal user accout data to 
     take the token"""
     def __init__(
         self,
         login_data: dict[str, str] | UserInputData,
+        token_store: Optional[JournalTokenStore] = None,
+        transport: Optional[JournalTransport] = None,
+        headers_factory: Optional[JournalHeadersFactory] = None,
     ) -> None:
         """Journal Parser initialization for parsing the data from the ItTopJournal API
         There will be a new self. attrs with parsed information from API. You can check all of them with self.parsed_attr_names.
+        If token_store is passed, not expired token from the previous run is used instead of the login request.
 
         Args:
             login_data (dict[str, str] | UserInputData): dict object with 4 fields:
@@ -50,10 +77,73 @@ class JournalLoginTokenParser(object):
             ID_CITY = YOUR_ID_CITY (sometimes it can be "null").
             PASSWORD = YOUR_PASSWORD
             USER_NAME = YOUR_USERNAME
+            token_store (Optional[JournalTokenStore], optional): disk cache for the access token. Defaults to None.
+            transport (Optional[JournalTransport], optional): HTTP transport. Defaults to None (shared pooled transport).
+            headers_factory (Optional[JournalHeadersFactory], optional): headers of the session. 
+                Defaults to None (new factory with the random user-agent).
+        """
+        self.login_data: dict[str, str] | UserInputData = login_data
+        self.transport: JournalTransport = transport or get_default_transport()
+        self.headers_factory: JournalHeadersFactory = headers_factory or JournalHeadersFactory()
+        self.token_store: Optional[JournalTokenStore] = token_store
+        self._refresh_lock: Lock = Lock()
+        
+        self.access_token: str
+        self.expires_at: Optional[float]
+        cached_token: Optional[tuple[str, Optional[float]]] = None
+        if self.token_store is not None:
+            cached_token = self.token_store.load(login_data=login_data)
+        
+        if cached_token is not None:
+            self.access_token, self.expires_at = cached_token
+        else:
+            self.access_token, self.expires_at = self._login_in_journal_api(login_data=login_data)
+            self._save_token()
+        self.headers: dict[str, str] = self.headers_factory.get_headers_for_requests(token=self.access_token) 
+
+    @property
+    def is_token_expired(self) -> bool:
+        """Check if the access token is expired. Tokens without known expiry never expire here,
+        they will be refreshed after the first 401 response instead.
+
+        Returns:
+            bool: True if the token must be refreshed before the next request.
+        """
+        if self.expires_at is None:
+            return False
+        return time() >= self.expires_at
+
+    def refresh_token(self, stale_token: Optional[str] = None) -> str:
+        """Log in the Journal API again and rebuild the auth headers.
+        If stale_token is passed and another thread has already replaced it, 
+        the current token is returned without the new login.
+
+        Args:
+            stale_token (Optional[str], optional): token that was rejected by the API. Defaults to None.
+
+        Returns:
+            str: Fresh API token.
         """
+        with self._refresh_lock:
+            if stale_token is not None and stale_token != self.access_token:
+                return self.access_token
+            
+            self.access_token, self.expires_at = self._login_in_journal_api(login_data=self.login_data)
+            self.headers = self.headers_factory.get_headers_for_requests(token=self.access_token)
+            self._save_token()
         
-        self.access_token: str = self._login_in_journal_api(login_data=login_data)
-        self.headers: dict[str, str] = get_headers_for_requests(token=self.access_token) 
+        return self.access_token
+
+    def _save_token(self) -> None:
+        """Save the current access token to the token store, if it's used."""
+        if self.token_store is None:
+            return
+        
+        self.token_store.save(
+            login_data=self.login_data,
+            access_token=self.access_token,
+            expires_at=self.expires_at
+        )
 
     @staticmethod
     def check_response_status(response: Response) -> None:
@@ -66,44 +156,87 @@ class JournalLoginTokenParser(object):
             RequestException: if response.status_code is not in range 200-299.
         """
         if not response.ok:
+            from requests import RequestException
+            
             raise RequestException(f"Failed to login in the JournalApi. Status code: {response.status_code}")
 
+    @staticmethod
+    def parse_token_expiry(expires_in: Optional[int | float | str]) -> Optional[float]:
+        """Convert the token expiry from the login response to the unix timestamp.
+        API can return both unix timestamp and amount of seconds, so both variants are supported.
+
+        Args:
+            expires_in (Optional[int | float | str]): expiry value from the login response.
+
+        Returns:
+            Optional[float]: Unix timestamp when the token should be refreshed or None if it's unknown.
+        """
+        UNIX_TIMESTAMP_THRESHOLD: int = 10 ** 9
+        EXPIRY_SAFETY_MARGIN: int = 30
+        
+        try:
+            expires_in: float = float(expires_in)
+        except (TypeError, ValueError):
+            return None
+        
+        if expires_in < UNIX_TIMESTAMP_THRESHOLD:
+            expires_in: float = time() + expires_in
+        
+        return expires_in - EXPIRY_SAFETY_MARGIN
+
     @request_logger
-    def _login_in_journal_api(self, login_data: dict) -> str:
+    def _login_in_journal_api(self, login_data: dict) -> tuple[str, Optional[float]]:
         """Logging in the JournalApi with json data and get the token after login.
 
         Args:
-            session (Session): requests.Session object.
+            login_data (dict): login data for the Journal API.
             
         Returns:
-            str: API token.
+            tuple[str, Optional[float]]: API token and unix timestamp of its expiry (if the API returned it).
         """
         if isinstance(login_data, UserInputData):
             login_data: dict[str, str] = login_data.to_dict()
         
-        login_headers: dict = get_headers_for_login()
+        login_headers: dict = self.headers_factory.get_headers_for_login()
         
-        response: Response = post(
+        response: Response = self.transport.post(
             url=JOURNAL_LOGIN_URL,
             headers=login_headers,
             json=login_data
         )
         self.check_response_status(response=response)
+        get_metrics_registry().increment(LOGINS_METRIC)
         
         ## Get the token from API response: ##
         TOKEN_DICT_KEY: str = "access_token"
-        access_token: str = response.json().get(TOKEN_DICT_KEY)
+        TOKEN_EXPIRES_DICT_KEY: str = "expires_in_access"
+        json_response: dict[str, Any] = response.json()
+        access_token: str = json_response.get(TOKEN_DICT_KEY)
+        expires_at: Optional[float] = self.parse_token_expiry(json_response.get(TOKEN_EXPIRES_DICT_KEY))
         
-        return access_token
+        return (access_token, expires_at)
 
 
 class JournalHomeworkScrapper(object):
-    """Scrapps all groups homework from the public ItTopJournal API."""
+    """Scrapps all groups homework from the public ItTopJournal API.
+    One scrapper holds one access token, so create it once and share it between 
+    HomeworkAPI, HomeworksPageModelFactory and HomeworksFolderManager objects."""
+    UNAUTHORIZED_STATUS_CODE: int = 401
+    ## Same file can be requested by several workers, only one of them can write its partial file.
+    ## Locks are counted by their users and removed with the last one, so the dict doesn't grow: ##
+    _part_locks: dict[str, Lock] = {}
+    _part_lock_users: dict[str, int] = {}
+    _part_locks_guard: Lock = Lock()
+    
     def __init__(
         self,
         login_data: dict[str, str] | UserInputData,
+        token_store: Optional[JournalTokenStore] = None,
+        transport: Optional[JournalTransport] = None,
+        listing_cache: Optional[ListingHttpCache] = None,
     ) -> None:
         """Initialize the scrapper, getting access token from the ItTopJournal API.
+        If the token from token_store is rejected by the API, the scrapper logs in again.
 
         Args:
             login_data (dict[str, str] | UserInputData): dict object with 4 fields:
@@ -114,10 +247,80 @@ class JournalHomeworkScrapper(object):
                 ID_CITY = YOUR_ID_CITY (sometimes it can be "null").
                 PASSWORD = YOUR_PASSWORD
                 USER_NAME = YOUR_USERNAME
+            token_store (Optional[JournalTokenStore], optional): disk cache for the access token. Defaults to None.
+            transport (Optional[JournalTransport], optional): HTTP transport for all the requests.
+                Defaults to None (shared pooled transport).
+            listing_cache (Optional[ListingHttpCache], optional): cache for the homework listings. Defaults to None.
         """
+        self.transport: JournalTransport = transport or get_default_transport()
+        self.listing_cache: Optional[ListingHttpCache] = listing_cache
+        self.headers_factory: JournalHeadersFactory = JournalHeadersFactory()
         self._login_api_parser: JournalLoginTokenParser = JournalLoginTokenParser(
-            login_data=login_data
+            login_data=login_data,
+            token_store=token_store,
+            transport=self.transport,
+            headers_factory=self.headers_factory
+        )
+    
+    def _get_with_auth(self, url: str, extra_headers: Optional[dict[str, str]] = None) -> Response:
+        """Send an authorized GET request. The token is refreshed if it's expired 
+        or if the API responded with 401, then the request is sent again.
+
+        Args:
+            url (str): request URL.
+            extra_headers (Optional[dict[str, str]], optional): headers added to the auth headers. Defaults to None.
+
+        Returns:
+            Response: response object.
+        """
+        if self._login_api_parser.is_token_expired:
+            self._login_api_parser.refresh_token(stale_token=self._login_api_parser.access_token)
+        
+        used_token: str = self._login_api_parser.access_token
+        response: Response = self.transport.get(
+            url=url,
+            headers={**self._login_api_parser.headers, **(extra_headers or {})},
+        )
+        if response.status_code == self.UNAUTHORIZED_STATUS_CODE:
+            self._login_api_parser.refresh_token(stale_token=used_token)
+            response: Response = self.transport.get(
+                url=url,
+                headers={**self._login_api_parser.headers, **(extra_headers or {})},
+            )
+        
+        return response
+
+    def _get_listing_body(self, url: str) -> bytes:
+        """Get the listing response body. If the listing cache is used, fresh responses are taken
+        from it without requests and other cached responses are revalidated with the conditional request.
+
+        Args:
+            url (str): listing URL.
+
+        Returns:
+            bytes: response body.
+        """
+        NOT_MODIFIED_STATUS_CODE: int = 304
+        
+        if self.listing_cache is None:
+            response: Response = self._get_with_auth(url=url)
+            self._login_api_parser.check_response_status(response=response)
+            return response.content
+        
+        cached_listing: Optional[CachedListing] = self.listing_cache.get(url=url)
+        if cached_listing is not None and self.listing_cache.is_fresh(entry=cached_listing):
+            return cached_listing.body
+        
+        conditional_headers: dict[str, str] = (
+            self.listing_cache.get_conditional_headers(entry=cached_listing) if cached_listing else {}
         )
+        response: Response = self._get_with_auth(url=url, extra_headers=conditional_headers)
+        if cached_listing is not None and response.status_code == NOT_MODIFIED_STATUS_CODE:
+            self.listing_cache.touch(url=url)
+            return cached_listing.body
+        
+        self._login_api_parser.check_response_status(response=response)
+        return self.listing_cache.store(url=url, response=response)
     
     @staticmethod
     def generate_homework_api_url(
@@ -141,7 +344,7 @@ class JournalHomeworkScrapper(object):
         Returns:
             str: Generated url.
         """
-        return f"https://msapi.top-academy.ru/api/v2/homework/operations/list?page={page}&status={status}&type=0&group_id={group_id}"
+        return f"{JOURNAL_HOMEWORK_LIST_URL}?page={page}&status={status}&type=0&group_id={group_id}"
 
     def download_homework_file(self, file_url_path: str) -> tuple[str, bytes]:
         """Download a homework file from the Journal homework API.
@@ -152,20 +355,343 @@ class JournalHomeworkScrapper(object):
         Returns:
             tuple[str, bytes]: file ext and bytes of downloaded file.
         """
-        downloaded_file_response: Response = get(
+        downloaded_file_response: Response = self.transport.get(
             url=file_url_path,
-            headers=get_headers_for_downloads()
+            headers=self.headers_factory.get_headers_for_downloads()
         )
         self._login_api_parser.check_response_status(response=downloaded_file_response)
+        file_ext: str = self.get_file_ext(response=downloaded_file_response)
         
+        return (file_ext, downloaded_file_response.content)
+
+    @staticmethod
+    def get_file_ext(response: Response) -> Optional[str]:
+        """Get the downloaded file extension from the Content-Disposition header.
+
+        Args:
+            response (Response): file download response.
+
+        Returns:
+            Optional[str]: file extension or None if the response has no Content-Disposition.
+        """
         CONTENT_DISPOSITION_TAG: str = "Content-Disposition"
-        content_disposition: str = downloaded_file_response.headers.get(CONTENT_DISPOSITION_TAG)
-        ## Get file extension from the content disposition in request. ## 
-        file_ext: str = content_disposition.split("\"")[1].split(".")[-1]
+        content_disposition: Optional[str] = response.headers.get(CONTENT_DISPOSITION_TAG)
+        if content_disposition is None:
+            return None
+        ## Quoted, unquoted and RFC 5987 (filename*=UTF-8''...) filenames are parsed by the email headers parser: ##
+        message: Message = Message()
+        message[CONTENT_DISPOSITION_TAG] = content_disposition
+        filename: Optional[str] = message.get_filename()
+        if not filename or "." not in filename:
+            return None
+        return filename.rsplit(".", 1)[-1]
+
+    @staticmethod
+    def _get_part_paths(file_url_path: str, dir_path: PathLike) -> tuple[PathLike, PathLike]:
+        """Get paths of the partial file and its state for the homework file URL.
+
+        Args:
+            file_url_path (str): path to the homework file.
+            dir_path (PathLike): folder for the partial file.
+
+        Returns:
+            tuple[PathLike, PathLike]: partial file path and partial file state path.
+        """
+        part_filename: str = f".{sha256(file_url_path.encode()).hexdigest()[:32]}.part"
+        part_path: PathLike = join(dir_path, part_filename)
+        return (part_path, f"{part_path}.json")
+
+    @staticmethod
+    def _load_part_state(file_url_path: str, part_path: PathLike, state_path: PathLike) -> dict[str, Any]:
+        """Load the state of the interrupted download. Partial file is cut to the recorded offset,
+        because bytes after it could be written without the state update.
+
+        Args:
+            file_url_path (str): path to the homework file.
+            part_path (PathLike): partial file path.
+            state_path (PathLike): partial file state path.
+
+        Returns:
+            dict[str, Any]: download state with the offset (0 if there is nothing to resume).
+        """
+        EMPTY_STATE: dict[str, Any] = {"file_url_path": file_url_path, "offset": 0}
+        if not exists(part_path) or not exists(state_path):
+            return EMPTY_STATE
         
-        return (file_ext, downloaded_file_response.content)
+        try:
+            with open(file=state_path, mode="r", encoding="utf-8") as file:
+                state: dict[str, Any] = load(file)
+        except (OSError, JSONDecodeError):
+            return EMPTY_STATE
+        
+        if state.get("file_url_path") != file_url_path:
+            return EMPTY_STATE
+        
+        offset: int = min(int(state.get("offset", 0)), getsize(part_path))
+        truncate(part_path, offset)
+        state["offset"] = offset
+        return state
+
+    @staticmethod
+    def _save_part_state(state_path: PathLike, state: dict[str, Any]) -> None:
+        """Save the state of the download.
+
+        Args:
+            state_path (PathLike): partial file state path.
+            state (dict[str, Any]): download state.
+        """
+        with open(file=state_path, mode="w", encoding="utf-8") as file:
+            dump(state, file)
+
+    @staticmethod
+    def _get_range_start(response: Response) -> Optional[int]:
+        """Get the first byte of the partial response body from Content-Range header.
+
+        Args:
+            response (Response): file download response.
+
+        Returns:
+            Optional[int]: first byte like 100 from "bytes 100-999/1000" or None if the header is missing or not valid.
+        """
+        CONTENT_RANGE_TAG: str = "Content-Range"
+
+        content_range: str = response.headers.get(CONTENT_RANGE_TAG, "")
+        unit, _, byte_range = content_range.partition(" ")
+        range_start: str = byte_range.split("-", 1)[0]
+        return int(range_start) if unit == "bytes" and range_start.isdigit() else None
+
+    @staticmethod
+    def _get_expected_size(response: Response, offset: int) -> Optional[int]:
+        """Get the full file size from Content-Range or Content-Length header.
+
+        Args:
+            response (Response): file download response.
+            offset (int): first byte of the response body in the file.
+
+        Returns:
+            Optional[int]: file size or None if it can't be verified.
+        """
+        CONTENT_RANGE_TAG: str = "Content-Range"
+        CONTENT_LENGTH_TAG: str = "Content-Length"
+        CONTENT_ENCODING_TAG: str = "Content-Encoding"
+        
+        content_range: Optional[str] = response.headers.get(CONTENT_RANGE_TAG)
+        if content_range and "/" in content_range:
+            total_size: str = content_range.rsplit("/", 1)[1]
+            return int(total_size) if total_size.isdigit() else None
+        
+        ## Decoded body length is not equal to Content-Length of the compressed body: ##
+        content_length: Optional[str] = response.headers.get(CONTENT_LENGTH_TAG)
+        if content_length and content_length.isdigit() and not response.headers.get(CONTENT_ENCODING_TAG):
+            return offset + int(content_length)
+        
+        return None
+
+    def stream_homework_file(
+        self,
+        file_url_path: str,
+        dir_path: PathLike,
+        chunk_size: int = 64 * 1024
+    ) -> DownloadedHomeworkFile:
+        """Download a homework file by chunks to the hidden partial file in dir_path.
+        Memory usage doesn't depend on the file size. If the previous download of the same URL 
+        was interrupted, it's resumed with the Range request from the recorded offset.
+        Servers which ignore Range send the whole file, then the download starts from zero,
+        like after the partial response from another offset.
+        The complete file is renamed to the unique name near the partial file. The caller must move it
+        to its place (it's in the same filesystem, so os.replace is atomic) or remove it.
+
+        Args:
+            file_url_path (str): path to the homework file.
+            dir_path (PathLike): folder for the partial file.
+            chunk_size (int, optional): size of the chunks read from the response. Defaults to 64 KB.
+        
+        Raises:
+            RequestException: if the downloaded size is not equal to the size from the response headers.
+                The partial file is kept to resume the download next time.
+
+        Returns:
+            DownloadedHomeworkFile: file ext, partial file path, size and sha256 of the file.
+        """
+        part_path, state_path = self._get_part_paths(file_url_path=file_url_path, dir_path=dir_path)
+        with self._part_locks_guard:
+            part_lock: Lock = self._part_locks.setdefault(part_path, Lock())
+            self._part_lock_users[part_path] = self._part_lock_users.get(part_path, 0) + 1
+        
+        try:
+            with part_lock:
+                return self._stream_to_part_file(
+                    file_url_path=file_url_path,
+                    part_path=part_path,
+                    state_path=state_path,
+                    chunk_size=chunk_size
+                )
+        finally:
+            with self._part_locks_guard:
+                self._part_lock_users[part_path] -= 1
+                if not self._part_lock_users[part_path]:
+                    del self._part_lock_users[part_path]
+                    del self._part_locks[part_path]
+
+    def _stream_to_part_file(
+        self,
+        file_url_path: str,
+        part_path: PathLike,
+        state_path: PathLike,
+        chunk_size: int
+    ) -> DownloadedHomeworkFile:
+        """Download or resume the homework file into the partial file. 
+        It's called by stream_homework_file with the partial file lock.
+
+        Args:
+            file_url_path (str): path to the homework file.
+            part_path (PathLike): partial file path.
+            state_path (PathLike): partial file state path.
+            chunk_size (int): size of the chunks read from the response.
+
+        Raises:
+            RequestException: if the downloaded size is not equal to the size from the response headers.
+
+        Returns:
+            DownloadedHomeworkFile: file ext, partial file path, size and sha256 of the file.
+        """
+        PARTIAL_CONTENT_STATUS_CODE: int = 206
+        RANGE_NOT_SATISFIABLE_STATUS_CODE: int = 416
+        ## Save the offset after every N bytes, not after every chunk: ##
+        STATE_SAVE_INTERVAL: int = 1024 * 1024
+        
+        state: dict[str, Any] = self._load_part_state(
+            file_url_path=file_url_path,
+            part_path=part_path,
+            state_path=state_path
+        )
+        
+        headers: dict[str, str] = self.headers_factory.get_headers_for_downloads()
+        if state["offset"]:
+            headers["Range"] = f"bytes={state['offset']}-"
+            if state.get("validator"):
+                headers["If-Range"] = state["validator"]
+        
+        downloaded_file_response: Response = self.transport.get(
+            url=file_url_path,
+            headers=headers,
+            stream=True
+        )
+        if state["offset"] and (
+            downloaded_file_response.status_code == RANGE_NOT_SATISFIABLE_STATUS_CODE
+            or downloaded_file_response.status_code == PARTIAL_CONTENT_STATUS_CODE
+            and self._get_range_start(response=downloaded_file_response) != state["offset"]
+        ):
+            ## Recorded offset is not valid anymore or the server sent another range, download the whole file: ##
+            downloaded_file_response.close()
+            remove(part_path)
+            remove(state_path)
+            return self._stream_to_part_file(
+                file_url_path=file_url_path,
+                part_path=part_path,
+                state_path=state_path,
+                chunk_size=chunk_size
+            )
+        
+        with downloaded_file_response:
+            self._login_api_parser.check_response_status(response=downloaded_file_response)
+            is_resumed: bool = (
+                bool(state["offset"]) and downloaded_file_response.status_code == PARTIAL_CONTENT_STATUS_CODE
+            )
+            if not is_resumed:
+                state["offset"] = 0
+            
+            state["file_ext"] = self.get_file_ext(response=downloaded_file_response) or state.get("file_ext")
+            state["validator"] = (
+                downloaded_file_response.headers.get("ETag") 
+                or downloaded_file_response.headers.get("Last-Modified")
+                or state.get("validator")
+            )
+            state["total_size"] = self._get_expected_size(
+                response=downloaded_file_response,
+                offset=state["offset"]
+            )
+            
+            file_hash = sha256()
+            if is_resumed:
+                with open(file=part_path, mode="rb") as part_file:
+                    while chunk := part_file.read(chunk_size):
+                        file_hash.update(chunk)
+            
+            unsaved_bytes: int = 0
+            downloaded_bytes: int = 0
+            write_time: float = 0.0
+            with open(file=part_path, mode="ab" if is_resumed else "wb") as part_file:
+                try:
+                    for chunk in downloaded_file_response.iter_content(chunk_size=chunk_size):
+                        write_start_time: float = perf_counter()
+                        part_file.write(chunk)
+                        write_time += perf_counter() - write_start_time
+                        file_hash.update(chunk)
+                        downloaded_bytes += len(chunk)
+                        state["offset"] += len(chunk)
+                        unsaved_bytes += len(chunk)
+                        
+                        if unsaved_bytes >= STATE_SAVE_INTERVAL:
+                            part_file.flush()
+                            self._save_part_state(state_path=state_path, state=state)
+                            unsaved_bytes = 0
+                finally:
+                    part_file.flush()
+                    self._save_part_state(state_path=state_path, state=state)
+                    get_metrics_registry().increment(DOWNLOADED_BYTES_METRIC, downloaded_bytes)
+                    get_metrics_registry().observe(DISK_WRITE_DURATION_METRIC, write_time, operation="write")
+        
+        if state["total_size"] is not None and state["offset"] != state["total_size"]:
+            from requests import RequestException
+            
+            raise RequestException(
+                f"Incomplete download of {file_url_path}: {state['offset']} of {state['total_size']} bytes."
+            )
+        
+        remove(state_path)
+        ## Same URL can be downloaded again right after the lock is released, so the complete file
+        ## gets its own name under the lock and the next download can't truncate it before it's moved: ##
+        complete_path: PathLike = f"{part_path}.{token_hex(8)}"
+        replace(part_path, complete_path)
+        return DownloadedHomeworkFile(
+            file_ext=state["file_ext"],
+            temp_path=complete_path,
+            size=state["offset"],
+            sha256=file_hash.hexdigest()
+        )
 
     @request_logger
+    def get_homeworks_page_body(
+        self,
+        page: int,
+        status: int,
+        group_id: int
+    ) -> bytes:
+        """Send a get request to the homework Journal API and return the raw listing body.
+        Decode it with journal_json.decode_homework_records to skip the unused fields.
+
+        Args:
+            page (int): Homework page.
+            status (int): Homework status (
+                0-(unknown, probably practical works)
+                1-completed,
+                2-on the checking,
+                3-uncompleted
+                5-expired
+            )
+            group_id (int): homework group id.
+
+        Returns:
+            bytes: Json listing body.
+        """
+        url: str = self.generate_homework_api_url(
+            page=page,
+            status=status,
+            group_id=group_id
+        )
+        return self._get_listing_body(url=url)
+
     def get_homeworks_from_api(
         self,
         page: int,
@@ -188,17 +714,10 @@ class JournalHomeworkScrapper(object):
         Returns:
             list[dict[str, Any]]: Json object with the homework.
         """
-        url: str = self.generate_homework_api_url(
+        return loads(self.get_homeworks_page_body(
             page=page,
             status=status,
             group_id=group_id
-        )
-        response: Response = get(
-            url=url,
-            headers=self._login_api_parser.headers,
-        )
-        self._login_api_parser.check_response_status(response=response)
-        
-        return response.json()
+        ))
 
 
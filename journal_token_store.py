@@ -0,0 +1,149 @@
+
+## Built-in modules: ##
+from hashlib import sha256
+from json import dump, load, JSONDecodeError
+from os import chmod, fdopen, replace, remove
+from os import PathLike
+from os.path import join, exists, dirname, basename
+from tempfile import mkstemp
+from threading import Lock
+from time import time
+from typing import Any, Optional, TYPE_CHECKING
+
+## Local modules: ##
+from config import current_dir_path
+
+if TYPE_CHECKING:
+    from journal_requests import UserInputData
+
+
+class JournalTokenStore(object):
+    """Stores Journal API access tokens on the disk, so the next run can skip the login request.
+    Tokens are keyed by the USERNAME/APPLICATION_KEY pair and the file is readable only by the owner."""
+    TOKEN_STORE_FILENAME: str = ".journal_tokens.json"
+    TOKEN_STORE_FILE_MODE: int = 0o600
+
+    def __init__(self, store_path: Optional[PathLike] = None) -> None:
+        """Initialize the token store.
+
+        Args:
+            store_path (Optional[PathLike], optional): path to the tokens file.
+                Defaults to None (.journal_tokens.json in the current workspace).
+        """
+        self.store_path: PathLike = store_path or join(current_dir_path, self.TOKEN_STORE_FILENAME)
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def get_store_key(login_data: "dict[str, str] | UserInputData") -> str:
+        """Get the store key for the login data. Password is not a part of the key.
+
+        Args:
+            login_data (dict[str, str] | UserInputData): Journal login data.
+
+        Returns:
+            str: sha256 hex digest of the username and application key.
+        """
+        if isinstance(login_data, dict):
+            username: str = login_data.get("username", "")
+            application_key: str = login_data.get("application_key", "")
+        else:
+            username: str = login_data.USERNAME
+            application_key: str = login_data.APPLICATION_KEY
+
+        return sha256(f"{username}:{application_key}".encode()).hexdigest()
+
+    def _read_tokens(self) -> dict[str, dict[str, Any]]:
+        """Read all stored tokens. Broken or missing file is treated as empty store.
+
+        Returns:
+            dict[str, dict[str, Any]]: store key -> token data.
+        """
+        if not exists(self.store_path):
+            return {}
+
+        try:
+            with open(file=self.store_path, mode="r", encoding="utf-8") as file:
+                tokens: dict[str, dict[str, Any]] = load(file)
+        except (OSError, JSONDecodeError):
+            return {}
+
+        return tokens if isinstance(tokens, dict) else {}
+
+    def _write_tokens(self, tokens: dict[str, dict[str, Any]]) -> None:
+        """Write all tokens to the new temporary file and replace the store with it.
+        mkstemp creates the file with the unique name, so leftovers of the crashed runs
+        and parallel runs can't publish the token with another mode.
+
+        Args:
+            tokens (dict[str, dict[str, Any]]): store key -> token data.
+        """
+        file_descriptor, temp_store_path = mkstemp(
+            dir=dirname(self.store_path) or ".",
+            prefix=f"{basename(self.store_path)}.",
+            suffix=".tmp"
+        )
+        try:
+            with fdopen(file_descriptor, mode="w", encoding="utf-8") as file:
+                chmod(temp_store_path, self.TOKEN_STORE_FILE_MODE)
+                dump(tokens, file)
+            replace(temp_store_path, self.store_path)
+        except BaseException:
+            if exists(temp_store_path):
+                remove(temp_store_path)
+            raise
+
+    def load(self, login_data: "dict[str, str] | UserInputData") -> Optional[tuple[str, Optional[float]]]:
+        """Get the stored token for the login data if it's not expired.
+
+        Args:
+            login_data (dict[str, str] | UserInputData): Journal login data.
+
+        Returns:
+            Optional[tuple[str, Optional[float]]]: access token with its expiry or None.
+        """
+        ACCESS_TOKEN_KEY: str = "access_token"
+        EXPIRES_AT_KEY: str = "expires_at"
+
+        with self._lock:
+            token_data: Optional[dict[str, Any]] = self._read_tokens().get(self.get_store_key(login_data))
+
+        if not token_data or not token_data.get(ACCESS_TOKEN_KEY):
+            return None
+
+        expires_at: Optional[float] = token_data.get(EXPIRES_AT_KEY)
+        if expires_at is not None and time() >= expires_at:
+            return None
+
+        return (token_data.get(ACCESS_TOKEN_KEY), expires_at)
+
+    def save(
+        self,
+        login_data: "dict[str, str] | UserInputData",
+        access_token: str,
+        expires_at: Optional[float]
+    ) -> None:
+        """Save the token for the login data.
+
+        Args:
+            login_data (dict[str, str] | UserInputData): Journal login data.
+            access_token (str): API token.
+            expires_at (Optional[float]): unix timestamp of the token expiry.
+        """
+        with self._lock:
+            tokens: dict[str, dict[str, Any]] = self._read_tokens()
+            tokens[self.get_store_key(login_data)] = {
+                "access_token": access_token,
+                "expires_at": expires_at
+            }
+            self._write_tokens(tokens=tokens)
+
+    def discard(self, login_data: "dict[str, str] | UserInputData") -> None:
+        """Remove the stored token for the login data.
+
+        Args:
+            login_data (dict[str, str] | UserInputData): Journal login data.
+        """
+        with self._lock:
+            tokens: dict[str, dict[str, Any]] = self._read_tokens()
+            if tokens.pop(self.get_store_key(login_data), None) is not None:
+                self._write_tokens(tokens=tokens)
@@ -0,0 +1,338 @@
+
+## Built-in modules: ##
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from json import dumps
+from threading import Lock
+from time import perf_counter, sleep
+from typing import Any, Callable, Optional, TYPE_CHECKING
+from urllib.parse import urlsplit, SplitResult
+
+## Pip modules: ##
+## requests and urllib3 are imported when the transport is created, not when the module is imported: ##
+if TYPE_CHECKING:
+    from requests import Response, PreparedRequest
+
+## Local modules: ##
+from journal_metrics import (
+    MetricsRegistry,
+    get_metrics_registry,
+    get_endpoint_name,
+    REQUEST_DURATION_METRIC,
+    REQUEST_RETRIES_METRIC
+)
+from journal_rate_limiter import JournalRateLimiter
+
+
+class JournalTransport(ABC):
+    """Base HTTP transport for all the Journal API requests.
+    Scrapper and login parser only call get and post, so any transport must implement request method."""
+    @abstractmethod
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        """Send the HTTP request.
+
+        Args:
+            method (str): HTTP method.
+            url (str): request URL.
+            **kwargs: requests.request keyword arguments (headers, json, stream, timeout...).
+
+        Returns:
+            Response: response object.
+        """
+
+    def get(self, url: str, **kwargs) -> Response:
+        """Send the GET request.
+
+        Args:
+            url (str): request URL.
+
+        Returns:
+            Response: response object.
+        """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Response:
+        """Send the POST request.
+
+        Args:
+            url (str): request URL.
+
+        Returns:
+            Response: response object.
+        """
+        return self.request("POST", url, **kwargs)
+
+    def close(self) -> None:
+        """Release the transport resources."""
+
+
+class PooledSessionTransport(JournalTransport):
+    """Transport with one requests.Session, so TCP+TLS connections are kept alive and reused.
+    Failed requests with 429/5xx statuses are retried with the exponential backoff.
+    With the rate limiter every request waits for its budget and 429 responses are retried here,
+    after the Retry-After pause of the whole budget, instead of the per-request urllib3 backoff.
+    Duration (with the retries, without the rate limit wait) and retries count of every request
+    are recorded to the metrics registry."""
+    RATE_LIMITED_STATUS_CODE: int = 429
+    RETRY_STATUSES: tuple[int, ...] = (RATE_LIMITED_STATUS_CODE, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: Optional[float] = 30,
+        retry_statuses: tuple[int, ...] = RETRY_STATUSES,
+        metrics_registry: Optional[MetricsRegistry] = None,
+        rate_limiter: Optional[JournalRateLimiter] = None
+    ) -> None:
+        """Initialize the session with the connection pool.
+
+        Args:
+            pool_size (int, optional): max kept alive connections per host.
+                Set it not lower than the downloads concurrency. Defaults to 10.
+            max_retries (int, optional): retries count for failed requests. Defaults to 3.
+            backoff_factor (float, optional): backoff factor between retries (0.5, 1, 2... sec). Defaults to 0.5.
+            timeout (Optional[float], optional): default request timeout in seconds. Defaults to 30.
+            retry_statuses (tuple[int, ...], optional): response statuses to retry. Defaults to RETRY_STATUSES.
+            metrics_registry (Optional[MetricsRegistry], optional): registry for the request metrics.
+                Defaults to None (shared registry).
+            rate_limiter (Optional[JournalRateLimiter], optional): request budget shared with other transports.
+                Defaults to None (requests are not limited).
+        """
+        from requests import Session
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        self.timeout: Optional[float] = timeout
+        self.max_retries: int = max_retries
+        self.metrics_registry: MetricsRegistry = metrics_registry or get_metrics_registry()
+        self.rate_limiter: Optional[JournalRateLimiter] = rate_limiter
+        self.session: Session = Session()
+
+        ## urllib3 retries any response with Retry-After, so with the rate limiter 429 is given back to request: ##
+        if rate_limiter is not None:
+            retry_statuses: tuple[int, ...] = tuple(
+                status for status in retry_statuses if status != self.RATE_LIMITED_STATUS_CODE
+            )
+        retry: Retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses,
+            allowed_methods=frozenset({"GET", "POST"}),
+            respect_retry_after_header=rate_limiter is None,
+            raise_on_status=False
+        )
+        adapter: HTTPAdapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        """Send the HTTP request through the pooled session.
+
+        Args:
+            method (str): HTTP method.
+            url (str): request URL.
+
+        Returns:
+            Response: response object.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        endpoint: str = get_endpoint_name(url=url)
+        start_time: float = perf_counter()
+        waited_time: float = 0.0
+        rate_limited_retries: int = 0
+        while True:
+            if self.rate_limiter is not None:
+                waited_time += self.rate_limiter.acquire(url=url)
+
+            response: Response = self.session.request(method=method, url=url, **kwargs)
+            if self.rate_limiter is None:
+                break
+            if response.status_code != self.RATE_LIMITED_STATUS_CODE:
+                self.rate_limiter.on_success(url=url)
+                break
+
+            ## Other requests of the budget wait for the Retry-After pause too: ##
+            retry_after: float = self.rate_limiter.on_rate_limited(
+                url=url,
+                retry_after=response.headers.get("Retry-After")
+            )
+            if rate_limited_retries >= self.max_retries:
+                break
+            rate_limited_retries += 1
+            response.close()
+            ## Unlimited budget has no bucket to pause, so only this request waits for Retry-After: ##
+            if not self.rate_limiter.is_limited(url=url):
+                sleep(retry_after)
+                waited_time += retry_after
+
+        self.metrics_registry.observe(
+            REQUEST_DURATION_METRIC,
+            perf_counter() - start_time - waited_time,
+            endpoint=endpoint
+        )
+
+        ## urllib3 keeps the retries of the request in the raw response: ##
+        retries = getattr(response.raw, "retries", None)
+        retries_count: int = rate_limited_retries + (len(retries.history) if retries is not None else 0)
+        if retries_count:
+            self.metrics_registry.increment(REQUEST_RETRIES_METRIC, retries_count, endpoint=endpoint)
+        return response
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+FakeHandler = Callable[["PreparedRequest"], "Response"]
+
+
+class FakeTransport(JournalTransport):
+    """Offline transport for benchmarks and experiments. Responses are made by registered handlers,
+    routes are matched by method and URL without the query string."""
+    def __init__(self) -> None:
+        """Initialize the transport without routes."""
+        self.routes: dict[tuple[str, str], FakeHandler] = {}
+        self.sent_requests: list[PreparedRequest] = []
+        self._lock: Lock = Lock()
+
+    @staticmethod
+    def _get_route_url(url: str) -> str:
+        """Get the URL without query string and fragment.
+
+        Args:
+            url (str): request URL.
+
+        Returns:
+            str: URL for the routes lookup.
+        """
+        splitted_url: SplitResult = urlsplit(url)
+        return f"{splitted_url.scheme}://{splitted_url.netloc}{splitted_url.path}"
+
+    @staticmethod
+    def make_response(
+        status_code: int = 200,
+        content: bytes = b"",
+        json: Optional[Any] = None,
+        headers: Optional[dict[str, str]] = None,
+        url: str = ""
+    ) -> Response:
+        """Build requests.Response object without network.
+
+        Args:
+            status_code (int, optional): response status. Defaults to 200.
+            content (bytes, optional): response body. Defaults to b"".
+            json (Optional[Any], optional): object to send as json body instead of content. Defaults to None.
+            headers (Optional[dict[str, str]], optional): response headers. Defaults to None.
+            url (str, optional): response URL. Defaults to "".
+
+        Returns:
+            Response: response object.
+        """
+        from requests import Response
+        from requests.structures import CaseInsensitiveDict
+        
+        response: Response = Response()
+        response.status_code = status_code
+        response.headers = CaseInsensitiveDict(headers or {})
+        response.url = url
+        response.encoding = "utf-8"
+        if json is not None:
+            content: bytes = dumps(json).encode()
+            response.headers.setdefault("Content-Type", "application/json")
+        response._content = content
+        response._content_consumed = True
+        return response
+
+    def add_route(self, method: str, url: str, handler: FakeHandler) -> None:
+        """Register the handler for the requests.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL without the query string.
+            handler (FakeHandler): function that gets PreparedRequest and returns Response.
+        """
+        self.routes[(method.upper(), self._get_route_url(url))] = handler
+
+    def add_response(self, method: str, url: str, **response_kwargs) -> None:
+        """Register the static response for the requests.
+        Keyword arguments are the same as in make_response.
+
+        Args:
+            method (str): HTTP method.
+            url (str): URL without the query string.
+        """
+        self.add_route(
+            method=method,
+            url=url,
+            handler=lambda request: self.make_response(url=request.url, **response_kwargs)
+        )
+
+    def request(self, method: str, url: str, **kwargs) -> Response:
+        """Find the handler and get the response from it. Unknown routes get 404.
+
+        Args:
+            method (str): HTTP method.
+            url (str): request URL.
+
+        Returns:
+            Response: response object.
+        """
+        from requests import Request
+        
+        NOT_FOUND_STATUS_CODE: int = 404
+
+        prepared_request: PreparedRequest = Request(
+            method=method,
+            url=url,
+            headers=kwargs.get("headers"),
+            json=kwargs.get("json"),
+            data=kwargs.get("data"),
+            params=kwargs.get("params")
+        ).prepare()
+        with self._lock:
+            self.sent_requests.append(prepared_request)
+
+        handler: Optional[FakeHandler] = self.routes.get(
+            (prepared_request.method, self._get_route_url(prepared_request.url))
+        )
+        if handler is None:
+            return self.make_response(status_code=NOT_FOUND_STATUS_CODE, url=prepared_request.url)
+
+        return handler(prepared_request)
+
+
+_default_transport: Optional[JournalTransport] = None
+_default_transport_lock: Lock = Lock()
+
+
+def get_default_transport() -> JournalTransport:
+    """Get the process-wide pooled transport. It's created on the first call.
+
+    Returns:
+        JournalTransport: shared transport.
+    """
+    global _default_transport
+
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = PooledSessionTransport()
+
+    return _default_transport
+
+
+def set_default_transport(transport: JournalTransport) -> None:
+    """Replace the process-wide transport, for example with FakeTransport or tuned PooledSessionTransport.
+
+    Args:
+        transport (JournalTransport): new shared transport.
+    """
+    global _default_transport
+
+    with _default_transport_lock:
+        _default_transport = transport
@@ -0,0 +1,249 @@
+
+## Built-in modules: ##
+from dataclasses import dataclass, field
+from heapq import heappush, heappop
+from queue import Queue
+from random import uniform
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Callable, Iterable, Optional, TYPE_CHECKING
+
+## Local modules: ##
+from journal_homework_models import HomeworkAPI, HomeworkModel, HomeworksPagesIterator
+from journal_downloader import HomeworksDownloader, HomeworkDownloadResult
+from journal_loggers import get_logger, WATCHER_SUBSYSTEM
+from journal_metrics import get_metrics_registry, WATCHER_POLLS_METRIC
+
+if TYPE_CHECKING:
+    from loguru import Logger
+
+
+@dataclass(order=True)
+class ListingSchedule(object):
+    """Dataclass to hold the polling schedule of one (group, status) listing"""
+    next_poll_at: float
+    group_id: int = field(compare=False)
+    status: int = field(compare=False)
+    interval: float = field(compare=False)
+
+
+class HomeworksWatcher(object):
+    """Long-running poller of the homework listings with one logged in scrapper.
+    Every (group, status) listing has its own interval: it grows while the listing doesn't change
+    and shrinks after new homeworks appear, every poll time is shifted by the random jitter.
+    Only homeworks which were not seen before are passed to the downloader."""
+    _STOP_DOWNLOADS: object = object()
+
+    def __init__(
+        self,
+        journal_homework_api: HomeworkAPI,
+        statuses: Iterable[int],
+        group_ids: Iterable[int],
+        downloader: Optional[HomeworksDownloader] = None,
+        seen_identities: Optional[Iterable[tuple[str, str, str]]] = None,
+        min_interval: float = 30,
+        max_interval: float = 900,
+        backoff_factor: float = 2.0,
+        speedup_factor: float = 0.25,
+        jitter: float = 0.1,
+        start_page: int = 0,
+        end_page: Optional[int] = None,
+        on_new_homework: Optional[Callable[[int, int, HomeworkModel], None]] = None,
+        on_download_result: Optional[Callable[[HomeworkDownloadResult], None]] = None,
+        on_poll: Optional[Callable[[int, int, list[HomeworkModel]], None]] = None
+    ) -> None:
+        """Initialize the watcher. Nothing is polled before run is called.
+        Give the scrapper of journal_homework_api the ListingHttpCache, so unchanged pages are 304 responses.
+
+        Args:
+            journal_homework_api (HomeworkAPI): Journal homeworks API with the shared scrapper.
+            statuses (Iterable[int]): Homework statuses.
+            group_ids (Iterable[int]): homework group ids.
+            downloader (Optional[HomeworksDownloader], optional): downloader of the new homeworks.
+                Defaults to None (new homeworks are only passed to on_new_homework).
+            seen_identities (Optional[Iterable[tuple[str, str, str]]], optional): identities of already saved
+                homeworks, like HomeworksManifest.get_identities(). Defaults to None.
+            min_interval (float, optional): min seconds between polls of one listing. Defaults to 30.
+            max_interval (float, optional): max seconds between polls of one listing. Defaults to 900.
+            backoff_factor (float, optional): interval multiplier after the poll without changes. Defaults to 2.0.
+            speedup_factor (float, optional): interval multiplier after the poll with new homeworks. Defaults to 0.25.
+            jitter (float, optional): max share of the interval to randomly add or subtract. Defaults to 0.1.
+            start_page (int, optional): first page to poll. Defaults to 0.
+            end_page (Optional[int], optional): last page to poll (inclusive). Defaults to None (until the empty page).
+            on_new_homework (Optional[Callable[[int, int, HomeworkModel], None]], optional): called with
+                group id, status and homework for every new homework. Defaults to None.
+            on_download_result (Optional[Callable[[HomeworkDownloadResult], None]], optional): called with
+                every download result. Defaults to None.
+            on_poll (Optional[Callable[[int, int, list[HomeworkModel]], None]], optional): called with
+                group id, status and all homeworks of every successful poll, like HomeworksEventStore.record_many.
+                Defaults to None.
+
+        Raises:
+            ValueError: if the intervals or factors are not valid.
+        """
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("Watcher intervals must be positive and min_interval must not be greater than max_interval.")
+        if backoff_factor < 1 or not 0 < speedup_factor <= 1 or not 0 <= jitter < 1:
+            raise ValueError("Watcher backoff_factor must be >= 1, speedup_factor in (0, 1] and jitter in [0, 1).")
+
+        self.journal_homework_api: HomeworkAPI = journal_homework_api
+        self.statuses: tuple[int, ...] = tuple(dict.fromkeys(statuses))
+        self.group_ids: tuple[int, ...] = tuple(dict.fromkeys(group_ids))
+        self.downloader: Optional[HomeworksDownloader] = downloader
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.backoff_factor: float = backoff_factor
+        self.speedup_factor: float = speedup_factor
+        self.jitter: float = jitter
+        self.start_page: int = start_page
+        self.end_page: Optional[int] = end_page
+        self.on_new_homework: Optional[Callable[[int, int, HomeworkModel], None]] = on_new_homework
+        self.on_download_result: Optional[Callable[[HomeworkDownloadResult], None]] = on_download_result
+        self.on_poll: Optional[Callable[[int, int, list[HomeworkModel]], None]] = on_poll
+
+        self.seen_identities: set[tuple[str, str, str]] = set(seen_identities or ())
+        self._seen_identities_lock: Lock = Lock()
+        self._schedules: list[ListingSchedule] = []
+        self._download_queue: Queue = Queue()
+        self._stop_event: Event = Event()
+
+    def _get_next_poll_at(self, interval: float) -> float:
+        """Get the next poll time with the jitter.
+
+        Args:
+            interval (float): listing interval.
+
+        Returns:
+            float: monotonic time of the next poll.
+        """
+        return monotonic() + interval * uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _get_next_interval(self, interval: float, has_changes: Optional[bool]) -> float:
+        """Get the listing interval after the poll.
+
+        Args:
+            interval (float): current interval.
+            has_changes (Optional[bool]): True if new homeworks were found, None if the poll failed.
+
+        Returns:
+            float: next interval.
+        """
+        if has_changes:
+            return max(self.min_interval, interval * self.speedup_factor)
+        return min(self.max_interval, interval * self.backoff_factor)
+
+    def poll(self, group_id: int, status: int) -> list[HomeworkModel]:
+        """Poll the listing once and pass new homeworks to the downloader.
+
+        Args:
+            group_id (int): homework group id.
+            status (int): Homework status.
+
+        Returns:
+            list[HomeworkModel]: new homeworks.
+        """
+        new_homeworks: list[HomeworkModel] = []
+        polled_homeworks: list[HomeworkModel] = []
+        try:
+            for homework in HomeworksPagesIterator(
+                journal_homework_api=self.journal_homework_api,
+                status=status,
+                group_id=group_id,
+                start_page=self.start_page,
+                end_page=self.end_page
+            ):
+                polled_homeworks.append(homework)
+                with self._seen_identities_lock:
+                    if homework.identity in self.seen_identities:
+                        continue
+                    self.seen_identities.add(homework.identity)
+
+                new_homeworks.append(homework)
+                if self.on_new_homework is not None:
+                    self.on_new_homework(group_id, status, homework)
+        finally:
+            ## Homeworks found before the failed page are downloaded too, they are already marked as seen: ##
+            if new_homeworks and self.downloader is not None:
+                self._download_queue.put(new_homeworks)
+
+        if self.on_poll is not None:
+            self.on_poll(group_id, status, polled_homeworks)
+        return new_homeworks
+
+    def _run_downloads(self) -> None:
+        """Download new homeworks of every poll from the queue, while the next listings are polled.
+        Failed homeworks are forgotten, so the next poll retries them."""
+        while (new_homeworks := self._download_queue.get()) is not self._STOP_DOWNLOADS:
+            for result in self.downloader.download(new_homeworks):
+                if not result.is_successful:
+                    with self._seen_identities_lock:
+                        self.seen_identities.discard(result.homework.identity)
+                if self.on_download_result is not None:
+                    self.on_download_result(result)
+
+    def stop(self) -> None:
+        """Stop the watcher after the current poll. It can be called from another thread or a signal handler."""
+        self._stop_event.set()
+
+    def run(self, max_polls: Optional[int] = None) -> int:
+        """Poll the listings by their schedules until stop is called.
+        All listings are polled right after the start, started downloads are finished before the return.
+
+        Args:
+            max_polls (Optional[int], optional): stop after this count of polls. Defaults to None (until stop).
+
+        Returns:
+            int: count of the polls.
+        """
+        logger: "Logger" = get_logger(subsystem=WATCHER_SUBSYSTEM)
+        download_thread: Optional[Thread] = None
+        if self.downloader is not None:
+            download_thread = Thread(target=self._run_downloads, name="homeworks-watcher-downloads", daemon=True)
+            download_thread.start()
+
+        self._schedules.clear()
+        for status in self.statuses:
+            for group_id in self.group_ids:
+                heappush(self._schedules, ListingSchedule(
+                    next_poll_at=monotonic(),
+                    group_id=group_id,
+                    status=status,
+                    interval=self.min_interval
+                ))
+
+        polls_count: int = 0
+        try:
+            while not self._stop_event.is_set() and (max_polls is None or polls_count < max_polls):
+                schedule: ListingSchedule = heappop(self._schedules)
+                if self._stop_event.wait(timeout=max(0.0, schedule.next_poll_at - monotonic())):
+                    break
+
+                has_changes: Optional[bool] = None
+                try:
+                    new_homeworks: list[HomeworkModel] = self.poll(group_id=schedule.group_id, status=schedule.status)
+                    has_changes = bool(new_homeworks)
+                    logger.info(
+                        "Polled group {} status {}: {} new homeworks, next poll in {:.1f} sec.",
+                        schedule.group_id,
+                        schedule.status,
+                        len(new_homeworks),
+                        self._get_next_interval(interval=schedule.interval, has_changes=has_changes)
+                    )
+                except Exception as error:
+                    logger.warning("Failed to poll group {} status {}: {}", schedule.group_id, schedule.status, error)
+
+                get_metrics_registry().increment(
+                    WATCHER_POLLS_METRIC,
+                    result="failed" if has_changes is None else "changed" if has_changes else "unchanged"
+                )
+                polls_count += 1
+                schedule.interval = self._get_next_interval(interval=schedule.interval, has_changes=has_changes)
+                schedule.next_poll_at = self._get_next_poll_at(interval=schedule.interval)
+                heappush(self._schedules, schedule)
+
+        finally:
+            if download_thread is not None:
+                self._download_queue.put(self._STOP_DOWNLOADS)
+                download_thread.join()
+
+        return polls_count
@@ -1,31 +1,666 @@
 
-from journal_homework_models import HomeworksPageModelFactory
-from journal_requests import UserInputData
-from homeworks_folder_manager import HomeworksFolderManager
+## Built-in modules: ##
+from argparse import ArgumentParser, Namespace
+from json import load, dumps
+from os import environ, PathLike
+from sys import exit, stderr
+from typing import Callable, Generator, Optional, TYPE_CHECKING
 
+## Local modules: ##
+from config import current_dir_path, HOMEWORKS_FOLDER_NAME
 
-APPLICATION_KEY: str = ""
-PASSWORD: str = ""
-USERNAME: str = ""
+## Other local modules are imported by the commands, so --help doesn't load the HTTP stack: ##
+if TYPE_CHECKING:
+    from journal_requests import UserInputData, JournalHomeworkScrapper
+    from journal_homework_query import HomeworksQuery
+    from journal_http_cache import ListingHttpCache
+    from journal_homework_models import HomeworkModel
+    from homeworks_event_store import HomeworksEventStore
+    from homeworks_postprocessing import HomeworksPostprocessor
 
-user_data: UserInputData = UserInputData(
-    APPLICATION_KEY=APPLICATION_KEY,
-    ID_CITY="null",
-    PASSWORD=PASSWORD,
-    USERNAME=USERNAME
-)
-factory: HomeworksPageModelFactory = HomeworksPageModelFactory(
-    login_data=user_data,
-    page=0,
-    status=1,
-    group_id=53
-)
 
-for homework in factory.homeworks_page_model:
-    manager: HomeworksFolderManager = HomeworksFolderManager(
-        homework_to_save=homework,
-        login_data=user_data
+## Environment variables with the Journal login data: ##
+LOGIN_DATA_ENVIRONMENT: dict[str, str] = {
+    "APPLICATION_KEY": "JOURNAL_APPLICATION_KEY",
+    "ID_CITY": "JOURNAL_ID_CITY",
+    "PASSWORD": "JOURNAL_PASSWORD",
+    "USERNAME": "JOURNAL_USERNAME",
+}
+DEFAULT_ID_CITY: str = "null"
+
+
+def get_login_data(config_path: Optional[PathLike]) -> "UserInputData":
+    """Get the Journal login data from the config file or from the environment.
+    Config file is a json object with APPLICATION_KEY, ID_CITY, PASSWORD and USERNAME fields.
+
+    Args:
+        config_path (Optional[PathLike]): path to the config file.
+
+    Raises:
+        ValueError: if some login data is missing.
+
+    Returns:
+        UserInputData: Journal login data.
+    """
+    from journal_requests import UserInputData
+
+    file_login_data: dict[str, str] = {}
+    if config_path is not None:
+        with open(file=config_path, mode="r", encoding="utf-8") as file:
+            file_login_data: dict[str, str] = load(file)
+
+    login_data: dict[str, Optional[str]] = {
+        field: file_login_data.get(field) or environ.get(environment_variable)
+        for field, environment_variable in LOGIN_DATA_ENVIRONMENT.items()
+    }
+    login_data["ID_CITY"] = login_data["ID_CITY"] or DEFAULT_ID_CITY
+
+    missing_fields: list[str] = [field for field, value in login_data.items() if not value]
+    if missing_fields:
+        raise ValueError(
+            f"Missing login data: {', '.join(missing_fields)}. "
+            f"Pass --config or set {', '.join(LOGIN_DATA_ENVIRONMENT[field] for field in missing_fields)}."
+        )
+
+    return UserInputData(**login_data)
+
+
+def create_scrapper(arguments: Namespace, listing_cache: Optional["ListingHttpCache"] = None) -> "JournalHomeworkScrapper":
+    """Log in the Journal API once for the whole command.
+
+    Args:
+        arguments (Namespace): command line arguments.
+        listing_cache (Optional[ListingHttpCache], optional): cache for the homework listings. Defaults to None.
+
+    Returns:
+        JournalHomeworkScrapper: shared logged in scrapper.
+    """
+    from journal_requests import JournalHomeworkScrapper
+    from journal_rate_limiter import JournalRateLimiter
+    from journal_token_store import JournalTokenStore
+    from journal_transport import PooledSessionTransport
+
+    if arguments.api_rate < 0 or arguments.files_rate < 0:
+        raise ValueError("--api-rate and --files-rate must not be negative.")
+
+    ## Zero rate means the budget is not limited: ##
+    rate_limiter: JournalRateLimiter = JournalRateLimiter(
+        api_rate=arguments.api_rate or None,
+        files_rate=arguments.files_rate or None
+    )
+    return JournalHomeworkScrapper(
+        login_data=get_login_data(config_path=arguments.config),
+        token_store=None if arguments.no_token_cache else JournalTokenStore(),
+        transport=PooledSessionTransport(pool_size=arguments.concurrency, rate_limiter=rate_limiter),
+        listing_cache=listing_cache
+    )
+
+
+def create_query(arguments: Namespace, journal_scrapper: "JournalHomeworkScrapper") -> "HomeworksQuery":
+    """Create the query of all requested statuses and groups.
+
+    Args:
+        arguments (Namespace): command line arguments.
+        journal_scrapper (JournalHomeworkScrapper): shared logged in scrapper.
+
+    Returns:
+        HomeworksQuery: homeworks query.
+    """
+    from journal_homework_models import HomeworkAPI
+    from journal_homework_query import HomeworksQuery
+
+    return HomeworksQuery(
+        journal_homework_api=HomeworkAPI(journal_scrapper=journal_scrapper),
+        statuses=arguments.status,
+        group_ids=arguments.group,
+        max_workers=arguments.concurrency,
+        start_page=arguments.start_page,
+        end_page=arguments.end_page
+    )
+
+
+def get_event_store_path(arguments: Namespace) -> PathLike:
+    """Get the event store path of the command: --event-store or .events.sqlite3 in the homeworks folder
+    of the output folder, so sync, download, watch and changes with the same -o use the same store.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Returns:
+        PathLike: SQLite database path.
+    """
+    from os.path import join
+    from homeworks_event_store import HomeworksEventStore
+
+    if arguments.event_store is not None:
+        return arguments.event_store
+
+    output_dir: PathLike = arguments.output_dir if "output_dir" in arguments else current_dir_path
+    return join(output_dir, HOMEWORKS_FOLDER_NAME, HomeworksEventStore.DATABASE_FILENAME)
+
+
+def open_event_store(arguments: Namespace) -> Optional["HomeworksEventStore"]:
+    """Open the event store from the --event-store or --record-events argument.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Returns:
+        Optional[HomeworksEventStore]: event store or None if it's not enabled.
+    """
+    if arguments.event_store is None and not arguments.record_events:
+        return None
+
+    from homeworks_event_store import HomeworksEventStore
+
+    return HomeworksEventStore(database_path=get_event_store_path(arguments=arguments))
+
+
+def iter_observed_homeworks(
+    arguments: Namespace,
+    query: "HomeworksQuery"
+) -> Generator[tuple[int, int, "HomeworkModel"], None, None]:
+    """Run the query and record all observed homeworks to the event store, if it's enabled.
+    Observations are recorded by batches, all of them with the query start time.
+
+    Args:
+        arguments (Namespace): command line arguments.
+        query (HomeworksQuery): homeworks query.
+
+    Yields:
+        Generator[tuple[int, int, HomeworkModel], None, None]: group id, status and homework.
+    """
+    from time import time
+
+    RECORD_BATCH_SIZE: int = 256
+
+    event_store: Optional["HomeworksEventStore"] = open_event_store(arguments=arguments)
+    if event_store is None:
+        yield from query.iter_with_source()
+        return
+
+    observed_at: float = time()
+    observations: list[tuple[int, "HomeworkModel"]] = []
+    try:
+        for group_id, status, homework in query.iter_with_source():
+            observations.append((group_id, homework))
+            if len(observations) >= RECORD_BATCH_SIZE:
+                event_store.record_many(observations=observations, observed_at=observed_at)
+                observations = []
+
+            yield (group_id, status, homework)
+    finally:
+        if observations:
+            event_store.record_many(observations=observations, observed_at=observed_at)
+        event_store.close()
+
+
+def create_postprocessor(arguments: Namespace) -> Optional["HomeworksPostprocessor"]:
+    """Create the postprocessor of the saved files from the --postprocess arguments.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Returns:
+        Optional[HomeworksPostprocessor]: postprocessor or None if it's not enabled.
+    """
+    if not arguments.postprocess or arguments.dry_run:
+        return None
+
+    from homeworks_postprocessing import HomeworksPostprocessor
+
+    return HomeworksPostprocessor(dir_path=arguments.output_dir, max_workers=arguments.postprocess_workers)
+
+
+def run_list(arguments: Namespace) -> int:
+    """Print all homeworks of the requested statuses and groups.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Returns:
+        int: exit code.
+    """
+    query: "HomeworksQuery" = create_query(arguments=arguments, journal_scrapper=create_scrapper(arguments=arguments))
+    for group_id, status, homework in iter_observed_homeworks(arguments=arguments, query=query):
+        print(
+            group_id,
+            status,
+            homework.creation_time,
+            homework.subject_name,
+            homework.theme,
+            homework.teacher_name,
+            sep="\t"
+        )
+
+    return 0
+
+
+def run_download(arguments: Namespace, is_sync: bool) -> int:
+    """Download homeworks of the requested statuses and groups.
+
+    Args:
+        arguments (Namespace): command line arguments.
+        is_sync (bool): download only homeworks which are not in the manifest yet.
+
+    Returns:
+        int: exit code (1 if some homeworks were not saved).
+    """
+    from journal_downloader import HomeworksDownloader
+    from journal_homework_query import HomeworksQuery
+    from homeworks_manifest import HomeworksManifest
+
+    journal_scrapper: "JournalHomeworkScrapper" = create_scrapper(arguments=arguments)
+    query: HomeworksQuery = create_query(arguments=arguments, journal_scrapper=journal_scrapper)
+    homeworks: Generator["HomeworkModel", None, None] = HomeworksQuery.iter_unique(
+        iter_observed_homeworks(arguments=arguments, query=query)
+    )
+    manifest: Optional[HomeworksManifest] = HomeworksManifest(dir_path=arguments.output_dir) if is_sync else None
+
+    if arguments.dry_run:
+        for homework in homeworks:
+            if manifest is None or manifest.needs_download(homework=homework):
+                print(homework.subject_name, homework.theme, homework.file_url_path, sep="\t")
+        return 0
+
+    downloader: HomeworksDownloader = HomeworksDownloader(
+        journal_scrapper=journal_scrapper,
+        concurrency=arguments.concurrency,
+        per_host_limit=arguments.per_host_limit,
+        dir_path=arguments.output_dir,
+        manifest=manifest
+    )
+    postprocessor: Optional["HomeworksPostprocessor"] = create_postprocessor(arguments=arguments)
+    saved_count: int = 0
+    skipped_count: int = 0
+    failed_count: int = 0
+    try:
+        for result in downloader.download(homeworks):
+            if not result.is_successful:
+                failed_count += 1
+                print(f"Failed to save {result.homework.theme}: {result.error}", file=stderr)
+                continue
+
+            if result.is_skipped:
+                skipped_count += 1
+            else:
+                saved_count += 1
+            ## Files skipped by the sync are submitted too, already indexed content is skipped by its hash: ##
+            if postprocessor is not None and result.local_path is not None:
+                postprocessor.submit(local_path=result.local_path, file_hash=result.file_hash, homework=result.homework)
+    finally:
+        if postprocessor is not None:
+            postprocessor.close()
+
+    print(f"Saved: {saved_count}, skipped: {skipped_count}, failed: {failed_count}.")
+    if postprocessor is not None:
+        print(f"Postprocessed: {postprocessor.processed_count}, failed: {postprocessor.failed_count}.")
+    return 1 if failed_count else 0
+
+
+def run_watch(arguments: Namespace) -> int:
+    """Poll the listings until Ctrl+C or SIGTERM and download new homeworks.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Returns:
+        int: exit code.
+    """
+    from signal import signal, SIGTERM
+    from journal_downloader import HomeworksDownloader, HomeworkDownloadResult
+    from journal_homework_models import HomeworkAPI, HomeworkModel
+    from journal_http_cache import ListingHttpCache
+    from journal_watcher import HomeworksWatcher
+    from homeworks_manifest import HomeworksManifest
+
+    ## Every poll revalidates the listing pages, unchanged pages are 304 responses: ##
+    journal_scrapper: "JournalHomeworkScrapper" = create_scrapper(
+        arguments=arguments,
+        listing_cache=ListingHttpCache(ttl=0)
+    )
+    manifest: HomeworksManifest = HomeworksManifest(dir_path=arguments.output_dir)
+    downloader: Optional[HomeworksDownloader] = None
+    if not arguments.dry_run:
+        downloader = HomeworksDownloader(
+            journal_scrapper=journal_scrapper,
+            concurrency=arguments.concurrency,
+            per_host_limit=arguments.per_host_limit,
+            dir_path=arguments.output_dir,
+            manifest=manifest
+        )
+
+    def print_new_homework(group_id: int, status: int, homework: HomeworkModel) -> None:
+        print(group_id, status, homework.subject_name, homework.theme, homework.file_url_path, sep="\t", flush=True)
+
+    postprocessor: Optional["HomeworksPostprocessor"] = create_postprocessor(arguments=arguments)
+
+    def print_failed_download(result: HomeworkDownloadResult) -> None:
+        if not result.is_successful:
+            print(f"Failed to save {result.homework.theme}: {result.error}", file=stderr, flush=True)
+        elif postprocessor is not None and result.local_path is not None:
+            postprocessor.submit(local_path=result.local_path, file_hash=result.file_hash, homework=result.homework)
+
+    event_store: Optional["HomeworksEventStore"] = open_event_store(arguments=arguments)
+
+    def record_poll(group_id: int, status: int, homeworks: list[HomeworkModel]) -> None:
+        event_store.record_many(observations=[(group_id, homework) for homework in homeworks])
+
+    watcher: HomeworksWatcher = HomeworksWatcher(
+        journal_homework_api=HomeworkAPI(journal_scrapper=journal_scrapper),
+        statuses=arguments.status,
+        group_ids=arguments.group,
+        downloader=downloader,
+        seen_identities=manifest.get_identities(),
+        min_interval=arguments.min_interval,
+        max_interval=arguments.max_interval,
+        jitter=arguments.jitter,
+        start_page=arguments.start_page,
+        end_page=arguments.end_page,
+        on_new_homework=print_new_homework,
+        on_download_result=print_failed_download,
+        on_poll=record_poll if event_store is not None else None
+    )
+    signal(SIGTERM, lambda *_: watcher.stop())
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if event_store is not None:
+            event_store.close()
+        if postprocessor is not None:
+            postprocessor.close()
+
+    return 0
+
+
+def run_export(arguments: Namespace) -> int:
+    """Export the homework listings to the CSV, JSON Lines or Parquet file for the analytics jobs.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Returns:
+        int: exit code.
+    """
+    from homeworks_exporter import HomeworksExporter
+
+    ## Format and pyarrow are checked before the login: ##
+    exporter: HomeworksExporter = HomeworksExporter(
+        output_path=arguments.output,
+        export_format=arguments.format,
+        batch_size=arguments.batch_size
     )
-    manager.save_to_path()
+    query: "HomeworksQuery" = create_query(arguments=arguments, journal_scrapper=create_scrapper(arguments=arguments))
+    exported_count: int = exporter.export(iter_observed_homeworks(arguments=arguments, query=query))
+
+    print(f"Exported: {exported_count} homeworks to {arguments.output}.")
+    return 0
+
+
+def parse_since(since: str) -> float:
+    """Parse the --since argument: ISO date and time or the period before now, like 30m, 12h or 7d.
+
+    Args:
+        since (str): --since argument.
+
+    Raises:
+        ValueError: if the argument has unknown format.
+
+    Returns:
+        float: unix timestamp.
+    """
+    from datetime import datetime
+    from time import time
+
+    PERIOD_SECONDS: dict[str, int] = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60, "w": 7 * 24 * 60 * 60}
+
+    period_unit: str = since[-1:].lower()
+    if period_unit in PERIOD_SECONDS and since[:-1].replace(".", "", 1).isdigit():
+        return time() - float(since[:-1]) * PERIOD_SECONDS[period_unit]
+
+    try:
+        return datetime.fromisoformat(since).timestamp()
+    except ValueError:
+        raise ValueError(f"Wrong --since value: {since}. Use ISO date and time or the period like 30m, 12h, 7d.") from None
+
+
+def run_changes(arguments: Namespace) -> int:
+    """Print the status changes recorded to the event store, without the API requests.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Returns:
+        int: exit code.
+    """
+    from datetime import datetime
+    from homeworks_event_store import HomeworksEventStore, HomeworkStatusTransition
+
+    since: float = parse_since(since=arguments.since)
+    try:
+        event_store: HomeworksEventStore = HomeworksEventStore(
+            database_path=get_event_store_path(arguments=arguments),
+            read_only=True
+        )
+    except FileNotFoundError as error:
+        print(f"{error} Record it with --record-events or --event-store on sync, download or watch.", file=stderr)
+        return 1
+
+    with event_store:
+        transitions: list[HomeworkStatusTransition] = event_store.changes_since(
+            since=since,
+            group_id=arguments.group,
+            to_status=arguments.to_status,
+            include_first_seen=arguments.include_new
+        )
+
+    for transition in transitions:
+        print(
+            datetime.fromtimestamp(transition.observed_at).isoformat(sep=" ", timespec="seconds"),
+            transition.group_id,
+            f"{'new' if transition.from_status is None else transition.from_status} -> {transition.to_status}",
+            transition.subject_name,
+            transition.theme,
+            transition.teacher_name,
+            sep="\t"
+        )
+
+    return 0
+
+
+def setup_command_logging(arguments: Namespace) -> None:
+    """Configure the logging sinks from the command line arguments.
+
+    Args:
+        arguments (Namespace): command line arguments.
+
+    Raises:
+        ValueError: if some --log-subsystem value is not like SUBSYSTEM=LEVEL.
+    """
+    from journal_loggers import setup_logging, LOGGER_PATH
+
+    subsystem_levels: dict[str, str] = {}
+    for subsystem_level in arguments.log_subsystem or []:
+        subsystem, separator, level = subsystem_level.partition("=")
+        if not separator or not subsystem or not level:
+            raise ValueError(f"Wrong --log-subsystem value: {subsystem_level}. Use SUBSYSTEM=LEVEL.")
+        subsystem_levels[subsystem] = level
+
+    setup_logging(
+        level=arguments.log_level,
+        subsystem_levels=subsystem_levels,
+        log_path=arguments.log_file or LOGGER_PATH
+    )
+
+
+def write_metrics(arguments: Namespace) -> None:
+    """Export the metrics of the run to the files from the command line arguments.
+
+    Args:
+        arguments (Namespace): command line arguments.
+    """
+    STDERR_PATH: str = "-"
+
+    if arguments.metrics_json is None and arguments.metrics_prometheus is None:
+        return
+
+    from journal_metrics import MetricsRegistry, get_metrics_registry
+
+    metrics_registry: MetricsRegistry = get_metrics_registry()
+    if arguments.metrics_json == STDERR_PATH:
+        print(dumps(metrics_registry.to_dict(), indent=2), file=stderr)
+    elif arguments.metrics_json is not None:
+        metrics_registry.write_json(path=arguments.metrics_json)
+
+    if arguments.metrics_prometheus is not None:
+        metrics_registry.write_prometheus(path=arguments.metrics_prometheus)
+
+
+def create_parser() -> ArgumentParser:
+    """Create the command line parser.
+
+    Returns:
+        ArgumentParser: parser with list, sync, download, watch, export and changes commands.
+    """
+    parser: ArgumentParser = ArgumentParser(description="Journal homeworks scrapper.")
+    parser.add_argument(
+        "--config",
+        help=f"json file with the login data (default: {', '.join(LOGIN_DATA_ENVIRONMENT.values())} variables)"
+    )
+    parser.add_argument("--no-token-cache", action="store_true", help="don't reuse the access token from the last run")
+    parser.add_argument(
+        "--event-store",
+        help="SQLite file to record observed homeworks and their status changes "
+        "(default: homeworks/.events.sqlite3 in the output folder)"
+    )
+    parser.add_argument(
+        "--record-events",
+        action="store_true",
+        help="record observed homeworks and their status changes to the default event store"
+    )
+    parser.add_argument(
+        "--api-rate",
+        type=float,
+        default=5,
+        help="max login and listing requests per second, 429 responses pause them for Retry-After (default: 5, 0 is unlimited)"
+    )
+    parser.add_argument(
+        "--files-rate",
+        type=float,
+        default=10,
+        help="max file requests per second (default: 10, 0 is unlimited)"
+    )
+    parser.add_argument("--log-level", default="INFO", help="level of the logs file records (default: INFO)")
+    parser.add_argument(
+        "--log-subsystem",
+        action="append",
+        metavar="SUBSYSTEM=LEVEL",
+        help="level of the requests, folder_manager, watcher or postprocessing records, like requests=DEBUG (repeatable)"
+    )
+    parser.add_argument("--log-file", help="logs file path (default: LOGS.log near main.py)")
+    parser.add_argument("--metrics-json", help="write the metrics summary of the run to the json file (- for stderr)")
+    parser.add_argument("--metrics-prometheus", help="write the metrics of the run to the file in the Prometheus text format")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common_parser: ArgumentParser = ArgumentParser(add_help=False)
+    common_parser.add_argument("-g", "--group", type=int, action="append", required=True, help="group id (repeatable)")
+    common_parser.add_argument(
+        "-s", "--status",
+        type=int,
+        action="append",
+        help="homework status: 0, 1-completed, 2-on the checking, 3-uncompleted, 5-expired (repeatable, default: 1)"
+    )
+    common_parser.add_argument("--start-page", type=int, default=0, help="first listing page")
+    common_parser.add_argument("--end-page", type=int, help="last listing page (default: until the empty page)")
+    common_parser.add_argument("-c", "--concurrency", type=int, default=8, help="requests at the same time")
+
+    download_parser: ArgumentParser = ArgumentParser(add_help=False)
+    download_parser.add_argument("-o", "--output-dir", default=current_dir_path, help="folder for the homeworks folder")
+    download_parser.add_argument("--per-host-limit", type=int, default=4, help="downloads from one host at the same time")
+    download_parser.add_argument("--dry-run", action="store_true", help="print homeworks instead of downloading them")
+    download_parser.add_argument(
+        "--postprocess",
+        action="store_true",
+        help="unpack archives, hash files and extract text on the process pool to homeworks/.postprocessing.jsonl"
+    )
+    download_parser.add_argument("--postprocess-workers", type=int, help="postprocessing processes (default: CPU count)")
+
+    list_command: ArgumentParser = subparsers.add_parser("list", parents=[common_parser], help="print homeworks")
+    list_command.set_defaults(handler=run_list)
+    sync_command: ArgumentParser = subparsers.add_parser(
+        "sync",
+        parents=[common_parser, download_parser],
+        help="download new homeworks only"
+    )
+    sync_command.set_defaults(handler=lambda arguments: run_download(arguments=arguments, is_sync=True))
+    download_command: ArgumentParser = subparsers.add_parser(
+        "download",
+        parents=[common_parser, download_parser],
+        help="download all homeworks"
+    )
+    download_command.set_defaults(handler=lambda arguments: run_download(arguments=arguments, is_sync=False))
+    watch_command: ArgumentParser = subparsers.add_parser(
+        "watch",
+        parents=[common_parser, download_parser],
+        help="poll the listings and download new homeworks until Ctrl+C"
+    )
+    watch_command.add_argument("--min-interval", type=float, default=30, help="min seconds between polls of one listing")
+    watch_command.add_argument("--max-interval", type=float, default=900, help="max seconds between polls of one listing")
+    watch_command.add_argument("--jitter", type=float, default=0.1, help="max random share of the interval (0-1)")
+    watch_command.set_defaults(handler=run_watch)
+    export_command: ArgumentParser = subparsers.add_parser(
+        "export",
+        parents=[common_parser],
+        help="write homeworks metadata to the CSV, JSON Lines or Parquet file"
+    )
+    export_command.add_argument("-o", "--output", required=True, help="export file path")
+    export_command.add_argument(
+        "-f", "--format",
+        choices=("csv", "jsonl", "parquet"),
+        help="export format (default: by the output extension, parquet needs pyarrow)"
+    )
+    export_command.add_argument("--batch-size", type=int, default=1024, help="homeworks written at once")
+    export_command.set_defaults(handler=run_export)
+    changes_command: ArgumentParser = subparsers.add_parser(
+        "changes",
+        help="print status changes from the event store without the API requests"
+    )
+    changes_command.add_argument("-o", "--output-dir", default=current_dir_path, help="folder for the homeworks folder")
+    changes_command.add_argument("--since", required=True, help="ISO date and time or the period like 30m, 12h, 7d")
+    changes_command.add_argument("-g", "--group", type=int, help="only changes of the group")
+    changes_command.add_argument("--to-status", type=int, help="only changes to the status")
+    changes_command.add_argument("--include-new", action="store_true", help="include first observations of the homeworks")
+    changes_command.set_defaults(handler=run_changes)
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    """Run the command line interface.
+
+    Args:
+        argv (Optional[list[str]], optional): command line arguments. Defaults to None (sys.argv).
+    """
+    DEFAULT_STATUS: int = 1
+
+    arguments: Namespace = create_parser().parse_args(argv)
+    if "status" in arguments:
+        arguments.status = arguments.status or [DEFAULT_STATUS]
+    handler: Callable[[Namespace], int] = arguments.handler
+
+    try:
+        setup_command_logging(arguments=arguments)
+        exit_code: int = handler(arguments)
+    except ValueError as error:
+        print(error, file=stderr)
+        exit(2)
+    finally:
+        write_metrics(arguments=arguments)
+
+    exit(exit_code)
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+
+## Built-in modules: ##
+from os.path import dirname
+import sys
+
+## Pip modules: ##
+import pytest
+
+## Modules of the project are flat files in the repository root: ##
+sys.path.insert(0, dirname(dirname(__file__)))
+
+## Local modules: ##
+from journal_transport import FakeTransport
+from journal_requests import JournalHomeworkScrapper, UserInputData
+from config import JOURNAL_LOGIN_URL
+
+
+FILES_URL: str = "https://files.example/homework"
+
+
+@pytest.fixture
+def login_data() -> UserInputData:
+    return UserInputData(APPLICATION_KEY="key", ID_CITY="null", PASSWORD="password", USERNAME="user")
+
+
+@pytest.fixture
+def fake_transport() -> FakeTransport:
+    """Offline transport with the login route, every login gets the next token: token-1, token-2..."""
+    transport: FakeTransport = FakeTransport()
+    logins_count: list[int] = [0]
+
+    def login(request) -> object:
+        logins_count[0] += 1
+        return transport.make_response(json={"access_token": f"token-{logins_count[0]}", "expires_in_access": 3600})
+
+    transport.add_route("POST", JOURNAL_LOGIN_URL, login)
+    return transport
+
+
+@pytest.fixture
+def scrapper(login_data: UserInputData, fake_transport: FakeTransport) -> JournalHomeworkScrapper:
+    return JournalHomeworkScrapper(login_data=login_data, transport=fake_transport)
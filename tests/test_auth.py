@@ -0,0 +1,66 @@
+
+## Local modules: ##
+from journal_transport import FakeTransport
+from journal_requests import JournalHomeworkScrapper, UserInputData
+from journal_homework_models import HomeworkAPI, HomeworkModel
+from journal_token_store import JournalTokenStore
+from config import JOURNAL_LOGIN_URL, JOURNAL_HOMEWORK_LIST_URL
+
+
+LISTING_RECORD: dict = {
+    "status": 1,
+    "fio_teach": "Teacher",
+    "name_spec": "Subject",
+    "file_path": "https://files.example/homework",
+    "comment": "",
+    "creation_time": "2024-01-02 10:00:00",
+    "theme": "Lab",
+}
+
+
+def add_listing_route(transport: FakeTransport, valid_token: str) -> None:
+    def listing(request) -> object:
+        if request.headers.get("Authorization") != f"Bearer {valid_token}":
+            return transport.make_response(401)
+        return transport.make_response(json=[LISTING_RECORD])
+
+    transport.add_route("GET", JOURNAL_HOMEWORK_LIST_URL, listing)
+
+
+def get_logins_count(transport: FakeTransport) -> int:
+    return sum(request.url == JOURNAL_LOGIN_URL for request in transport.sent_requests)
+
+
+def test_rejected_cached_token_is_refreshed(tmp_path, login_data: UserInputData, fake_transport: FakeTransport) -> None:
+    token_store: JournalTokenStore = JournalTokenStore(store_path=tmp_path / "tokens.json")
+    token_store.save(login_data=login_data, access_token="stale", expires_at=None)
+    add_listing_route(fake_transport, valid_token="token-1")
+
+    scrapper: JournalHomeworkScrapper = JournalHomeworkScrapper(
+        login_data=login_data,
+        token_store=token_store,
+        transport=fake_transport
+    )
+    assert get_logins_count(fake_transport) == 0
+
+    homeworks: list[HomeworkModel] = HomeworkAPI(journal_scrapper=scrapper).get_homework_models_page(
+        page=1,
+        status=1,
+        group_id=1
+    )
+    assert [homework.theme for homework in homeworks] == ["Lab"]
+    assert get_logins_count(fake_transport) == 1
+    assert token_store.load(login_data=login_data) == ("token-1", scrapper._login_api_parser.expires_at)
+
+
+def test_expired_token_is_refreshed_before_request(login_data: UserInputData, fake_transport: FakeTransport) -> None:
+    add_listing_route(fake_transport, valid_token="token-2")
+    scrapper: JournalHomeworkScrapper = JournalHomeworkScrapper(login_data=login_data, transport=fake_transport)
+    scrapper._login_api_parser.expires_at = 0
+
+    HomeworkAPI(journal_scrapper=scrapper).get_homework_models_page(page=1, status=1, group_id=1)
+
+    ## One login in the constructor and one before the listing, without the 401 response: ##
+    assert get_logins_count(fake_transport) == 2
+    assert all(request.url == JOURNAL_LOGIN_URL or request.headers["Authorization"] == "Bearer token-2"
+               for request in fake_transport.sent_requests)
@@ -0,0 +1,168 @@
+
+## Built-in modules: ##
+from hashlib import sha256
+from os import listdir, urandom
+from os.path import join, exists, basename
+from threading import Event
+from time import sleep
+from typing import Callable, Optional
+
+## Pip modules: ##
+import pytest
+from requests import RequestException
+
+## Local modules: ##
+from journal_transport import FakeTransport
+from journal_requests import JournalHomeworkScrapper
+from journal_homework_models import HomeworkModel
+from journal_downloader import HomeworksDownloader, HomeworkDownloadResult
+from homeworks_blob_store import HomeworksBlobStore
+from conftest import FILES_URL
+
+
+FILE_SIZE: int = 64 * 1024
+FAILED_DOWNLOAD_SIZE: int = 1000
+
+
+def add_file_route(
+    transport: FakeTransport,
+    url: str,
+    content: bytes,
+    range_handler: Optional[Callable[[int], tuple[int, bytes, dict[str, str]]]] = None
+) -> dict[str, bool]:
+    """Serve the file, which is cut after FAILED_DOWNLOAD_SIZE bytes while state["fail"] is True.
+    Range requests are answered by range_handler(offset) -> status, body and headers."""
+    state: dict[str, bool] = {"fail": True}
+
+    def handler(request) -> object:
+        headers: dict[str, str] = {"Content-Disposition": "attachment; filename=\"homework.zip\"", "ETag": "\"v1\""}
+        range_header: Optional[str] = request.headers.get("Range")
+        if range_header and range_handler is not None:
+            status_code, body, range_headers = range_handler(int(range_header[len("bytes="):-1]))
+            return transport.make_response(status_code, content=body, headers={**headers, **range_headers})
+
+        headers["Content-Length"] = str(len(content))
+        body: bytes = content[:FAILED_DOWNLOAD_SIZE] if state["fail"] else content
+        return transport.make_response(content=body, headers=headers)
+
+    transport.add_route("GET", url, handler)
+    return state
+
+
+def get_range_headers(requests: list) -> list[Optional[str]]:
+    return [request.headers.get("Range") for request in requests if request.method == "GET"]
+
+
+@pytest.mark.parametrize("range_behaviour, expected_ranges", [
+    ("resume", [f"bytes={FAILED_DOWNLOAD_SIZE}-"]),
+    ("ignore", [f"bytes={FAILED_DOWNLOAD_SIZE}-"]),
+    ("not_satisfiable", [f"bytes={FAILED_DOWNLOAD_SIZE}-", None]),
+    ("another_offset", [f"bytes={FAILED_DOWNLOAD_SIZE}-", None]),
+])
+def test_interrupted_download_is_resumed_or_restarted(
+    tmp_path,
+    fake_transport: FakeTransport,
+    scrapper: JournalHomeworkScrapper,
+    range_behaviour: str,
+    expected_ranges: list[Optional[str]]
+) -> None:
+    content: bytes = urandom(FILE_SIZE)
+
+    def range_handler(offset: int) -> tuple[int, bytes, dict[str, str]]:
+        if range_behaviour == "resume":
+            return 206, content[offset:], {"Content-Range": f"bytes {offset}-{FILE_SIZE - 1}/{FILE_SIZE}"}
+        if range_behaviour == "not_satisfiable":
+            return 416, b"", {"Content-Range": f"bytes */{FILE_SIZE}"}
+        if range_behaviour == "another_offset":
+            return 206, content[offset - 1:], {"Content-Range": f"bytes {offset - 1}-{FILE_SIZE - 1}/{FILE_SIZE}"}
+        return 200, content, {"Content-Length": str(FILE_SIZE)}
+
+    state: dict[str, bool] = add_file_route(fake_transport, FILES_URL, content, range_handler)
+    with pytest.raises(RequestException):
+        scrapper.stream_homework_file(file_url_path=FILES_URL, dir_path=tmp_path)
+
+    state["fail"] = False
+    fake_transport.sent_requests.clear()
+    homework_file = scrapper.stream_homework_file(file_url_path=FILES_URL, dir_path=tmp_path)
+
+    assert get_range_headers(fake_transport.sent_requests) == expected_ranges
+    assert homework_file.size == FILE_SIZE
+    assert homework_file.sha256 == sha256(content).hexdigest()
+    with open(homework_file.temp_path, "rb") as file:
+        assert file.read() == content
+    ## Only the complete file is left, the partial file and its state are removed: ##
+    assert listdir(tmp_path) == [basename(homework_file.temp_path)]
+
+
+def create_homework(theme: str, file_url_path: str = FILES_URL) -> HomeworkModel:
+    return HomeworkModel.from_record((1, "Teacher", "Subject", file_url_path, "", "2024-01-02 10:00:00", theme))
+
+
+def download(scrapper: JournalHomeworkScrapper, dir_path, homeworks: list[HomeworkModel]) -> list[HomeworkDownloadResult]:
+    results: list[HomeworkDownloadResult] = list(
+        HomeworksDownloader(journal_scrapper=scrapper, concurrency=2, dir_path=dir_path).download(homeworks)
+    )
+    assert [result.error for result in results] == [None] * len(homeworks)
+    return sorted(results, key=lambda result: result.index)
+
+
+def test_same_theme_gets_numbered_filename(tmp_path, fake_transport: FakeTransport, scrapper: JournalHomeworkScrapper) -> None:
+    first_content: bytes = urandom(FILE_SIZE)
+    add_file_route(fake_transport, f"{FILES_URL}/1", first_content)["fail"] = False
+    add_file_route(fake_transport, f"{FILES_URL}/2", urandom(FILE_SIZE))["fail"] = False
+    add_file_route(fake_transport, f"{FILES_URL}/3", first_content)["fail"] = False
+
+    results: list[HomeworkDownloadResult] = download(scrapper, tmp_path, [
+        create_homework(theme="Lab", file_url_path=f"{FILES_URL}/1"),
+        create_homework(theme="Lab", file_url_path=f"{FILES_URL}/2"),
+    ])
+    subject_path: str = join(tmp_path, "homeworks", "Subject")
+    assert sorted(listdir(subject_path)) == ["Lab.zip", "Lab_2.zip"]
+    assert {basename(result.local_path) for result in results} == {"Lab.zip", "Lab_2.zip"}
+
+    ## Same content with the same theme is not saved again with the next number: ##
+    results: list[HomeworkDownloadResult] = download(scrapper, tmp_path, [
+        create_homework(theme="Lab", file_url_path=f"{FILES_URL}/3"),
+    ])
+    assert sorted(listdir(subject_path)) == ["Lab.zip", "Lab_2.zip"]
+    assert results[0].file_hash == sha256(first_content).hexdigest()
+
+
+def test_same_url_with_different_themes(
+    tmp_path,
+    monkeypatch,
+    fake_transport: FakeTransport,
+    scrapper: JournalHomeworkScrapper
+) -> None:
+    add_file_route(fake_transport, FILES_URL, urandom(FILE_SIZE))["fail"] = False
+    store: Callable = HomeworksBlobStore.store
+    first_store_started: Event = Event()
+
+    def slow_store(self: HomeworksBlobStore, temp_path: str, file_hash: str) -> str:
+        ## The second download of the URL runs while the first file is being moved: ##
+        if not first_store_started.is_set():
+            first_store_started.set()
+            sleep(0.2)
+        return store(self, temp_path=temp_path, file_hash=file_hash)
+
+    monkeypatch.setattr(HomeworksBlobStore, "store", slow_store)
+    download(scrapper, tmp_path, [create_homework(theme="Theme1"), create_homework(theme="Theme2")])
+
+    assert sorted(listdir(join(tmp_path, "homeworks", "Subject"))) == ["Theme1.zip", "Theme2.zip"]
+    assert listdir(join(tmp_path, "homeworks", ".partial")) == []
+
+
+def test_failed_download_is_not_visible_in_subject_folder(
+    tmp_path,
+    fake_transport: FakeTransport,
+    scrapper: JournalHomeworkScrapper
+) -> None:
+    add_file_route(fake_transport, FILES_URL, urandom(FILE_SIZE))
+    results: list[HomeworkDownloadResult] = list(
+        HomeworksDownloader(journal_scrapper=scrapper, dir_path=tmp_path).download([create_homework(theme="Lab")])
+    )
+
+    ## Folder manager logger wraps the errors of the save: ##
+    assert "Incomplete download" in str(results[0].error)
+    assert not exists(join(tmp_path, "homeworks", "Subject"))
+    assert len(listdir(join(tmp_path, "homeworks", ".partial"))) == 2
@@ -0,0 +1,48 @@
+
+## Built-in modules: ##
+from datetime import datetime
+from json import dumps
+
+## Local modules: ##
+from journal_homework_models import HomeworkModel, HomeworksBatch
+from homeworks_manifest import HomeworksManifest
+from homeworks_event_store import HomeworksEventStore
+
+
+def create_homework(creation_time: object, theme: str = "Lab") -> HomeworkModel:
+    return HomeworkModel(
+        status=1,
+        teacher_name="Teacher",
+        subject_name="Subject",
+        file_url_path="https://files.example/homework",
+        comment="",
+        creation_time=creation_time,
+        theme=theme
+    )
+
+
+def test_constructor_parses_creation_time(tmp_path) -> None:
+    homework: HomeworkModel = create_homework(creation_time="2024-01-02 10:00:00")
+
+    assert homework.creation_time == datetime(2024, 1, 2, 10)
+    assert HomeworksBatch([homework])[0] == homework
+    with HomeworksEventStore(dir_path=tmp_path) as event_store:
+        assert event_store.record(homework=homework, group_id=1)
+
+
+def test_identity_does_not_depend_on_creation_time_format() -> None:
+    assert create_homework("2024-01-02 10:00:00").identity == create_homework("2024-01-02T10:00:00").identity
+    assert create_homework("2024-01-02 10:00:00").identity == create_homework(datetime(2024, 1, 2, 10)).identity
+    ## Unparseable times keep their own keys instead of one "None" key: ##
+    assert create_homework("yesterday").identity != create_homework("today").identity
+
+
+def test_manifest_with_raw_creation_time_matches(tmp_path) -> None:
+    (tmp_path / "homeworks").mkdir()
+    (tmp_path / "homeworks" / HomeworksManifest.MANIFEST_FILENAME).write_text(dumps({
+        "file_url_path": "https://files.example/homework",
+        "creation_time": "2024-01-02 10:00:00",
+        "theme": "Lab",
+    }) + "\n")
+
+    assert create_homework(creation_time=datetime(2024, 1, 2, 10)) in HomeworksManifest(dir_path=tmp_path)
@@ -0,0 +1,75 @@
+
+## Built-in modules: ##
+from time import monotonic
+from typing import Optional
+
+## Pip modules: ##
+import pytest
+
+## Local modules: ##
+from journal_mock_server import JournalMockServer, MockServerConfig
+from journal_transport import PooledSessionTransport
+from journal_rate_limiter import JournalRateLimiter, TokenBucket
+from journal_metrics import MetricsRegistry, RATE_LIMITED_METRIC
+
+
+## Mock server answers 429 with Retry-After: 1 after this count of requests in the second: ##
+SERVER_RATE_LIMIT: int = 2
+REQUESTS_COUNT: int = 4
+
+
+@pytest.mark.parametrize("files_rate", [None, 100.0])
+def test_rate_limited_requests_wait_for_retry_after(files_rate: Optional[float]) -> None:
+    metrics_registry: MetricsRegistry = MetricsRegistry()
+    rate_limiter: JournalRateLimiter = JournalRateLimiter(
+        api_rate=None,
+        files_rate=files_rate,
+        files_burst=100,
+        metrics_registry=metrics_registry
+    )
+    transport: PooledSessionTransport = PooledSessionTransport(
+        max_retries=3,
+        backoff_factor=0,
+        metrics_registry=metrics_registry,
+        rate_limiter=rate_limiter
+    )
+
+    with JournalMockServer(MockServerConfig(rate_limit=SERVER_RATE_LIMIT, file_size=1024)) as mock_server:
+        start_time: float = monotonic()
+        status_codes: list[int] = [
+            transport.get(f"{mock_server.base_url}/files/1-1-0-{index}").status_code
+            for index in range(REQUESTS_COUNT)
+        ]
+        elapsed_time: float = monotonic() - start_time
+    transport.close()
+
+    assert status_codes == [200] * REQUESTS_COUNT
+    assert elapsed_time >= 0.9
+    rate_limited_counters: list[dict] = metrics_registry.to_dict()["counters"][RATE_LIMITED_METRIC]
+    assert sum(counter["value"] for counter in rate_limited_counters) >= 1
+
+
+def test_token_bucket_does_not_burst_after_pause() -> None:
+    RATE: float = 10.0
+    PAUSE: float = 0.3
+
+    bucket: TokenBucket = TokenBucket(rate=RATE, burst=5)
+    bucket.pause(delay=PAUSE)
+    delays: list[float] = [bucket.reserve() for _ in range(3)]
+
+    ## Bucket starts empty after the pause and the rate is lowered by decrease_factor: ##
+    slowed_interval: float = 1 / (RATE * bucket.decrease_factor)
+    assert delays[0] == pytest.approx(PAUSE + slowed_interval, abs=0.05)
+    assert delays[1] - delays[0] == pytest.approx(slowed_interval, abs=0.01)
+    assert delays[2] - delays[1] == pytest.approx(slowed_interval, abs=0.01)
+
+
+@pytest.mark.parametrize("retry_after, expected_delay", [
+    (None, 1.0),
+    ("2", 2.0),
+    ("junk", 1.0),
+    ("9999", 300.0),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+])
+def test_retry_after_is_parsed(retry_after: Optional[str], expected_delay: float) -> None:
+    assert JournalRateLimiter().parse_retry_after(retry_after=retry_after) == expected_delay